@@ -4,6 +4,7 @@
 import os
 import time
 import re
+from collections import deque
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -38,19 +39,131 @@ def init_driver():
 # Initialize WebDriver
 driver = init_driver()
 
+# Single-pass highlighter: one Aho-Corasick scan of the page text for all gRNAs
+HIGHLIGHT_SKIP_TAGS = ("script", "style")  # Text inside these elements is never highlighted
+HTML_TAG_PATTERN = re.compile(r'<(/?)([A-Za-z][A-Za-z0-9]*)?[^>]*>|<!--.*?-->', re.DOTALL)
+COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
+
+def reverse_complement(sequence):
+    return sequence.translate(COMPLEMENT)[::-1]
+
+# Aho-Corasick automaton over all gRNAs and their reverse complements; only HTML text
+# nodes are scanned, so tags, attributes and <script>/<style> content stay untouched
+class GuideHighlighter:
+    def __init__(self, grna_sequences, colors):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # (length, color) of the longest pattern ending at each state
+        
+        for i, grna_sequence in enumerate(grna_sequences):
+            if not grna_sequence:
+                continue
+            color = colors[i % len(colors)]
+            for pattern in {grna_sequence.upper(), reverse_complement(grna_sequence.upper())}:
+                self._add(pattern, color)
+        lengths = [out[0] for out in self.output if out is not None]
+        # Text nodes without a long enough run of pattern letters are skipped at C speed
+        letters = ''.join(sorted({ch for state in self.goto for ch in state}))
+        self.candidate = re.compile(f"[{re.escape(letters + letters.lower())}]{{{min(lengths)}}}") if lengths else None
+        self._build()
+    
+    def _add(self, pattern, color):
+        state = 0
+        for ch in pattern:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state] = (len(pattern), color)
+    
+    def _build(self):
+        # Breadth-first failure links, folded into a full transition table per state
+        frontier = deque(self.goto[0].values())
+        while frontier:
+            state = frontier.popleft()
+            for ch, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                if self.output[child] is None and self.output[self.fail[child]] is not None:
+                    self.output[child] = self.output[self.fail[child]]
+                frontier.append(child)
+        # Deterministic transitions: missing edges inherit from the failure state
+        order = deque([0])
+        seen = {0}
+        while order:
+            state = order.popleft()
+            if state:
+                for ch, target in self.goto[self.fail[state]].items():
+                    self.goto[state].setdefault(ch, target)
+            for child in list(self.goto[state].values()):
+                if child not in seen:
+                    seen.add(child)
+                    order.append(child)
+    
+    def find(self, text):
+        # Non-overlapping (start, end, color) matches in text, leftmost first
+        goto, output = self.goto, self.output
+        matches = []
+        state = 0
+        last_end = 0
+        for index, ch in enumerate(text.upper()):
+            state = goto[state].get(ch, 0)
+            hit = output[state]
+            if hit is not None:
+                start = index + 1 - hit[0]
+                if start >= last_end:
+                    matches.append((start, index + 1, hit[1]))
+                    last_end = index + 1
+        return matches
+    
+    def highlight_text(self, text):
+        if self.candidate is None or not self.candidate.search(text):
+            return text
+        matches = self.find(text)
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end, color in matches:
+            parts.append(text[position:start])
+            parts.append(f'<span style="background-color: {color}; font-weight: bold;">{text[start:end]}</span>')
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+    
+    def iter_chunks(self, html_content):
+        # Yield the highlighted document piece by piece (text nodes highlighted, markup verbatim)
+        skip_until = None
+        position = 0
+        for tag in HTML_TAG_PATTERN.finditer(html_content):
+            text = html_content[position:tag.start()]
+            if text:
+                yield text if skip_until else self.highlight_text(text)
+            yield tag.group(0)
+            position = tag.end()
+            
+            name = (tag.group(2) or '').lower()
+            if skip_until:
+                if tag.group(1) and name == skip_until:
+                    skip_until = None
+            elif not tag.group(1) and name in HIGHLIGHT_SKIP_TAGS and not tag.group(0).endswith('/>'):
+                skip_until = name
+        tail = html_content[position:]
+        if tail:
+            yield tail if skip_until else self.highlight_text(tail)
+
 # Function to highlight multiple target gRNA sequences in HTML with different colors
 def highlight_pam_sequence(html_content, grna_sequences=None):
     if grna_sequences is None:
         grna_sequences = ["CAGCAGCTGG","TCCAACCAGG"]  # Default gRNA sequence
     colors = ["cyan","yellow"]
-    for i, grna_sequence in enumerate(grna_sequences):
-        color = colors[i % len(colors)]
-        pattern = re.compile(re.escape(grna_sequence), re.IGNORECASE)
-        html_content = pattern.sub(
-            lambda m: f'<span style="background-color: {color}; font-weight: bold;">{m.group(0)}</span>',
-            html_content
-        )
-    return html_content
+    highlighter = GuideHighlighter(grna_sequences, colors)
+    return ''.join(highlighter.iter_chunks(html_content))
 
 # Function to process a single file
 def process_input_file(input_file_path, grna_sequences, driver):
@@ -83,10 +196,11 @@ def process_input_file(input_file_path, grna_sequences, driver):
             time.sleep(10)
         except:
             results_html = driver.page_source
-            highlighted_html = highlight_pam_sequence(results_html, grna_sequences=grna_sequences)
+            highlighter = GuideHighlighter(grna_sequences, ["cyan","yellow"])
             result_html_file_path = os.path.join(download_dir, f"{input_file_base_name}_results_highlighted.html")
             with open(result_html_file_path, "w", encoding="utf-8") as html_file:
-                html_file.write(highlighted_html)
+                for chunk in highlighter.iter_chunks(results_html):
+                    html_file.write(chunk)
             print(f"Saved results for {input_file_base_name}")
         return True  # Success
     except Exception as e:
@@ -145,5 +259,5 @@ with open(log_file_path, "a", encoding="utf-8") as log_file:
 
 driver.quit()
 
-© 2025 Tata Institute for Genetics and Society (TIGS), Bangalore, India
-All rights reserved.
+# © 2025 Tata Institute for Genetics and Society (TIGS), Bangalore, India
+# All rights reserved.
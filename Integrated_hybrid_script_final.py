@@ -5,16 +5,37 @@
 
 import os
 import time
+import argparse
 import re
 import sys
 import json
+import random
+import hashlib
+import asyncio
+import queue
+import shutil
+import sqlite3
+import socket
+import select
+import struct
+import ctypes
+import ctypes.util
+import csv
+import threading
+import atexit
+import numpy as np
 import pandas as pd
+import urllib3
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
+from collections import deque, OrderedDict, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED
+from concurrent.futures import wait as wait_futures, TimeoutError as FuturesTimeoutError
 from selenium.common.exceptions import (
     InvalidSessionIdException, TimeoutException, NoSuchElementException,
     WebDriverException, StaleElementReferenceException
@@ -22,6 +43,17 @@ from selenium.common.exceptions import (
 from Bio.Seq import Seq
 from Bio import SeqIO
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet report output is optional
+    pa = pq = None
+
+try:
+    import psutil
+except ImportError:  # Browser memory figures are optional
+    psutil = None
+
 # ==================================================================================
 # CUSTOM ERROR CLASSES
 # ==================================================================================
@@ -45,13 +77,32 @@ class PrerequisiteError(AnalysisError):
 # LOGGER CLASS - BETTER LOGGING
 # ==================================================================================
 class AnalysisLogger:
-    """Centralized logging for console and file"""
+    """
+    Centralized logging for console and file.
+    Console output is immediate; file lines are queued and written in batches by a
+    background thread (one open handle, size-based rotation), so callers never wait
+    on log file I/O. Error and warning history is bounded; the counts are exact.
+    """
     
-    def __init__(self, log_file_path):
+    def __init__(self, log_file_path, max_bytes=10 * 1024 * 1024, backup_count=3,
+                 flush_interval=0.5, batch_size=500, keep_messages=100):
         self.log_file_path = log_file_path
-        self.errors = []
-        self.warnings = []
-        
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.errors = deque(maxlen=keep_messages)
+        self.warnings = deque(maxlen=keep_messages)
+        self.error_count = 0
+        self.warning_count = 0
+        self.count_lock = threading.Lock()
+        self.owner_pid = os.getpid()
+        self.timestamp_cache = (None, '')
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+    
     def info(self, message):
         """Log info message"""
         print(message)
@@ -61,13 +112,17 @@ class AnalysisLogger:
         """Log error message"""
         print(f"✗ ERROR: {message}")
         self._write_to_file(f"[ERROR] {message}")
-        self.errors.append(message)
+        with self.count_lock:
+            self.errors.append(message)
+            self.error_count += 1
     
     def warning(self, message):
         """Log warning message"""
         print(f"WARNING: {message}")
         self._write_to_file(f"[WARNING] {message}")
-        self.warnings.append(message)
+        with self.count_lock:
+            self.warnings.append(message)
+            self.warning_count += 1
     
     def success(self, message):
         """Log success message"""
@@ -78,43 +133,189 @@ class AnalysisLogger:
         """Log debug message"""
         self._write_to_file(f"[DEBUG] {message}")
     
+    def _timestamp(self):
+        """Formatted wall-clock second, reformatted only when the second changes"""
+        second = int(time.time())
+        cached = self.timestamp_cache
+        if cached[0] != second:
+            cached = self.timestamp_cache = (second, datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S'))
+        return cached[1]
+    
+    def write_directly(self):
+        """Append each line synchronously - for ICE worker processes, which exit without atexit"""
+        self.owner_pid = None
+    
     def _write_to_file(self, message):
-        """Write message to log file with error handling"""
+        """Queue a timestamped line for the writer thread"""
+        line = f"{self._timestamp()} - {message}\n"
+        if self.owner_pid == os.getpid() and self.writer.is_alive():
+            self.queue.put(line)
+            return
+        # Forked/spawned workers (no writer thread) and messages logged after close()
         try:
             with open(self.log_file_path, 'a', encoding='utf-8') as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"{timestamp} - {message}\n")
+                f.write(line)
         except IOError as e:
             print(f" Could not write to log file: {e}")
         except Exception as e:
             print(f"Unexpected logging error: {e}")
     
+    def _open(self):
+        try:
+            return open(self.log_file_path, 'a', encoding='utf-8')
+        except IOError as e:
+            print(f" Could not write to log file: {e}")
+            return None
+    
+    def _rotate(self, log_file):
+        """analysis_log.txt -> analysis_log.txt.1 -> ... -> .<backup_count>"""
+        log_file.close()
+        try:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file_path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file_path}.{index + 1}")
+            if self.backup_count > 0:
+                os.replace(self.log_file_path, f"{self.log_file_path}.1")
+            else:
+                os.remove(self.log_file_path)
+        except OSError as e:
+            print(f" Could not rotate log file: {e}")
+        return self._open()
+    
+    def _writer_loop(self):
+        log_queue = self.queue
+        log_file = self._open()
+        stop = False
+        while not stop:
+            try:
+                batch = [log_queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Drain whatever else is waiting, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            lines, waiters = [], []
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    lines.append(item)
+            
+            if lines:
+                if log_file is None:
+                    log_file = self._open()
+                if log_file is not None:
+                    try:
+                        log_file.write(''.join(lines))
+                        log_file.flush()
+                        if self.max_bytes and log_file.tell() >= self.max_bytes:
+                            log_file = self._rotate(log_file)
+                    except IOError as e:
+                        print(f" Could not write to log file: {e}")
+                    except Exception as e:
+                        print(f"Unexpected logging error: {e}")
+            for waiter in waiters:
+                waiter.set()
+        
+        if log_file is not None:
+            log_file.close()
+    
+    def flush(self, timeout=5.0):
+        """Block until every message queued so far is on disk"""
+        if self.owner_pid != os.getpid() or not self.writer.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+    
+    def close(self):
+        """Flush and stop the writer thread (registered with atexit)"""
+        if self.owner_pid == os.getpid() and self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join(timeout=5.0)
+    
     def get_summary(self):
         """Get error and warning summary"""
-        return {
-            'error_count': len(self.errors),
-            'warning_count': len(self.warnings),
-            'errors': self.errors[:10],  # Last 10 errors
-            'warnings': self.warnings[:10]  # Last 10 warnings
-        }
+        with self.count_lock:
+            return {
+                'error_count': self.error_count,
+                'warning_count': self.warning_count,
+                'errors': list(self.errors)[-10:],  # Last 10 errors
+                'warnings': list(self.warnings)[-10:]  # Last 10 warnings
+            }
+
+def benchmark_logging(messages=20000, threads=4):
+    """Per-message cost of the queued logger vs the previous open/append/close per message"""
+    import tempfile
+    
+    def legacy_write(path, message):
+        with open(path, 'a', encoding='utf-8') as f:
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            f.write(f"{timestamp} - {message}\n")
+    
+    def timed(write, worker_count):
+        per_thread = messages // worker_count
+        def run():
+            for i in range(per_thread):
+                write(f"[DEBUG] benchmark message {i} with a typical amount of detail")
+        workers = [threading.Thread(target=run) for _ in range(worker_count)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return (time.perf_counter() - started) / (per_thread * worker_count)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.txt")
+        queued = AnalysisLogger(os.path.join(tmp, "queued.txt"))
+        results = {}
+        for worker_count in (1, threads):
+            legacy = timed(lambda m: legacy_write(legacy_path, m), worker_count)
+            enqueue = timed(queued._write_to_file, worker_count)
+            started = time.perf_counter()
+            queued.flush(timeout=60)
+            drain = time.perf_counter() - started
+            results[worker_count] = (legacy, enqueue, drain)
+        queued.close()
+    
+    print(f"Logging benchmark: {messages} file-only messages per run")
+    for worker_count, (legacy, enqueue, drain) in results.items():
+        print(f"  {worker_count} thread(s): open/append per message {legacy * 1e6:7.1f} us/msg | "
+              f"queued {enqueue * 1e6:5.1f} us/msg (writer drained the backlog {drain * 1000:.0f} ms later)")
+    return results
 
 # ==================================================================================
 # BIOPYTHON COMPATIBILITY PATCH FOR ICE
 # ==================================================================================
-try:
-    from Bio.Align import MultipleSeqAlignment
-    from Bio import AlignIO
-    from io import StringIO
-
-    def alignment_format_patch(self, format):
-        handle = StringIO()
-        AlignIO.write(self, handle, format)
-        return handle.getvalue()
+def apply_biopython_patch():
+    """Restore MultipleSeqAlignment.format for ICE (idempotent, also run in ICE worker processes)"""
+    try:
+        from Bio.Align import MultipleSeqAlignment
+        from Bio import AlignIO
+        from io import StringIO
+        
+        if getattr(getattr(MultipleSeqAlignment, 'format', None), '__name__', '') == 'alignment_format_patch':
+            return
+        
+        def alignment_format_patch(self, format):
+            handle = StringIO()
+            AlignIO.write(self, handle, format)
+            return handle.getvalue()
+        
+        MultipleSeqAlignment.format = alignment_format_patch
+        print("Biopython compatibility patch applied.")
+    except Exception as e:
+        print(f"Warning: Could not apply Biopython patch: {e}")
 
-    MultipleSeqAlignment.format = alignment_format_patch
-    print("Biopython compatibility patch applied.")
-except Exception as e:
-    print(f"Warning: Could not apply Biopython patch: {e}")
+apply_biopython_patch()
 
 # ==================================================================================
 # CONFIGURATION - UPDATE THESE PATHS
@@ -122,6 +323,7 @@ except Exception as e:
 # Input/Output Directories
 input_folder_path = r""
 wild_type_file_path = r""
+MANIFEST_PATH = r""  # Optional CSV mapping samples to their own wildtype, guides and trims (see load_manifest)
 download_dir = r""
 log_file_path = os.path.join(download_dir, "analysis_log.txt")
 
@@ -134,12 +336,136 @@ ice_source_path = r"C:\Users\Vandana.S\Desktop\TIGS\Automation_new\HYBRID_WORK\i
 # Analysis Parameters
 grna_sequences = [""]
 ICE_TARGET_SEQUENCE_FALLBACK = ""
+INDIGO_LEFT_TRIM = 50  # Left chromatogram trim size (INDIGO form default)
+INDIGO_RIGHT_TRIM = 50  # Right chromatogram trim size (INDIGO form default)
+INDIGO_PEAK_RATIO = 33  # Peak percentage to call bases (INDIGO form default)
+ICE_INDEL_WINDOW = 10  # Bases either side of the cut site searched for indels in ICE alignments
+
+# INDIGO Backend Configuration
+INDIGO_BACKEND = "selenium"  # "selenium" (browser), "http" (direct API submission) or "local" (offline NumPy engine)
+INDIGO_URL = "https://www.gear-genomics.com/indigo/"
+INDIGO_API_URL = "https://gear-genomics.embl.de/indigo/api/v1"
+
+# Local Engine Configuration (INDIGO_BACKEND = "local")
+LOCAL_MAX_INDEL = 30  # Largest insertion/deletion (bp) considered in the decomposition
+LOCAL_MIN_ALLELE_FRACTION = 0.05  # Decomposition components below this fraction are ignored
+LOCAL_BREAK_WINDOW = 20  # Bases per window when searching for the start of mixed/mismatched peaks
+LOCAL_BREAK_FRACTION = 0.3  # Fraction of mixed/mismatched bases in a window that marks the break
+LOCAL_ALIGN_PREFIX = 100  # Leading (trimmed) bases used to align the sample to the wildtype
+LOCAL_DECOMPOSITION_WINDOW = 100  # Bases after the break point used for the decomposition
+
+# Browser Configuration (INDIGO_BACKEND = "selenium")
+BROWSER_PROFILE = "full"  # "full" (visible Chrome, everything loaded) or "lean" (headless, assets blocked, persistent cache)
+BROWSER_BLOCKED_URLS = [  # Requests dropped by the lean profile - nothing the result extraction reads
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.svg", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fontawesome*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+BROWSER_CACHE_MB = 200  # Disk cache per browser slot (lean profile)
+BROWSER_WINDOW_SIZE = "1280,900"  # Headless viewport; Plotly lays out the result charts for this size
+
+# Browser Session Health Configuration
+SESSION_RECYCLE_SAMPLES = 100  # Replace a browser after this many samples (0 = never)
+SESSION_RECYCLE_RSS_MB = 1500  # Replace a browser whose Chrome processes exceed this RSS (needs psutil; 0 = never)
+SESSION_RECYCLE_ERROR_RATE = 0.5  # Replace a browser when this fraction of its recent INDIGO attempts failed
+SESSION_ERROR_WINDOW = 10  # Recent INDIGO attempts the error rate is computed over
+SESSION_WARM_SPARES = 1  # Started and warmed browsers waiting to replace a recycled one
 
 # Retry Configuration
 MAX_RETRIES_INDIGO = 2  # Max retries for INDIGO analysis
 MAX_RETRIES_ICE = 1  # Max retries for ICE analysis
-INDIGO_WAIT_TIME = 15  # Seconds to wait for INDIGO analysis
+INDIGO_WAIT_TIME = 15  # Extra seconds (on top of DRIVER_TIMEOUT) allowed for INDIGO analysis
 DRIVER_TIMEOUT = 30  # Selenium WebDriver timeout
+DOWNLOAD_TIMEOUT = 30  # Max seconds to wait for the "Download HTML" file to land on disk
+WAIT_POLL_INTERVAL = 0.25  # Polling interval for event-driven waits
+RETRY_BUDGETS = {  # Retries per sample and INDIGO error class (see classify_indigo_error)
+    'connection': MAX_RETRIES_INDIGO,  # API/site unreachable
+    'timeout': 0,  # Page, result or download timeouts - already cost DRIVER_TIMEOUT each
+    'stale': MAX_RETRIES_INDIGO,  # Page changed under Selenium
+    'session': 1,  # Browser crashed (the session is always replaced)
+}
+RETRY_BASE_DELAY = 2  # Backoff before retry n is random(0, RETRY_BASE_DELAY * 2^n) seconds
+RETRY_MAX_DELAY = 30  # Cap of the backoff delay
+
+# Circuit Breaker Configuration
+BREAKER_ENABLED = True  # Send samples straight to ICE while INDIGO is failing or overloaded
+BREAKER_WINDOW = 20  # Recent INDIGO samples the failure and slow rates are computed over
+BREAKER_MIN_SAMPLES = 5  # Samples in the window before the breaker can open
+BREAKER_FAILURE_RATE = 0.5  # Open when this fraction of recent samples failed (rejected samples do not count)
+BREAKER_SLOW_SECONDS = 120  # A sample whose INDIGO attempts took longer than this counts as slow
+BREAKER_SLOW_RATE = 0.8  # Open when this fraction of recent samples were slow
+BREAKER_OPEN_SECONDS = 120  # Seconds the breaker stays open before one probe sample is tried
+BREAKER_MAX_OPEN_SECONDS = 900  # Cap of the open time, which doubles after every failed probe
+
+# Fixed sleeps of the original browser flow that event-driven waits replaced (upload verify,
+# tab click, wildtype verify, submit click, download) - used to report the time saved.
+# INDIGO's own compute time is not a sleep and is left out of the comparison.
+LEGACY_FIXED_SLEEPS = 2 + 1 + 2 + 1 + 5
+
+# Validation Configuration
+VALIDATION_WORKERS = 4  # Threads parsing .ab1 files while the first samples are already being analyzed
+RECORD_CACHE_SIZE = 64  # Parsed .ab1 records kept in memory for reuse by later stages
+
+# Pre-flight QC Configuration (checked on the trimmed read INDIGO analyzes, before submission)
+QC_ENABLED = True  # Measure every sample's chromatogram quality while it is parsed
+QC_FAIL_ACTION = "skip"  # Samples failing QC: "skip" (report only), "ice" (skip INDIGO, run ICE) or "flag" (analyze as usual)
+QC_MIN_MEAN_PHRED = 20  # Minimum mean base quality
+QC_MIN_SNR = 4.0  # Minimum signal-to-noise: called peak over the mean of the other channels (median before the cut site)
+QC_MIN_CLEAN_LENGTH = 100  # Minimum bases in the longest high-quality stretch
+QC_CLEAN_PHRED = 20  # Rolling mean quality that counts as high quality for the clean length
+QC_CLEAN_WINDOW = 10  # Bases in the rolling quality window
+QC_GUIDE_MAX_MISMATCHES = 2  # A guide (or its reverse complement) matching with at most this many mismatches is present
+QC_REQUIRE_GUIDE = False  # Also fail samples whose base calls do not contain any of their guides
+
+# Parallel Execution Configuration
+NUM_WORKERS = 1  # Number of concurrent browser sessions (each gets its own download directory)
+PIPELINE_MODE = "pool"  # "pool" (one thread per worker) or "async" (asyncio stage pipeline)
+ASYNC_UPLOAD_CONCURRENCY = 4  # Concurrent INDIGO submissions (browser backend is also capped by NUM_WORKERS)
+ASYNC_POLL_CONCURRENCY = 8  # Concurrent INDIGO result polls (HTTP backend)
+ASYNC_SAVE_CONCURRENCY = 2  # Concurrent result saves / download collection
+ASYNC_ICE_CONCURRENCY = 2  # Concurrent ICE fallbacks (raised to the ICE process count when the pool is on)
+ICE_USE_PROCESS_POOL = True  # Run ICE fallbacks in separate processes so they never block INDIGO submission
+ICE_PROCESS_WORKERS = 0  # ICE worker processes (0 = one per available CPU core)
+
+# Hedged Execution Configuration
+HEDGE_ENABLED = False  # Start ICE in parallel when an INDIGO submission is slower than usual
+HEDGE_PERCENTILE = 90  # Observed INDIGO latency percentile after which ICE is started
+HEDGE_MIN_OBSERVATIONS = 5  # INDIGO latencies needed before the percentile is trusted
+HEDGE_DEFAULT_DELAY = DRIVER_TIMEOUT  # Hedge delay (seconds) until enough latencies are observed
+HEDGE_KEEP_BOTH = False  # Keep both engines' results instead of only the first good one
+
+# Result Cache Configuration
+RESULT_CACHE_ENABLED = True  # Skip samples whose chromatograms and settings were already analyzed
+RESULT_CACHE_MAX_MB = 500  # Size bound of the on-disk cache (least recently used entries are evicted)
+
+# Run Journal Configuration
+JOURNAL_ENABLED = True  # Record every sample's progress in a SQLite journal (enables --resume)
+
+# Distributed Execution Configuration (--coordinator / --worker)
+LEASE_SECONDS = 300  # A claimed sample returns to the queue if its worker stops renewing the lease for this long
+LEASE_RENEW_INTERVAL = 60  # Seconds between lease renewals by a worker
+QUEUE_POLL_INTERVAL = 5  # Seconds between queue checks when nothing can be claimed / coordinator progress updates
+QUEUE_MAX_ATTEMPTS = 3  # Claims of one sample before it is reported failed (e.g. it keeps crashing workers)
+
+# Watch Folder Configuration (--watch)
+WATCH_POLL_INTERVAL = 2  # Seconds between folder checks (the folder is polled when inotify is unavailable)
+WATCH_SETTLE_SECONDS = 5  # Without a close event, a new file counts as written once unchanged this long
+WATCH_MAX_SETTLE_SECONDS = 600  # Stop waiting for a file that stays unreadable this long after its last change (INDIGO/ICE then report it)
+WATCH_RESCAN_INTERVAL = 60  # Full folder scans alongside inotify (catches files written by other hosts on a share)
+WATCH_PROCESS_EXISTING = True  # Also analyze the .ab1 files already in the folder at startup (cached ones are instant)
+WATCH_KEEPALIVE_SECONDS = 300  # Reload the INDIGO page of a browser idle this long, so arrivals find a warm session
+WATCH_METRICS_INTERVAL = 60  # Seconds between rewrites of the stage metrics while watching
+
+# Log File Configuration
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate analysis_log.txt beyond this size
+LOG_BACKUP_COUNT = 3  # Rotated log files kept (analysis_log.txt.1 ... .3)
+LOG_FLUSH_INTERVAL = 0.5  # Max seconds a log line waits in memory before being written
+
+# Report Configuration
+REPORT_FLUSH_INTERVAL = 5.0  # Seconds between appends of finished rows to the report files
+REPORT_FLUSH_ROWS = 50  # Flush sooner once this many finished rows are waiting
+REPORT_PARQUET = True  # Also write a Parquet copy of the report (requires pyarrow)
+METRICS_PROMETHEUS_FILE = "run_metrics.prom"  # Stage histograms for the node_exporter textfile collector (overwritten each run)
 
 # ==================================================================================
 # CREATE OUTPUT DIRECTORY STRUCTURE
@@ -148,19 +474,78 @@ try:
     os.makedirs(download_dir, exist_ok=True)
     indigo_output_dir = download_dir
     ice_output_dir = os.path.join(os.path.dirname(download_dir), "ICE_RESULTS")
+    result_cache_dir = os.path.join(os.path.dirname(download_dir), "RESULT_CACHE")
+    journal_path = os.path.join(os.path.dirname(download_dir), "run_journal.sqlite")
+    browser_cache_dir = os.path.join(os.path.dirname(download_dir), "BROWSER_CACHE")
     os.makedirs(ice_output_dir, exist_ok=True)
 except OSError as e:
     print(f" Failed to create output directories: {e}")
     sys.exit(1)
 
 # Initialize logger
-logger = AnalysisLogger(log_file_path)
+logger = AnalysisLogger(log_file_path, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_FLUSH_INTERVAL)
 logger.info(f"Log file created at: {log_file_path}")
 
 # ==================================================================================
 # VALIDATION & SETUP
 # ==================================================================================
-def validate_prerequisites():
+class RecordCache:
+    """Bounded LRU cache of parsed .ab1 records, keyed by path and modification time"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.records = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def _key(self, file_path):
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+    
+    def load(self, file_path):
+        """Return the parsed record, reading the file only on a cache miss"""
+        key = self._key(file_path)
+        with self.lock:
+            if key in self.records:
+                self.records.move_to_end(key)
+                return self.records[key]
+        
+        record = SeqIO.read(file_path, "abi")
+        with self.lock:
+            self.records[key] = record
+            while len(self.records) > self.max_entries:
+                self.records.popitem(last=False)
+        return record
+
+record_cache = RecordCache(RECORD_CACHE_SIZE)
+
+def read_ab1(file_path):
+    """Parse an .ab1 file through the shared record cache"""
+    return record_cache.load(file_path)
+
+def validate_sample(file_name):
+    """
+    Parse one sample (filling the record cache) and run its pre-flight QC.
+    Returns an error message or None.
+    """
+    try:
+        record = read_ab1(os.path.join(input_folder_path, file_name))
+    except Exception as e:
+        return str(e)
+    if QC_ENABLED:
+        try:
+            preflight_qc(file_name, record)
+        except Exception as e:
+            logger.warning(f"Pre-flight QC failed to run for {file_name}: {e}")
+    return None
+
+def report_unreadable_files(unreadable_files):
+    """Log samples that could not be parsed as .ab1"""
+    if unreadable_files:
+        logger.warning(f"{len(unreadable_files)} file(s) cannot be read as .ab1:")
+        for fname, error in unreadable_files[:5]:
+            logger.warning(f"  - {fname}: {error[:50]}")
+
+def validate_prerequisites(check_browser=True, require_samples=True):
     """Validate all prerequisites before starting with detailed error handling"""
     logger.info("\n" + "="*80)
     logger.info("VALIDATING PREREQUISITES")
@@ -176,29 +561,6 @@ def validate_prerequisites():
         
         logger.success(f"Input folder exists: {input_folder_path}")
         
-        # Check wildtype file
-        if not os.path.exists(wild_type_file_path):
-            raise PrerequisiteError(f"Wildtype file not found: {wild_type_file_path}")
-        
-        if not os.path.isfile(wild_type_file_path):
-            raise PrerequisiteError(f"Wildtype path is not a file: {wild_type_file_path}")
-        
-        # Try to read wildtype file
-        try:
-            record = SeqIO.read(wild_type_file_path, "abi")
-            logger.success(f"Wildtype file valid (.ab1 format): {os.path.basename(wild_type_file_path)}")
-        except Exception as e:
-            raise PrerequisiteError(f"Wildtype file cannot be read as .ab1: {e}")
-        
-        # Check ChromeDriver
-        if not os.path.exists(chromedriver_path):
-            raise PrerequisiteError(f"ChromeDriver not found: {chromedriver_path}")
-        
-        if not os.path.isfile(chromedriver_path):
-            raise PrerequisiteError(f"ChromeDriver path is not a file: {chromedriver_path}")
-        
-        logger.success(f"ChromeDriver found")
-        
         # Check input files
         try:
             all_files = os.listdir(input_folder_path)
@@ -206,25 +568,48 @@ def validate_prerequisites():
         except OSError as e:
             raise PrerequisiteError(f"Cannot read input folder: {e}")
         
-        if not ab1_files:
+        if not ab1_files and require_samples:
             raise PrerequisiteError(f"No .ab1 files found in: {input_folder_path}")
         
-        logger.success(f"Found {len(ab1_files)} .ab1 files to process")
+        # Load the sample manifest
+        if MANIFEST_PATH:
+            sample_settings.clear()
+            sample_settings.update(load_manifest(MANIFEST_PATH))
+            missing = sorted(set(sample_settings) - set(ab1_files))
+            if missing:
+                logger.warning(f"{len(missing)} manifest sample(s) not in the input folder (e.g. {missing[0]})")
+            unlisted = len(set(ab1_files) - set(sample_settings))
+            logger.success(f"Manifest loaded: {len(sample_settings)} samples"
+                           + (f" ({unlisted} unlisted sample(s) use the default settings)" if unlisted else ""))
         
-        # Verify each file can be read
-        unreadable_files = []
-        for ab1_file in ab1_files:
-            file_path = os.path.join(input_folder_path, ab1_file)
+        # Check every wildtype file in use, once per reference
+        wildtypes = sorted({settings_for(f).wildtype for f in ab1_files} or {wild_type_file_path})
+        for wildtype_path in wildtypes:
+            if not os.path.exists(wildtype_path):
+                raise PrerequisiteError(f"Wildtype file not found: {wildtype_path}")
+            
+            if not os.path.isfile(wildtype_path):
+                raise PrerequisiteError(f"Wildtype path is not a file: {wildtype_path}")
+            
+            # Try to read wildtype file
             try:
-                SeqIO.read(file_path, "abi")
+                record = read_ab1(wildtype_path)
+                logger.success(f"Wildtype file valid (.ab1 format): {os.path.basename(wildtype_path)}")
             except Exception as e:
-                unreadable_files.append((ab1_file, str(e)))
+                raise PrerequisiteError(f"Wildtype file {os.path.basename(wildtype_path)} cannot be read as .ab1: {e}")
+        
+        # Check ChromeDriver (only the browser backend drives Chrome)
+        if check_browser and INDIGO_BACKEND == "selenium":
+            if not os.path.exists(chromedriver_path):
+                raise PrerequisiteError(f"ChromeDriver not found: {chromedriver_path}")
+            
+            if not os.path.isfile(chromedriver_path):
+                raise PrerequisiteError(f"ChromeDriver path is not a file: {chromedriver_path}")
+            
+            logger.success(f"ChromeDriver found")
         
-        if unreadable_files:
-            logger.warning(f"{len(unreadable_files)} file(s) cannot be read as .ab1:")
-            for fname, error in unreadable_files[:5]:
-                logger.warning(f"  - {fname}: {error[:50]}")
-            # Continue anyway, but track these
+        logger.success(f"Found {len(ab1_files)} .ab1 files to process")
+        # Each sample is parsed by the worker pool as it is queued (see WorkerPool._feed)
         
         logger.info("="*80 + "\n")
         return ab1_files
@@ -238,6 +623,132 @@ def validate_prerequisites():
         logger.debug(traceback.format_exc())
         sys.exit(1)
 
+# ==================================================================================
+# SAMPLE MANIFEST - PER-SAMPLE REFERENCES AND REFERENCE GROUPS
+# ==================================================================================
+SampleSettings = namedtuple('SampleSettings', 'wildtype guides ice_guide left_trim right_trim')
+MANIFEST_COLUMNS = ['sample', 'wildtype', 'guides', 'ice_guide', 'left_trim', 'right_trim']
+GUIDE_PATTERN = re.compile(r'^[ACGTN]+$', re.IGNORECASE)
+
+sample_settings = {}  # file name -> SampleSettings from the manifest (other samples use the globals)
+
+def default_settings():
+    """Settings of samples not listed in the manifest (the configuration globals)"""
+    return SampleSettings(wild_type_file_path, tuple(grna_sequences), ICE_TARGET_SEQUENCE_FALLBACK,
+                          INDIGO_LEFT_TRIM, INDIGO_RIGHT_TRIM)
+
+def settings_for(file_name):
+    """Wildtype, guides and trims of one sample"""
+    return sample_settings.get(file_name) or default_settings()
+
+def load_manifest(manifest_path):
+    """
+    Read a sample manifest CSV with the columns sample, wildtype, guides, ice_guide,
+    left_trim and right_trim. Only 'sample' is required; empty cells fall back to the
+    configuration globals. Guides are separated by ';' or spaces, relative wildtype paths
+    are relative to the manifest. Returns {file name: SampleSettings}.
+    """
+    try:
+        with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            header = [name.strip().lower() for name in reader.fieldnames or []]
+            rows = list(reader)
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        raise PrerequisiteError(f"Cannot read manifest {manifest_path}: {e}")
+    
+    if 'sample' not in header:
+        raise PrerequisiteError(f"Manifest has no 'sample' column: {manifest_path}")
+    unknown = [name for name in header if name not in MANIFEST_COLUMNS]
+    if unknown:
+        logger.warning(f"Ignoring unknown manifest columns: {', '.join(unknown)}")
+    
+    defaults = default_settings()
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    settings = {}
+    for line, row in enumerate(rows, start=2):
+        row = {name.strip().lower(): (value or '').strip() for name, value in row.items() if name}
+        sample = row.get('sample')
+        if not sample:
+            continue
+        if not sample.endswith('.ab1'):
+            sample += '.ab1'
+        if sample in settings:
+            raise PrerequisiteError(f"Manifest line {line}: {sample} is listed twice")
+        
+        wildtype = row.get('wildtype')
+        wildtype = os.path.join(manifest_dir, wildtype) if wildtype else defaults.wildtype
+        guides = tuple(re.split(r'[;\s]+', row['guides'])) if row.get('guides') else defaults.guides
+        bad_guides = [guide for guide in guides if guide and not GUIDE_PATTERN.match(guide)]
+        if bad_guides:
+            raise PrerequisiteError(f"Manifest line {line}: invalid guide sequence {bad_guides[0]}")
+        # A row with its own guides targets another locus - its first guide is the ICE target
+        ice_guide = row.get('ice_guide') or (guides[0] if row.get('guides') else defaults.ice_guide)
+        try:
+            left_trim = int(row['left_trim']) if row.get('left_trim') else defaults.left_trim
+            right_trim = int(row['right_trim']) if row.get('right_trim') else defaults.right_trim
+        except ValueError:
+            raise PrerequisiteError(f"Manifest line {line}: trims must be whole numbers")
+        settings[sample] = SampleSettings(wildtype, guides, ice_guide.upper(), left_trim, right_trim)
+    
+    if not settings:
+        raise PrerequisiteError(f"Manifest lists no samples: {manifest_path}")
+    return settings
+
+def group_by_reference(file_names):
+    """
+    Order samples so that samples sharing wildtype and settings run back to back (groups in
+    order of first appearance); per-reference work is then reused while a group runs.
+    """
+    groups = OrderedDict()
+    for file_name in file_names:
+        groups.setdefault(settings_for(file_name), []).append(file_name)
+    return [file_name for group in groups.values() for file_name in group]
+
+class ReferenceCache:
+    """Values derived from a wildtype file, computed once per reference (keyed by path, mtime and size)"""
+    
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def get(self, wildtype_path, extra, compute):
+        stat = os.stat(wildtype_path)
+        key = (os.path.abspath(wildtype_path), stat.st_mtime, stat.st_size) + tuple(extra)
+        with self.lock:
+            if key in self.values:
+                return self.values[key]
+        value = compute()
+        with self.lock:
+            self.values[key] = value
+        return value
+
+reference_cache = ReferenceCache()
+
+def read_reference_bytes(wildtype_path):
+    """Wildtype chromatogram bytes for upload, read once per reference"""
+    def read():
+        with open(wildtype_path, 'rb') as f:
+            return f.read()
+    return reference_cache.get(wildtype_path, ('bytes',), read)
+
+def ice_guide_error(wildtype_path, guide):
+    """
+    Control-side ICE precheck, done once per reference and guide: ICE fails for every sample
+    of a group whose guide is not in the wildtype basecalls. Returns an error message or None.
+    """
+    def check():
+        sequence = str(read_ab1(wildtype_path).seq).upper()
+        target = guide.upper()
+        if target in sequence or str(Seq(target).reverse_complement()) in sequence:
+            return None
+        return "Target sequence not found in control sequence"
+    return reference_cache.get(wildtype_path, ('ice_guide', guide.upper()), check)
+
+def ice_args(input_file_path):
+    """process_with_ice arguments of a sample: (path, ICE guide, wildtype path)"""
+    settings = settings_for(os.path.basename(input_file_path))
+    return input_file_path, settings.ice_guide, settings.wildtype
+
 # ==================================================================================
 # LOAD ICE MODULE
 # ==================================================================================
@@ -266,26 +777,213 @@ def load_ice_module():
 single_sanger_analysis = load_ice_module()
 ICE_AVAILABLE = single_sanger_analysis is not None
 
+# ==================================================================================
+# STAGE TIMING - PER-SAMPLE SPANS AND RUN METRICS
+# ==================================================================================
+STAGE_NAMES = [
+    'page_load', 'upload', 'tab_click', 'wildtype_upload', 'submit', 'indigo_compute', 'download', 'save',
+    'ice_setup', 'ice_analysis', 'ice_parse'
+]
+STAGE_HISTOGRAM_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300]
+
+def stage_column(stage):
+    """Report column of a stage ('page_load' -> 'Stage_Page_Load_s')"""
+    return f"Stage_{stage.title()}_s"
+
+STAGE_COLUMNS = [stage_column(stage) for stage in STAGE_NAMES] + ['Sample_Total_s']
+
+@contextmanager
+def timed_stage(stats, stage):
+    """Add the wall time of the enclosed block to stats['stage_seconds'][stage]"""
+    stage_seconds = stats.setdefault('stage_seconds', {})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds[stage] = stage_seconds.get(stage, 0.0) + time.perf_counter() - started
+
+def stage_columns(stage_seconds):
+    """Report columns for a {stage: seconds} dict"""
+    return {stage_column(stage): f"{seconds:.3f}" for stage, seconds in (stage_seconds or {}).items()}
+
+class StageMetrics:
+    """
+    Collects the per-sample stage columns of every finished row and aggregates them into
+    histograms. Timings of a failed INDIGO attempt are held until the sample's final
+    (ICE) row is recorded, so the time INDIGO cost is not lost from that row.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {column: [] for column in STAGE_COLUMNS}
+        self.held = {}
+        self.samples = 0
+        self.run_started = time.time()
+    
+    def hold(self, file_name, stats):
+        """Keep the stage timings of a failed INDIGO attempt for the sample's final row"""
+        columns = stage_columns(stats.get('stage_seconds'))
+        if columns:
+            with self.lock:
+                self.held[file_name] = columns
+    
+    def observe(self, record, total_seconds=None):
+        """Complete a finished row's stage columns (in place) and add them to the histograms"""
+        with self.lock:
+            for column, value in self.held.pop(record.get('Sample'), {}).items():
+                record.setdefault(column, value)
+            if total_seconds is not None:
+                record['Sample_Total_s'] = f"{total_seconds:.3f}"
+            self.samples += 1
+            for column in STAGE_COLUMNS:
+                value = coerce_report_value(record.get(column), 'float')
+                if value is not None:
+                    self.durations[column].append(value)
+    
+    def snapshot(self):
+        """Run totals plus count/sum/mean/p50/p95/p99/max and histogram buckets per stage"""
+        with self.lock:
+            durations = {column: np.asarray(values) for column, values in self.durations.items() if values}
+            samples = self.samples
+        elapsed = time.time() - self.run_started
+        stages = {}
+        for column, values in durations.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stages[column] = {
+                'count': int(values.size),
+                'sum': round(float(values.sum()), 3),
+                'mean': round(float(values.mean()), 3),
+                'p50': round(float(p50), 3),
+                'p95': round(float(p95), 3),
+                'p99': round(float(p99), 3),
+                'max': round(float(values.max()), 3),
+                # Cumulative counts per upper bound, as in a Prometheus histogram
+                'buckets': {str(bound): int((values <= bound).sum()) for bound in STAGE_HISTOGRAM_BUCKETS},
+            }
+        return {
+            'run_started': datetime.fromtimestamp(self.run_started).strftime('%Y-%m-%d %H:%M:%S'),
+            'run_seconds': round(elapsed, 3),
+            'samples': samples,
+            'samples_per_minute': round(samples / elapsed * 60, 3) if elapsed > 0 else 0.0,
+            'stages': stages,
+        }
+    
+    def write(self, json_path, prometheus_path, collectors=None):
+        """
+        Write the snapshot as JSON and as a Prometheus textfile-collector file. 'collectors'
+        maps a section name to an object with snapshot() and prometheus_lines() to include.
+        """
+        snapshot = self.snapshot()
+        for name, collector in (collectors or {}).items():
+            snapshot[name] = collector.snapshot()
+        with open(json_path, 'w', encoding='utf-8') as json_file:
+            json.dump(snapshot, json_file, indent=2)
+        
+        lines = [
+            "# HELP hybrid_run_samples Samples finished in the last run",
+            "# TYPE hybrid_run_samples gauge",
+            f"hybrid_run_samples {snapshot['samples']}",
+            "# HELP hybrid_run_duration_seconds Wall time of the last run",
+            "# TYPE hybrid_run_duration_seconds gauge",
+            f"hybrid_run_duration_seconds {snapshot['run_seconds']}",
+            "# HELP hybrid_run_samples_per_minute Throughput of the last run",
+            "# TYPE hybrid_run_samples_per_minute gauge",
+            f"hybrid_run_samples_per_minute {snapshot['samples_per_minute']}",
+            "# HELP hybrid_stage_seconds Per-sample time spent in each pipeline stage",
+            "# TYPE hybrid_stage_seconds histogram",
+        ]
+        for column, stats in snapshot['stages'].items():
+            stage = column[len('Stage_'):-len('_s')].lower() if column.startswith('Stage_') else 'sample_total'
+            for bound, count in stats['buckets'].items():
+                lines.append(f'hybrid_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'hybrid_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'hybrid_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]}')
+            lines.append(f'hybrid_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [
+            "# HELP hybrid_stage_seconds_quantile Per-stage latency quantiles of the last run",
+            "# TYPE hybrid_stage_seconds_quantile gauge",
+        ]
+        for column, stats in snapshot['stages'].items():
+            stage = column[len('Stage_'):-len('_s')].lower() if column.startswith('Stage_') else 'sample_total'
+            for quantile in ('p50', 'p95', 'p99'):
+                lines.append(f'hybrid_stage_seconds_quantile{{stage="{stage}",quantile="0.{quantile[1:]}"}} {stats[quantile]}')
+        for collector in (collectors or {}).values():
+            lines += collector.prometheus_lines()
+        
+        # Write-then-rename so a textfile collector never reads a partial file
+        temporary_path = prometheus_path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as prometheus_file:
+            prometheus_file.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, prometheus_path)
+        return snapshot
+
+stage_metrics = StageMetrics()
+
 # ==================================================================================
 # SELENIUM FUNCTIONS - IMPROVED ERROR HANDLING
 # ==================================================================================
-def init_driver():
-    """Initialize WebDriver with error handling"""
+def browser_cache_path(download_path):
+    """Persistent disk cache of a browser slot, reused by every session the slot starts"""
+    if not download_path or os.path.abspath(download_path) == os.path.abspath(indigo_output_dir):
+        slot = "worker_1"
+    else:
+        slot = os.path.basename(os.path.normpath(download_path))
+    return os.path.join(browser_cache_dir, slot)
+
+def init_driver(download_path=None, profile=None, slot=None):
+    """
+    Initialize WebDriver with error handling.
+    The "lean" profile runs headless with images, fonts and trackers blocked and a disk cache
+    that survives session restarts; "full" is the visible browser of the original script.
+    'slot' names the cache directory when it is not the download directory's own.
+    """
+    profile = profile or BROWSER_PROFILE
     try:
         service = Service(chromedriver_path)
         service.log_path = os.devnull
         options = webdriver.ChromeOptions()
         
-        prefs = {"download.default_directory": indigo_output_dir}
-        options.add_experimental_option("prefs", prefs)
+        prefs = {
+            "download.default_directory": download_path or indigo_output_dir,
+            "download.prompt_for_download": False,
+        }
         options.add_argument("--log-level=3")
         options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        # options.add_argument("--headless=new")
         
+        if profile == "lean":
+            # Each slot keeps its own cache directory - concurrent Chrome processes cannot share one
+            cache_path = os.path.join(browser_cache_dir, slot) if slot else browser_cache_path(download_path)
+            os.makedirs(cache_path, exist_ok=True)
+            prefs["profile.managed_default_content_settings.images"] = 2
+            for argument in (
+                "--headless=new",
+                f"--window-size={BROWSER_WINDOW_SIZE}",
+                f"--disk-cache-dir={cache_path}",
+                f"--disk-cache-size={BROWSER_CACHE_MB * 1024 * 1024}",
+                "--disable-gpu",
+                "--disable-extensions",
+                "--disable-dev-shm-usage",
+                "--disable-background-networking",
+                "--disable-component-update",
+                "--disable-default-apps",
+                "--disable-sync",
+                "--no-first-run",
+                "--mute-audio",
+                "--renderer-process-limit=2",
+                "--disable-features=Translate,OptimizationHints,MediaRouter",
+            ):
+                options.add_argument(argument)
+        
+        options.add_experimental_option("prefs", prefs)
         driver = webdriver.Chrome(service=service, options=options)
         driver.set_page_load_timeout(DRIVER_TIMEOUT)
         driver.set_script_timeout(DRIVER_TIMEOUT)
         
+        if profile == "lean" and BROWSER_BLOCKED_URLS:
+            # Blocked requests fail fast inside Chrome instead of being fetched on every driver.get
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BROWSER_BLOCKED_URLS})
+        
         return driver
         
     except WebDriverException as e:
@@ -293,8 +991,197 @@ def init_driver():
     except Exception as e:
         raise IndigoError(f"Unexpected error initializing WebDriver: {e}")
 
+def browser_rss(driver):
+    """Resident memory (bytes) of a session's Chrome processes, or None without psutil"""
+    if psutil is None:
+        return None
+    try:
+        chromedriver = psutil.Process(driver.service.process.pid)
+        return sum(process.memory_info().rss for process in chromedriver.children(recursive=True))
+    except (psutil.Error, AttributeError):
+        return None
+
+def benchmark_browser(profiles=("full", "lean"), loads=5, sample_path=None):
+    """
+    Compare browser profiles: INDIGO page-load time (first load and warm average), Chrome RSS
+    and, given a sample, whether the result columns are still extracted.
+    """
+    results = {}
+    for profile in profiles:
+        download_path = os.path.join(indigo_output_dir, f"browser_benchmark_{profile}")
+        os.makedirs(download_path, exist_ok=True)
+        driver = init_driver(download_path, profile)
+        try:
+            load_times = []
+            for _ in range(loads):
+                started = time.perf_counter()
+                driver.get(INDIGO_URL)
+                WebDriverWait(driver, DRIVER_TIMEOUT).until(EC.presence_of_element_located((By.ID, "btn-submit")))
+                load_times.append(time.perf_counter() - started)
+            result = {
+                'first_load_s': load_times[0],
+                'warm_load_s': sum(load_times[1:]) / max(len(load_times) - 1, 1),
+                'rss_mb': (browser_rss(driver) or 0) / (1024 * 1024) if psutil is not None else None,
+            }
+            
+            if sample_path:
+                stats = {}
+                success, error = process_input_file(sample_path, grna_sequences, driver, download_path=download_path, stats=stats)
+                parsed = parse_indigo_result_file(stats['result_file']) if success and stats.get('result_file') else {}
+                result['extracted_columns'] = sum(1 for value in parsed.values() if value not in (None, ''))
+                result['extraction_error'] = error
+                result['sample_s'] = sum(stats.get('stage_seconds', {}).values())
+            results[profile] = result
+        finally:
+            driver.quit()
+    
+    logger.info(f"Browser profile benchmark: {INDIGO_URL}, {loads} page loads per profile")
+    for profile, result in results.items():
+        rss = f"{result['rss_mb']:7.0f} MB" if result['rss_mb'] is not None else "    n/a (install psutil)"
+        line = (f"  {profile:<5} first load {result['first_load_s']:6.2f} s | warm load {result['warm_load_s']:6.2f} s | "
+                f"RSS {rss}")
+        if 'extracted_columns' in result:
+            outcome = result['extraction_error'] or f"{result['extracted_columns']}/{len(INDIGO_RESULT_COLUMNS)} result columns"
+            line += f" | sample {result['sample_s']:.1f} s, {outcome}"
+        logger.info(line)
+    return results
+
+HIGHLIGHT_COLORS = ["cyan"]
+HIGHLIGHT_SKIP_TAGS = ("script", "style")  # Text inside these elements is never highlighted
+HTML_TAG_PATTERN = re.compile(r'<(/?)([A-Za-z][A-Za-z0-9]*)?[^>]*>|<!--.*?-->', re.DOTALL)
+COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
+
+def reverse_complement(sequence):
+    return sequence.translate(COMPLEMENT)[::-1]
+
+class GuideHighlighter:
+    """
+    Aho-Corasick automaton over all gRNAs and their reverse complements.
+    Scans each HTML text node once for every guide; tags, attributes and
+    <script>/<style> content are copied through untouched.
+    """
+    
+    def __init__(self, grna_sequences, colors=None):
+        colors = colors or HIGHLIGHT_COLORS
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # (length, color) of the longest pattern ending at each state
+        
+        for i, grna_sequence in enumerate(grna_sequences):
+            if not grna_sequence:
+                logger.warning(f"Empty gRNA sequence at index {i}")
+                continue
+            color = colors[i % len(colors)]
+            for pattern in {grna_sequence.upper(), reverse_complement(grna_sequence.upper())}:
+                self._add(pattern, color)
+        lengths = [out[0] for out in self.output if out is not None]
+        # Text nodes without a long enough run of pattern letters are skipped at C speed
+        letters = ''.join(sorted({ch for state in self.goto for ch in state}))
+        self.candidate = re.compile(f"[{re.escape(letters + letters.lower())}]{{{min(lengths)}}}") if lengths else None
+        self._build()
+    
+    def _add(self, pattern, color):
+        state = 0
+        for ch in pattern:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state] = (len(pattern), color)
+    
+    def _build(self):
+        """Breadth-first failure links, folded into a full transition table per state"""
+        frontier = deque(self.goto[0].values())
+        while frontier:
+            state = frontier.popleft()
+            for ch, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                if self.output[child] is None and self.output[self.fail[child]] is not None:
+                    self.output[child] = self.output[self.fail[child]]
+                frontier.append(child)
+        # Deterministic transitions: missing edges inherit from the failure state
+        order = deque([0])
+        seen = {0}
+        while order:
+            state = order.popleft()
+            if state:
+                for ch, target in self.goto[self.fail[state]].items():
+                    self.goto[state].setdefault(ch, target)
+            for child in list(self.goto[state].values()):
+                if child not in seen:
+                    seen.add(child)
+                    order.append(child)
+    
+    def find(self, text):
+        """Non-overlapping (start, end, color) matches in text, leftmost first"""
+        goto, output = self.goto, self.output
+        matches = []
+        state = 0
+        last_end = 0
+        for index, ch in enumerate(text.upper()):
+            state = goto[state].get(ch, 0)
+            hit = output[state]
+            if hit is not None:
+                start = index + 1 - hit[0]
+                if start >= last_end:
+                    matches.append((start, index + 1, hit[1]))
+                    last_end = index + 1
+        return matches
+    
+    def highlight_text(self, text):
+        if self.candidate is None or not self.candidate.search(text):
+            return text
+        matches = self.find(text)
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end, color in matches:
+            parts.append(text[position:start])
+            parts.append(f'<span style="background-color: {color}; font-weight: bold;">{text[start:end]}</span>')
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+    
+    def iter_chunks(self, html_content):
+        """Yield the highlighted document piece by piece (text nodes highlighted, markup verbatim)"""
+        skip_until = None
+        position = 0
+        for tag in HTML_TAG_PATTERN.finditer(html_content):
+            text = html_content[position:tag.start()]
+            if text:
+                yield text if skip_until else self.highlight_text(text)
+            yield tag.group(0)
+            position = tag.end()
+            
+            name = (tag.group(2) or '').lower()
+            if skip_until:
+                if tag.group(1) and name == skip_until:
+                    skip_until = None
+            elif not tag.group(1) and name in HIGHLIGHT_SKIP_TAGS and not tag.group(0).endswith('/>'):
+                skip_until = name
+        tail = html_content[position:]
+        if tail:
+            yield tail if skip_until else self.highlight_text(tail)
+
+_highlighter_cache = {}
+
+def get_highlighter(grna_sequences):
+    """Automata are reused across samples - they only depend on the guide list"""
+    key = tuple(grna_sequences)
+    highlighter = _highlighter_cache.get(key)
+    if highlighter is None:
+        highlighter = _highlighter_cache[key] = GuideHighlighter(grna_sequences)
+    return highlighter
+
 def highlight_pam_sequence(html_content, grna_sequences=None):
-    """Highlight gRNA sequences with error handling"""
+    """Highlight gRNA sequences (and reverse complements) in the page text with error handling"""
     try:
         if grna_sequences is None:
             grna_sequences = [""]
@@ -303,30 +1190,185 @@ def highlight_pam_sequence(html_content, grna_sequences=None):
             logger.warning("No gRNA sequences provided for highlighting")
             return html_content
         
-        colors = ["cyan"]
-        for i, grna_sequence in enumerate(grna_sequences):
-            if not grna_sequence:
-                logger.warning(f"Empty gRNA sequence at index {i}")
-                continue
-            
-            color = colors[i % len(colors)]
-            pattern = re.compile(re.escape(grna_sequence), re.IGNORECASE)
-            html_content = pattern.sub(
-                lambda m: f'<span style="background-color: {color}; font-weight: bold;">{m.group(0)}</span>',
-                html_content
-            )
-        
-        return html_content
+        return ''.join(get_highlighter(grna_sequences).iter_chunks(html_content))
         
     except Exception as e:
         logger.warning(f"Error highlighting PAM sequence: {e}")
         return html_content  # Return original if highlighting fails
 
-def process_input_file(input_file_path, grna_sequences, driver, retry_count=0):
+def write_highlighted_html(html_content, output_path, grna_sequences=None):
+    """Stream the highlighted page to output_path without building the whole string in memory"""
+    with open(output_path, "w", encoding="utf-8") as html_file:
+        try:
+            for chunk in get_highlighter(grna_sequences or [""]).iter_chunks(html_content):
+                html_file.write(chunk)
+        except IOError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error highlighting PAM sequence: {e}")
+            html_file.seek(0)
+            html_file.truncate()
+            html_file.write(html_content)  # Save the original if highlighting fails
+
+def highlight_pam_sequence_regex(html_content, grna_sequences=None):
+    """Previous per-guide re.sub highlighter - kept as the benchmark baseline"""
+    colors = HIGHLIGHT_COLORS
+    for i, grna_sequence in enumerate(grna_sequences or []):
+        if not grna_sequence:
+            continue
+        color = colors[i % len(colors)]
+        pattern = re.compile(re.escape(grna_sequence), re.IGNORECASE)
+        html_content = pattern.sub(
+            lambda m: f'<span style="background-color: {color}; font-weight: bold;">{m.group(0)}</span>',
+            html_content
+        )
+    return html_content
+
+def benchmark_highlight(html_path, guides=None, repeats=20):
+    """Time the single-pass highlighter against the per-guide re.sub loop on a saved result page"""
+    guides = [guide for guide in (guides or grna_sequences) if guide]
+    if not guides:
+        raise AnalysisError("No gRNA sequences to benchmark - set grna_sequences or pass --guides")
+    with open(html_path, encoding="utf-8") as html_file:
+        html_content = html_file.read()
+    
+    def best_of(function):
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            output = function(html_content, grna_sequences=guides)
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+    
+    _highlighter_cache.clear()
+    started = time.perf_counter()
+    get_highlighter(guides)
+    build_time = time.perf_counter() - started
+    
+    regex_time, regex_output = best_of(highlight_pam_sequence_regex)
+    single_time, single_output = best_of(highlight_pam_sequence)
+    span = 'font-weight: bold;">'
+    
+    logger.info(f"Highlight benchmark: {os.path.basename(html_path)} ({len(html_content) / 1024:.0f} KB), "
+                f"{len(guides)} guide(s), best of {repeats}")
+    logger.info(f"  re.sub per guide : {regex_time * 1000:8.2f} ms, {regex_output.count(span)} spans, "
+                f"{len(regex_output) - len(html_content):+d} bytes")
+    logger.info(f"  single pass      : {single_time * 1000:8.2f} ms, {single_output.count(span)} spans, "
+                f"{len(single_output) - len(html_content):+d} bytes (automaton built in {build_time * 1000:.2f} ms)")
+    return {'regex_seconds': regex_time, 'single_pass_seconds': single_time, 'build_seconds': build_time}
+
+def wait_for_file_value(driver, file_input, timeout=DRIVER_TIMEOUT):
+    """Wait until a file input reports a selected file; returns the seconds waited"""
+    started = time.time()
+    WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(
+        lambda d: file_input.get_attribute("value"),
+        message="File input did not register the upload"
+    )
+    return time.time() - started
+
+# Messages of failed INDIGO runs: (text, regex whose group is the reported error or None)
+INDIGO_PAGE_ERRORS = [
+    ("Error in running Indigo:", r'Error in running Indigo: ([^<\n]+)'),
+    ("Alignment of trace to reference failed", None),
+    ("execution halted", None),
+    ("package:stats", None),
+]
+
+def indigo_page_error(text):
+    """Reported error for an INDIGO error text, or None if it contains no known INDIGO error"""
+    for error_text, error_pattern in INDIGO_PAGE_ERRORS:
+        if error_text in text:
+            if error_pattern:
+                match = re.search(error_pattern, text)
+                if match:
+                    return match.group(1).strip()
+            return error_text
+    return None
+
+def indigo_outcome(driver):
+    """
+    Wait condition for a submitted analysis: ('error', message) once INDIGO shows
+    #result-error, ('result', None) once #result-container or the "Download HTML"
+    link appears, False while the analysis is still running.
+    """
+    for element in driver.find_elements(By.ID, "result-error"):
+        if element.is_displayed():
+            messages = driver.find_elements(By.ID, "error-message")
+            text = (messages[0].text if messages else "") or element.text
+            return 'error', indigo_page_error(text) or text.strip() or "INDIGO reported an error"
+    if driver.find_elements(By.LINK_TEXT, "Download HTML"):
+        return 'result', None
+    for element in driver.find_elements(By.ID, "result-container"):
+        if element.is_displayed():
+            return 'result', None
+    return False
+
+def wait_for_indigo_result(driver, timeout):
+    """
+    Wait until INDIGO either shows an error or the results, whichever comes first.
+    Returns (outcome, error message, seconds waited) - outcome is 'error', 'result',
+    or None if neither appeared in time.
+    """
+    started = time.time()
+    try:
+        outcome, message = WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL,
+                                         ignored_exceptions=(StaleElementReferenceException,)).until(indigo_outcome)
+        return outcome, message, time.time() - started
+    except TimeoutException:
+        return None, None, time.time() - started
+
+def list_download_dir(directory):
+    """Snapshot of the file names currently in a download directory"""
+    try:
+        return set(os.listdir(directory))
+    except OSError:
+        return set()
+
+def wait_for_download(directory, known_files, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Wait for a new, fully written file to appear in a download directory.
+    Chrome writes to '<name>.crdownload' and renames on completion, so a new file
+    without that suffix and with a stable size is a finished download.
+    Returns the file path, or None on timeout.
+    """
+    deadline = time.time() + timeout
+    last_sizes = {}
+    
+    while time.time() < deadline:
+        new_files = list_download_dir(directory) - known_files
+        pending = [f for f in new_files if f.endswith('.crdownload') or f.endswith('.tmp')]
+        finished = [f for f in new_files if f not in pending]
+        
+        if finished and not pending:
+            for file_name in finished:
+                file_path = os.path.join(directory, file_name)
+                try:
+                    size = os.path.getsize(file_path)
+                except OSError:
+                    continue
+                if size > 0 and last_sizes.get(file_name) == size:
+                    return file_path
+                last_sizes[file_name] = size
+        
+        time.sleep(WAIT_POLL_INTERVAL)
+    
+    return None
+
+def process_input_file(input_file_path, grna_sequences, driver, download_path=None, stats=None, settings=None):
     """
-    Process file with INDIGO with comprehensive error handling
+    Process file with INDIGO with comprehensive error handling.
+    If a 'stats' dict is given it receives the seconds spent waiting ('wait_seconds', INDIGO
+    included) and the seconds saved compared to the original fixed form and download sleeps
+    ('wait_saved_seconds'), plus the seconds spent in each step of the web form ('stage_seconds').
+    'settings' (SampleSettings) gives the wildtype and trims; default: the sample's manifest entry.
     """
     input_file_base_name = os.path.splitext(os.path.basename(input_file_path))[0]
+    download_path = download_path or indigo_output_dir
+    settings = settings or settings_for(os.path.basename(input_file_path))
+    if stats is None:
+        stats = {}
+    stats['wait_seconds'] = 0.0
+    replaced_wait = 0.0  # Event-driven waits standing in for LEGACY_FIXED_SLEEPS
     
     try:
         # Verify input file exists
@@ -334,120 +1376,144 @@ def process_input_file(input_file_path, grna_sequences, driver, retry_count=0):
             raise IndigoError(f"Input file not found: {input_file_path}")
         
         # Load INDIGO page
-        try:
-            driver.get("https://www.gear-genomics.com/indigo/")
-        except TimeoutException:
-            raise IndigoError("Timeout loading INDIGO website")
-        except WebDriverException as e:
-            raise IndigoError(f"WebDriver error accessing INDIGO: {e}")
+        with timed_stage(stats, 'page_load'):
+            try:
+                driver.get(INDIGO_URL)
+            except TimeoutException:
+                raise IndigoError("Timeout loading INDIGO website")
+            except WebDriverException as e:
+                raise IndigoError(f"WebDriver error accessing INDIGO: {e}")
         
         wait = WebDriverWait(driver, DRIVER_TIMEOUT)
         
         # Upload input file
-        try:
-            input_file_upload = wait.until(EC.presence_of_element_located((By.ID, "inputFile")))
-            input_file_upload.send_keys(input_file_path)
-            logger.debug(f"Uploaded {input_file_base_name}")
-        except TimeoutException:
-            raise IndigoError("Timeout waiting for input file upload element")
-        except StaleElementReferenceException:
-            raise IndigoError("Element reference became stale during upload")
-        except Exception as e:
-            raise IndigoError(f"Error uploading input file: {e}")
+        with timed_stage(stats, 'upload'):
+            try:
+                input_file_upload = wait.until(EC.presence_of_element_located((By.ID, "inputFile")))
+                input_file_upload.send_keys(input_file_path)
+                logger.debug(f"Uploaded {input_file_base_name}")
+            except TimeoutException:
+                raise IndigoError("Timeout waiting for input file upload element")
+            except StaleElementReferenceException:
+                raise IndigoError("Element reference became stale during upload")
+            except Exception as e:
+                raise IndigoError(f"Error uploading input file: {e}")
         
-        # Verify upload
-        time.sleep(2)
-        try:
-            file_value = input_file_upload.get_attribute("value")
-            if not file_value:
+            # Verify upload
+            try:
+                replaced_wait += wait_for_file_value(driver, input_file_upload)
+            except TimeoutException:
                 raise IndigoError("Sample file upload verification failed - no file selected")
-        except Exception as e:
-            raise IndigoError(f"Error verifying file upload: {e}")
+            except Exception as e:
+                raise IndigoError(f"Error verifying file upload: {e}")
         
         # Click wildtype tab
-        try:
-            wild_type_link = wait.until(EC.element_to_be_clickable((By.ID, "target-chromatogram-tab")))
-            driver.execute_script("arguments[0].scrollIntoView();", wild_type_link)
-            time.sleep(1)
-            driver.execute_script("arguments[0].click();", wild_type_link)
-        except TimeoutException:
-            raise IndigoError("Timeout clicking wildtype chromatogram tab")
-        except Exception as e:
-            raise IndigoError(f"Error clicking wildtype tab: {e}")
+        with timed_stage(stats, 'tab_click'):
+            try:
+                wild_type_link = wait.until(EC.element_to_be_clickable((By.ID, "target-chromatogram-tab")))
+                driver.execute_script("arguments[0].scrollIntoView();", wild_type_link)
+                driver.execute_script("arguments[0].click();", wild_type_link)
+            except TimeoutException:
+                raise IndigoError("Timeout clicking wildtype chromatogram tab")
+            except Exception as e:
+                raise IndigoError(f"Error clicking wildtype tab: {e}")
         
         # Upload wildtype file
-        try:
-            wild_type_file_input = wait.until(EC.presence_of_element_located((By.ID, "targetFileChromatogram")))
-            wild_type_file_input.send_keys(wild_type_file_path)
-            logger.debug(f"Uploaded wildtype file")
-        except TimeoutException:
-            raise IndigoError("Timeout waiting for wildtype file upload element")
-        except Exception as e:
-            raise IndigoError(f"Error uploading wildtype file: {e}")
+        with timed_stage(stats, 'wildtype_upload'):
+            try:
+                wild_type_file_input = wait.until(EC.presence_of_element_located((By.ID, "targetFileChromatogram")))
+                wild_type_file_input.send_keys(settings.wildtype)
+                logger.debug(f"Uploaded wildtype file")
+            except TimeoutException:
+                raise IndigoError("Timeout waiting for wildtype file upload element")
+            except Exception as e:
+                raise IndigoError(f"Error uploading wildtype file: {e}")
         
-        # Verify wildtype upload
-        time.sleep(2)
-        try:
-            wt_value = wild_type_file_input.get_attribute("value")
-            if not wt_value:
+            # Verify wildtype upload
+            try:
+                replaced_wait += wait_for_file_value(driver, wild_type_file_input)
+            except TimeoutException:
                 raise IndigoError("Wildtype file upload verification failed")
-        except Exception as e:
-            raise IndigoError(f"Error verifying wildtype upload: {e}")
+            except Exception as e:
+                raise IndigoError(f"Error verifying wildtype upload: {e}")
         
         # Submit analysis
-        try:
-            submit_button = wait.until(EC.element_to_be_clickable((By.ID, "btn-submit")))
-            driver.execute_script("arguments[0].scrollIntoView();", submit_button)
-            time.sleep(1)
-            driver.execute_script("arguments[0].click();", submit_button)
-        except TimeoutException:
-            raise IndigoError("Timeout clicking submit button")
-        except Exception as e:
-            raise IndigoError(f"Error submitting analysis: {e}")
+        with timed_stage(stats, 'submit'):
+            # Trim sizes of manifest samples that differ from the configured (form default) ones
+            if (settings.left_trim, settings.right_trim) != (INDIGO_LEFT_TRIM, INDIGO_RIGHT_TRIM):
+                try:
+                    driver.execute_script(
+                        "document.getElementById('leftTrim').value = arguments[0];"
+                        "document.getElementById('rightTrim').value = arguments[1];",
+                        str(settings.left_trim), str(settings.right_trim)
+                    )
+                except Exception as e:
+                    raise IndigoError(f"Error setting trim sizes: {e}")
+            
+            try:
+                submit_button = wait.until(EC.element_to_be_clickable((By.ID, "btn-submit")))
+                driver.execute_script("arguments[0].scrollIntoView();", submit_button)
+                known_downloads = list_download_dir(download_path)
+                driver.execute_script("arguments[0].click();", submit_button)
+            except TimeoutException:
+                raise IndigoError("Timeout clicking submit button")
+            except Exception as e:
+                raise IndigoError(f"Error submitting analysis: {e}")
+        
+        # Wait for INDIGO to process - returns as soon as the results are rendered
+        with timed_stage(stats, 'indigo_compute'):
+            result_timeout = INDIGO_WAIT_TIME + DRIVER_TIMEOUT
+            logger.debug(f"Waiting up to {result_timeout} seconds for INDIGO analysis...")
+            outcome, indigo_message, result_wait = wait_for_indigo_result(driver, result_timeout)
+            stats['wait_seconds'] += result_wait
         
-        # Wait for INDIGO to process
-        logger.debug(f"Waiting {INDIGO_WAIT_TIME} seconds for INDIGO analysis...")
-        time.sleep(INDIGO_WAIT_TIME)
+        if outcome is None:
+            return False, "Timeout waiting for INDIGO result"
+        if outcome == 'error':
+            logger.debug(f"INDIGO reported an error for {input_file_base_name} after {result_wait:.1f}s: {indigo_message}")
+            return False, indigo_message
         
         # Try to get results
         try:
-            result_download_link = wait.until(
-                EC.presence_of_element_located((By.LINK_TEXT, "Download HTML")),
-                message="Download link not found"
-            )
-            driver.execute_script("arguments[0].click();", result_download_link)
-            time.sleep(5)
-            logger.debug(f"Downloaded HTML for {input_file_base_name}")
+            with timed_stage(stats, 'download'):
+                # The result container can render a moment before its download link
+                link_started = time.time()
+                download_link = WebDriverWait(driver, DRIVER_TIMEOUT, poll_frequency=WAIT_POLL_INTERVAL).until(
+                    EC.presence_of_element_located((By.LINK_TEXT, "Download HTML"))
+                )
+                stats['wait_seconds'] += time.time() - link_started
+            
+                download_started = time.time()
+                driver.execute_script("arguments[0].click();", download_link)
+                downloaded_file = wait_for_download(download_path, known_downloads)
+                replaced_wait += time.time() - download_started
+                if not downloaded_file:
+                    raise IndigoError(f"Download of HTML result did not finish within {DOWNLOAD_TIMEOUT} seconds")
+            
+            stats['wait_seconds'] += replaced_wait
+            stats['wait_saved_seconds'] = LEGACY_FIXED_SLEEPS - replaced_wait
+            stats['result_file'] = downloaded_file
+            logger.debug(f"Downloaded HTML for {input_file_base_name}: {os.path.basename(downloaded_file)}")
             return True, None
             
         except (TimeoutException, NoSuchElementException):
-            # Fallback to page source
+            # Fallback to page source (results rendered without a download link)
             try:
                 page_source = driver.page_source
                 
                 # Check for errors
-                error_patterns = [
-                    ("Error in running Indigo:", r'Error in running Indigo: ([^<]+)'),
-                    ("Alignment of trace to reference failed", None),
-                    ("execution halted", None),
-                    ("package:stats", None),
-                ]
-                
-                for error_text, error_pattern in error_patterns:
-                    if error_text in page_source:
-                        if error_pattern:
-                            match = re.search(error_pattern, page_source)
-                            if match:
-                                return False, match.group(1)
-                        return False, error_text
+                page_error = indigo_page_error(page_source)
+                if page_error:
+                    return False, page_error
                 
                 # No errors detected, save page source
-                highlighted_html = highlight_pam_sequence(page_source, grna_sequences=grna_sequences)
-                result_html_file_path = os.path.join(indigo_output_dir, f"{input_file_base_name}_results_highlighted.html")
-                
-                with open(result_html_file_path, "w", encoding="utf-8") as html_file:
-                    html_file.write(highlighted_html)
+                with timed_stage(stats, 'save'):
+                    result_html_file_path = os.path.join(indigo_output_dir, f"{input_file_base_name}_results_highlighted.html")
+                    write_highlighted_html(page_source, result_html_file_path, grna_sequences=grna_sequences)
                 
+                stats['wait_seconds'] += replaced_wait
+                stats['wait_saved_seconds'] = LEGACY_FIXED_SLEEPS - replaced_wait
+                stats['result_file'] = result_html_file_path
                 logger.debug(f"Saved results (page source) for {input_file_base_name}")
                 return True, None
                 
@@ -460,12 +1526,7 @@ def process_input_file(input_file_path, grna_sequences, driver, retry_count=0):
         logger.debug(f"INDIGO Error: {str(e)}")
         return False, str(e)
     except StaleElementReferenceException:
-        if retry_count < MAX_RETRIES_INDIGO:
-            logger.warning(f"Stale element reference, retrying (attempt {retry_count + 1})")
-            time.sleep(2)
-            return process_input_file(input_file_path, grna_sequences, driver, retry_count + 1)
-        else:
-            return False, "Stale element reference after retries"
+        return False, "Stale element reference"
     except WebDriverException as e:
         return False, f"WebDriver error: {str(e)[:100]}"
     except Exception as e:
@@ -474,287 +1535,3434 @@ def process_input_file(input_file_path, grna_sequences, driver, retry_count=0):
         logger.debug(traceback.format_exc())
         return False, f"Unexpected error: {str(e)[:100]}"
 
-def process_with_ice(input_file_path, ice_target_sequence, retry_count=0):
-    """Process file with ICE as fallback with error handling"""
-    
+# ==================================================================================
+# HTTP BACKEND - BROWSERLESS INDIGO SUBMISSION
+# ==================================================================================
+_http_pool = None
+_http_pool_lock = threading.Lock()
+
+def get_http_pool():
+    """
+    Shared keep-alive connection pool for the INDIGO API: one connection per concurrent
+    request - a worker in pool mode, an upload or poll slot in async mode
+    """
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = urllib3.PoolManager(
+                maxsize=max(1, NUM_WORKERS, ASYNC_UPLOAD_CONCURRENCY + ASYNC_POLL_CONCURRENCY),
+                block=True,
+                retries=False,
+                timeout=urllib3.Timeout(connect=DRIVER_TIMEOUT, read=INDIGO_WAIT_TIME + DRIVER_TIMEOUT)
+            )
+        return _http_pool
+
+def _read_json_response(response):
+    """Decode a JSON API response, raising IndigoError for non-JSON bodies"""
+    try:
+        return json.loads(response.data.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise IndigoError(f"INDIGO API returned non-JSON response (HTTP {response.status})")
+
+def _indigo_api_errors(payload):
+    """Join the error titles of an INDIGO API error payload"""
+    errors = payload.get('errors') or []
+    titles = [str(error.get('title', error)) if isinstance(error, dict) else str(error) for error in errors]
+    return "; ".join(titles) or "Unknown INDIGO API error"
+
+def submit_indigo_http(input_file_path, wild_type_path, left_trim=INDIGO_LEFT_TRIM, right_trim=INDIGO_RIGHT_TRIM):
+    """
+    Post the sample and wildtype chromatograms to the INDIGO API.
+    Mirrors the FormData sent by the INDIGO web form. Returns the decoded JSON payload.
+    """
+    try:
+        with open(input_file_path, 'rb') as f:
+            sample_bytes = f.read()
+        wild_type_bytes = read_reference_bytes(wild_type_path)
+    except OSError as e:
+        raise IndigoError(f"Cannot read chromatogram for upload: {e}")
+    
+    # The API takes both chromatograms in one request, so the wildtype is sent with every sample
+    fields = {
+        'queryFile': (os.path.basename(input_file_path), sample_bytes, 'application/octet-stream'),
+        'chromatogramFile': (os.path.basename(wild_type_path), wild_type_bytes, 'application/octet-stream'),
+        'leftTrim': str(left_trim),
+        'rightTrim': str(right_trim),
+        'peakRatio': str(INDIGO_PEAK_RATIO),
+    }
+    
+    try:
+        response = get_http_pool().request("POST", f"{INDIGO_API_URL}/upload", fields=fields)
+    except urllib3.exceptions.HTTPError as e:
+        raise IndigoError(f"Error posting to INDIGO API: {e}")
+    
+    payload = _read_json_response(response)
+    if response.status >= 400:
+        raise IndigoError(_indigo_api_errors(payload))
+    return payload
+
+def poll_indigo_http(job_id, timeout):
+    """Poll the INDIGO API for a queued job until its data is ready"""
+    deadline = time.time() + timeout
+    
+    while time.time() < deadline:
+        try:
+            response = get_http_pool().request("GET", f"{INDIGO_API_URL}/results/{job_id}")
+        except urllib3.exceptions.HTTPError as e:
+            raise IndigoError(f"Error polling INDIGO API: {e}")
+        
+        payload = _read_json_response(response)
+        if response.status >= 400:
+            raise IndigoError(_indigo_api_errors(payload))
+        if payload.get('data') is not None:
+            return payload['data']
+        
+        time.sleep(WAIT_POLL_INTERVAL)
+    
+    raise IndigoError(f"Timeout waiting for INDIGO job {job_id}")
+
+def save_indigo_http_result(input_file_base_name, data):
+    """Save the INDIGO API result data next to the browser-backend results"""
+    result_json_path = os.path.join(indigo_output_dir, f"{input_file_base_name}_indigo.json")
+    try:
+        with open(result_json_path, "w", encoding="utf-8") as json_file:
+            json.dump(data, json_file)
+    except IOError as e:
+        raise IndigoError(f"Error saving results to file: {e}")
+    return result_json_path
+
+def process_input_file_http(input_file_path, grna_sequences, driver=None, download_path=None, stats=None,
+                            settings=None):
+    """
+    Process file with INDIGO over plain HTTP (no browser).
+    Same (success, error) contract as process_input_file; 'driver' and 'download_path' are ignored.
+    """
+    input_file_base_name = os.path.splitext(os.path.basename(input_file_path))[0]
+    settings = settings or settings_for(os.path.basename(input_file_path))
+    if stats is None:
+        stats = {}
+    started = time.time()
+    
+    try:
+        if not os.path.exists(input_file_path):
+            raise IndigoError(f"Input file not found: {input_file_path}")
+        
+        with timed_stage(stats, 'upload'):
+            payload = submit_indigo_http(input_file_path, settings.wildtype, settings.left_trim, settings.right_trim)
+        logger.debug(f"Uploaded {input_file_base_name} to INDIGO API")
+        
+        data = payload.get('data')
+        if data is None:
+            job_id = payload.get('uuid') or payload.get('id')
+            if not job_id:
+                raise IndigoError("INDIGO API response has neither data nor job id")
+            with timed_stage(stats, 'indigo_compute'):
+                data = poll_indigo_http(job_id, INDIGO_WAIT_TIME + DRIVER_TIMEOUT)
+        
+        with timed_stage(stats, 'save'):
+            stats['result_file'] = save_indigo_http_result(input_file_base_name, data)
+        stats['wait_seconds'] = time.time() - started
+        logger.debug(f"Saved INDIGO API results for {input_file_base_name}")
+        return True, None
+        
+    except IndigoError as e:
+        logger.debug(f"INDIGO Error: {str(e)}")
+        return False, str(e)
+    except Exception as e:
+        logger.debug(f"Unexpected error in process_input_file_http: {e}")
+        import traceback
+        logger.debug(traceback.format_exc())
+        return False, f"Unexpected error: {str(e)[:100]}"
+
+# ==================================================================================
+# LOCAL ENGINE - NUMPY TRACE DECOMPOSITION (OFFLINE INDIGO REPLACEMENT)
+# ==================================================================================
+ABIF_TRACE_TAGS = ('DATA9', 'DATA10', 'DATA11', 'DATA12')  # Analyzed traces, in FWO_1 channel order
+BASE_CODES = np.frombuffer(b'ACGT', dtype=np.uint8)
+
+def load_trace(record, left_trim=0, right_trim=0):
+    """
+    Extract (basecalls, peak_fractions) from a parsed .ab1 record.
+    basecalls is a uint8 array of base letters; peak_fractions is an (n x 4) array of
+    A/C/G/T trace heights at every called peak, normalized to sum to 1 per base.
+    """
+    raw = record.annotations.get('abif_raw', {})
+    missing = [tag for tag in ABIF_TRACE_TAGS + ('PLOC2', 'PBAS2') if tag not in raw]
+    if missing:
+        raise IndigoError(f"Chromatogram lacks trace data: {', '.join(missing)}")
+    
+    channel_order = raw.get('FWO_1', b'GATC')
+    if isinstance(channel_order, bytes):
+        channel_order = channel_order.decode('ascii')
+    traces = np.vstack([np.asarray(raw[tag], dtype=np.float64) for tag in ABIF_TRACE_TAGS])
+    traces = traces[[channel_order.index(base) for base in 'ACGT']]
+    
+    peak_locations = np.clip(np.asarray(raw['PLOC2'], dtype=np.int64), 0, traces.shape[1] - 1)
+    basecalls = np.frombuffer(raw['PBAS2'], dtype=np.uint8)
+    n = min(len(basecalls), len(peak_locations))
+    basecalls, peak_locations = basecalls[:n], peak_locations[:n]
+    
+    end = n - right_trim if right_trim else n
+    if end - left_trim < 2 * LOCAL_BREAK_WINDOW:
+        raise IndigoError(f"Trace too short after trimming ({max(0, end - left_trim)} bases)")
+    basecalls = basecalls[left_trim:end]
+    peaks = np.clip(traces[:, peak_locations[left_trim:end]].T, 0, None)
+    totals = peaks.sum(axis=1, keepdims=True)
+    peak_fractions = np.divide(peaks, totals, out=np.full_like(peaks, 0.25), where=totals > 0)
+    return basecalls, peak_fractions
+
+def one_hot(basecalls):
+    """(n x 4) A/C/G/T indicator matrix; ambiguous calls are all zero"""
+    return (basecalls[:, None] == BASE_CODES[None, :]).astype(np.float64)
+
+def first_dense_window(flags, window, fraction):
+    """First set flag of the first window in which at least 'fraction' of the flags are set, or None"""
+    if len(flags) < window:
+        return None
+    density = np.convolve(flags.astype(np.float64), np.ones(window), mode='valid') / window
+    hits = np.flatnonzero(density >= fraction)
+    if not len(hits):
+        return None
+    return int(hits[0] + np.argmax(flags[hits[0]:hits[0] + window]))
+
+def best_offset(sample_onehot, reference_onehot):
+    """Reference offset maximizing base identity with the sample (cross-correlation via FFT)"""
+    size = len(sample_onehot) + len(reference_onehot) - 1
+    n_fft = 1 << (size - 1).bit_length()
+    spectrum = (np.fft.rfft(reference_onehot, n_fft, axis=0) *
+                np.conj(np.fft.rfft(sample_onehot, n_fft, axis=0))).sum(axis=1)
+    correlation = np.fft.irfft(spectrum, n_fft)
+    # Circular lags: index k -> offset k, index n_fft - k -> offset -k
+    lags = np.concatenate([np.arange(0, len(reference_onehot)), np.arange(-(len(sample_onehot) - 1), 0)])
+    values = np.concatenate([correlation[:len(reference_onehot)], correlation[n_fft - (len(sample_onehot) - 1):]])
+    return int(lags[np.argmax(values)])
+
+def nnls(design, target, max_iterations=100):
+    """Non-negative least squares by iteratively dropping negative coefficients"""
+    active = np.ones(design.shape[1], dtype=bool)
+    weights = np.zeros(design.shape[1])
+    for _ in range(max_iterations):
+        solution, *_ = np.linalg.lstsq(design[:, active], target, rcond=None)
+        if (solution >= 0).all():
+            weights[:] = 0
+            weights[active] = solution
+            return weights
+        active_indices = np.flatnonzero(active)
+        active[active_indices[np.argmin(solution)]] = False
+        if not active.any():
+            break
+    return weights
+
+def decompose_trace(sample_record, wildtype_record, left_trim=INDIGO_LEFT_TRIM,
+                    right_trim=INDIGO_RIGHT_TRIM, peak_ratio=INDIGO_PEAK_RATIO, wildtype_calls=None):
+    """
+    Align a (possibly mixed) sample trace to the wildtype and decompose the peaks after
+    the break point into indel alleles, the way INDIGO/TIDE-style tools do.
+    Returns a dict with the breakpoint, per-indel fractions, allele calls and fit R².
+    wildtype_calls may be passed in when the trimmed wildtype basecalls are already known.
+    """
+    sample_calls, sample_peaks = load_trace(sample_record, left_trim, right_trim)
+    if wildtype_calls is None:
+        wildtype_calls, _ = load_trace(wildtype_record, left_trim, right_trim)
+    sample_onehot, wildtype_onehot = one_hot(sample_calls), one_hot(wildtype_calls)
+    
+    # Mixed peaks: secondary peak at least peak_ratio % of the primary
+    ordered = np.sort(sample_peaks, axis=1)
+    mixed = ordered[:, -2] >= (peak_ratio / 100.0) * ordered[:, -1]
+    mixed_break = first_dense_window(mixed, LOCAL_BREAK_WINDOW, LOCAL_BREAK_FRACTION)
+    
+    # Align the clean prefix to the wildtype
+    prefix_end = min(len(sample_calls), LOCAL_ALIGN_PREFIX)
+    if mixed_break is not None and mixed_break >= 2 * LOCAL_BREAK_WINDOW:
+        prefix_end = min(prefix_end, mixed_break)
+    offset = best_offset(sample_onehot[:prefix_end], wildtype_onehot)
+    
+    # Mismatches against the wildtype catch clean (homozygous) edits without mixed peaks
+    reference_index = np.arange(len(sample_calls)) + offset
+    in_reference = (reference_index >= 0) & (reference_index < len(wildtype_calls))
+    mismatch = np.zeros(len(sample_calls), dtype=bool)
+    mismatch[in_reference] = sample_calls[in_reference] != wildtype_calls[reference_index[in_reference]]
+    mismatch_break = first_dense_window(mismatch & in_reference, LOCAL_BREAK_WINDOW, LOCAL_BREAK_FRACTION)
+    
+    candidates = [b for b in (mixed_break, mismatch_break) if b is not None]
+    breakpoint = min(candidates) if candidates else None
+    
+    # Decompose from the break (or from the first aligned base if the trace is clean)
+    shifts = np.arange(-LOCAL_MAX_INDEL, LOCAL_MAX_INDEL + 1)
+    start = breakpoint if breakpoint is not None else int(np.argmax(in_reference))
+    positions = np.arange(start, min(len(sample_calls), start + LOCAL_DECOMPOSITION_WINDOW))
+    lookup = positions[:, None] + offset + shifts[None, :]
+    valid = ((lookup >= 0) & (lookup < len(wildtype_calls))).all(axis=1)
+    positions, lookup = positions[valid], lookup[valid]
+    if len(positions) < LOCAL_BREAK_WINDOW:
+        raise IndigoError("Too few aligned bases after the break point to decompose")
+    
+    # design[(position, base), shift] = wildtype base expected at that position for the shift
+    design = wildtype_onehot[lookup].transpose(0, 2, 1).reshape(-1, len(shifts))
+    target = sample_peaks[positions].reshape(-1)
+    weights = nnls(design, target)
+    fitted = design @ weights
+    ss_res = float(((target - fitted) ** 2).sum())
+    ss_tot = float(((target - target.mean()) ** 2).sum())
+    r_squared = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
+    
+    total = weights.sum()
+    fractions = weights / total if total > 0 else weights
+    # Shift +k reads k bases further into the wildtype: a k bp deletion (indel size -k)
+    decomposition = [
+        {'indel': int(-shift), 'fraction': round(float(fraction), 4)}
+        for shift, fraction in zip(shifts, fractions) if fraction >= LOCAL_MIN_ALLELE_FRACTION
+    ]
+    decomposition.sort(key=lambda item: item['fraction'], reverse=True)
+    
+    alleles = decomposition[:2]
+    breakpoint_position = int(start + offset + left_trim + 1)  # 1-based wildtype coordinate
+    variants = []
+    for allele in alleles:
+        if allele['indel'] == 0:
+            continue
+        variants.append({
+            'pos': breakpoint_position,
+            'type': 'Insertion' if allele['indel'] > 0 else 'Deletion',
+            'size': allele['indel'],
+            'fraction': allele['fraction'],
+            'genotype': 'hom. ALT' if allele['fraction'] >= 0.8 else 'het.'
+        })
+    
+    edited_fraction = sum(item['fraction'] for item in decomposition if item['indel'] != 0)
+    return {
+        'breakpoint': breakpoint_position if breakpoint is not None else None,
+        'offset': offset,
+        'decomposition': decomposition,
+        'alleles': alleles,
+        'variants': variants,
+        'indel_percentage': round(100.0 * edited_fraction, 2),
+        'r_squared': round(r_squared, 4),
+    }
+
+def process_input_file_local(input_file_path, grna_sequences, driver=None, download_path=None, stats=None,
+                             settings=None):
+    """
+    Analyze a sample with the local NumPy engine (no network).
+    Same (success, error) contract as process_input_file; 'driver' and 'download_path' are ignored.
+    """
+    input_file_base_name = os.path.splitext(os.path.basename(input_file_path))[0]
+    settings = settings or settings_for(os.path.basename(input_file_path))
+    if stats is None:
+        stats = {}
+    started = time.time()
+    
+    try:
+        if not os.path.exists(input_file_path):
+            raise IndigoError(f"Input file not found: {input_file_path}")
+        
+        try:
+            sample_record = read_ab1(input_file_path)
+            wildtype_record = read_ab1(settings.wildtype)
+            # Trimmed wildtype basecalls are shared by every sample of the reference group
+            wildtype_calls, _ = reference_cache.get(
+                settings.wildtype, ('trace', settings.left_trim, settings.right_trim),
+                lambda: load_trace(wildtype_record, settings.left_trim, settings.right_trim)
+            )
+        except IndigoError:
+            raise
+        except Exception as e:
+            raise IndigoError(f"Cannot read chromatogram: {e}")
+        
+        with timed_stage(stats, 'indigo_compute'):
+            result = decompose_trace(sample_record, wildtype_record, settings.left_trim, settings.right_trim,
+                                     wildtype_calls=wildtype_calls)
+        result_json_path = os.path.join(indigo_output_dir, f"{input_file_base_name}_local_results.json")
+        with timed_stage(stats, 'save'):
+            try:
+                with open(result_json_path, "w", encoding="utf-8") as json_file:
+                    json.dump(result, json_file, indent=2)
+            except IOError as e:
+                raise IndigoError(f"Error saving results to file: {e}")
+        
+        stats['wait_seconds'] = time.time() - started
+        stats['result_file'] = result_json_path
+        stats['local_result'] = result
+        logger.debug(f"Local decomposition for {input_file_base_name}: {result['decomposition'][:3]}")
+        return True, None
+        
+    except IndigoError as e:
+        logger.debug(f"Local engine error: {str(e)}")
+        return False, str(e)
+    except Exception as e:
+        logger.debug(f"Unexpected error in process_input_file_local: {e}")
+        import traceback
+        logger.debug(traceback.format_exc())
+        return False, f"Unexpected error: {str(e)[:100]}"
+
+# ==================================================================================
+# PRE-FLIGHT QC - CHROMATOGRAM QUALITY TRIAGE BEFORE SUBMISSION
+# ==================================================================================
+QC_SKIPPED_INDIGO_ERROR = "INDIGO skipped - failed pre-flight QC"
+qc_results = {}  # file name -> (action, QC report columns), until the sample's row is recorded
+qc_lock = threading.Lock()
+
+def clean_read_length(phred, window=QC_CLEAN_WINDOW, threshold=QC_CLEAN_PHRED):
+    """Bases in the longest stretch whose rolling mean quality reaches the threshold"""
+    if len(phred) < window:
+        return 0
+    sums = np.concatenate(([0.0], np.cumsum(phred)))
+    good = (sums[window:] - sums[:-window]) / window >= threshold
+    _, _, lengths = gap_runs(good[None, :])
+    return int(lengths.max()) + window - 1 if len(lengths) else 0
+
+def guide_match(basecalls, guide):
+    """(fewest mismatches, cut site index) of a guide or its reverse complement along the base calls"""
+    best, cut_site = len(guide), None
+    for sequence, cut_offset in ((guide.upper(), len(guide) - 3), (reverse_complement(guide.upper()), 3)):
+        pattern = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+        if len(basecalls) < len(pattern):
+            continue
+        mismatches = (np.lib.stride_tricks.sliding_window_view(basecalls, len(pattern)) != pattern).sum(axis=1)
+        position = int(np.argmin(mismatches))
+        if mismatches[position] < best:
+            best, cut_site = int(mismatches[position]), position + cut_offset
+    return best, cut_site
+
+def chromatogram_qc(record, guides=(), left_trim=0, right_trim=0):
+    """
+    Quality metrics of a parsed .ab1 record over the trimmed read: mean_phred, snr,
+    clean_length, guide_mismatches (None without guides) and guide_found. The SNR is the
+    median ratio of the called peak to the mean of the other channels before the cut site,
+    where edited samples are still clean; None if the record has no trace data.
+    """
+    phred = np.asarray(record.letter_annotations.get('phred_quality', []), dtype=np.float64)
+    end = len(phred) - right_trim if right_trim else len(phred)
+    phred = phred[left_trim:end]
+    try:
+        basecalls, peak_fractions = load_trace(record, left_trim, right_trim)
+    except IndigoError:
+        basecalls = np.frombuffer(str(record.seq).upper().encode('ascii'), dtype=np.uint8)[left_trim:end]
+        peak_fractions = None
+    
+    matches = [guide_match(basecalls, guide) for guide in guides]
+    mismatches, cut_site = min(matches, key=lambda match: match[0]) if matches else (None, None)
+    guide_found = mismatches is not None and mismatches <= QC_GUIDE_MAX_MISMATCHES
+    
+    snr = None
+    if peak_fractions is not None and len(peak_fractions):
+        clean = peak_fractions[:cut_site] if guide_found and cut_site >= QC_CLEAN_WINDOW else peak_fractions
+        primary = clean.max(axis=1)
+        noise = np.maximum((1.0 - primary) / 3.0, 0.01)  # Caps the SNR of baseline-free peaks at 100
+        snr = float(np.median(primary / noise))
+    
+    return {
+        'mean_phred': float(phred.mean()) if len(phred) else 0.0,
+        'snr': snr,
+        'clean_length': clean_read_length(phred),
+        'guide_mismatches': mismatches,
+        'guide_found': guide_found,
+    }
+
+def preflight_qc(file_name, record):
+    """Check a parsed sample against the QC thresholds and keep the verdict for its worker"""
+    settings = settings_for(file_name)
+    guides = [guide for guide in settings.guides if guide]
+    metrics = chromatogram_qc(record, guides, settings.left_trim, settings.right_trim)
+    
+    failures = []
+    if metrics['mean_phred'] < QC_MIN_MEAN_PHRED:
+        failures.append(f"mean Phred {metrics['mean_phred']:.1f} < {QC_MIN_MEAN_PHRED}")
+    if metrics['snr'] is not None and metrics['snr'] < QC_MIN_SNR:
+        failures.append(f"SNR {metrics['snr']:.1f} < {QC_MIN_SNR}")
+    if metrics['clean_length'] < QC_MIN_CLEAN_LENGTH:
+        failures.append(f"clean length {metrics['clean_length']} < {QC_MIN_CLEAN_LENGTH}")
+    if QC_REQUIRE_GUIDE and guides and not metrics['guide_found']:
+        failures.append("guide not found in base calls")
+    
+    columns = {
+        'QC_Status': f"Fail: {'; '.join(failures)}" if failures else 'Pass',
+        'QC_Mean_Phred': f"{metrics['mean_phred']:.1f}",
+        'QC_SNR': f"{metrics['snr']:.1f}" if metrics['snr'] is not None else '',
+        'QC_Clean_Length': metrics['clean_length'],
+        'QC_Guide_Found': ('Yes' if metrics['guide_found'] else 'No') if guides else '',
+    }
+    action = QC_FAIL_ACTION if failures and QC_FAIL_ACTION in ("skip", "ice") else None
+    with qc_lock:
+        qc_results[file_name] = (action, columns)
+    return columns
+
+def qc_verdict(file_name):
+    """(action, reason) for a sample: action is 'skip', 'ice' or None (analyze as usual)"""
+    with qc_lock:
+        action, columns = qc_results.get(file_name, (None, {}))
+    return action, columns.get('QC_Status', '')[len("Fail: "):]
+
+def qc_columns(file_name):
+    """QC report columns of a sample (empty if it was not checked)"""
+    with qc_lock:
+        return qc_results.pop(file_name, (None, {}))[1]
+
+def qc_skipped_record(file_name, reason):
+    """Report row for a sample skipped by the pre-flight QC. Returns (record, succeeded)."""
+    logger.warning(f"Skipping {file_name} - failed pre-flight QC: {reason}")
+    return {
+        'Sample': file_name,
+        'Primary_Tool': 'Indigo',
+        'Status': 'Skipped (QC)',
+        'Fallback_Used': 'No',
+        'Error': f"Failed pre-flight QC: {reason}"[:80]
+    }, False
+
+def run_qc_report():
+    """Pre-flight QC of the input folder only: write every sample's QC columns to a CSV"""
+    ab1_files = sorted(validate_prerequisites(check_browser=False))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, VALIDATION_WORKERS), thread_name_prefix="validate") as executor:
+        errors = list(executor.map(validate_sample, ab1_files))
+    seconds = time.perf_counter() - started
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    qc_path = os.path.join(os.path.dirname(indigo_output_dir), f"qc_report_{timestamp}.csv")
+    fieldnames = ['Sample', 'QC_Status', 'QC_Mean_Phred', 'QC_SNR', 'QC_Clean_Length', 'QC_Guide_Found', 'QC_Action']
+    failed = 0
+    with open(qc_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for file_name, error in zip(ab1_files, errors):
+            with qc_lock:
+                action, columns = qc_results.pop(file_name, (None, {}))
+            if error:
+                columns = {'QC_Status': f"Fail: unreadable ({error[:60]})"}
+            failed += columns.get('QC_Status', 'Pass') != 'Pass'
+            writer.writerow({'Sample': file_name, **columns, 'QC_Action': action or ''})
+    
+    logger.success(f"Pre-flight QC of {len(ab1_files)} samples in {seconds:.2f}s "
+                   f"({failed} failed, action: {QC_FAIL_ACTION}): {qc_path}")
+    return qc_path
+
+# ==================================================================================
+# INDIGO RESULT PARSING - TYPED REPORT COLUMNS FROM SAVED RESULTS
+# ==================================================================================
+INDIGO_RESULT_COLUMNS = [
+    'Indigo_Variant_Count', 'Indigo_Variants', 'Indigo_Indel_Sizes', 'Indigo_Genotype',
+    'Indigo_Allele1_Fraction', 'Indigo_Allele2_Fraction', 'Indigo_Alignment_Score',
+    'Indigo_Decomposition_Best_Indel', 'Indigo_Decomposition_Min_Error'
+]
+INDIGO_RESULT_SUFFIXES = ('_results_highlighted.html', '_local_results.json', '_indigo.json', '.html', '.htm')
+
+# The saved page is large (~150 KB, mostly Plotly SVG and scripts); the patterns below
+# only run on the slices around the element ids they need.
+VARIANT_ROW_PATTERN = re.compile(r'<tr>(.*?)</tr>', re.DOTALL)
+VARIANT_CELL_PATTERN = re.compile(r'<td title="(\w+)">([^<]*)</td>')
+ALLELE_FRACTION_PATTERN = re.compile(r'&gt;(Alt\d+):\S+ \(Estimated allelic fraction: ([0-9.eE+-]+)\)')
+ALIGNMENT_SCORE_PATTERN = re.compile(r'Alignment score: (-?\d+)')
+PLOT_OFFSET_PATTERN = re.compile(r'<g class="plot" transform="translate\(([-\d.]+),\s*([-\d.]+)\)"')
+XTICK_PATTERN = re.compile(r'class="xtick"><text[^>]*?data-unformatted="([^"]*)"[^>]*?transform="translate\(([-\d.]+),\s*[-\d.]+\)"')
+YTICK_PATTERN = re.compile(r'class="ytick"><text[^>]*?data-unformatted="([^"]*)"[^>]*?transform="translate\([-\d.]+,\s*([-\d.]+)\)"')
+POINT_PATTERN = re.compile(r'<path class="point" transform="translate\(([-\d.]+),\s*([-\d.]+)\)"')
+
+def empty_indigo_result():
+    return {column: None for column in INDIGO_RESULT_COLUMNS}
+
+def element_slice(html_content, element_id, end_marker):
+    """Text from the element with element_id up to end_marker ('' if the element is missing)"""
+    start = html_content.find(f'id="{element_id}"')
+    if start < 0:
+        return ''
+    end = html_content.find(end_marker, start)
+    return html_content[start:end if end >= 0 else len(html_content)]
+
+def indel_size(ref, alt):
+    """Signed indel length (+insertion / -deletion) from VCF-style alleles, None for substitutions"""
+    size = len(alt) - len(ref)
+    return size if size else None
+
+def format_variant(variant, size):
+    """'pos ref>alt type genotype' (local engine variants carry a signed size instead of alleles)"""
+    change = f"{variant['ref']}>{variant.get('alt', '')}" if 'ref' in variant else f"{size:+d}"
+    return f"{variant.get('pos', '')} {change} {variant.get('type', '')} {variant.get('genotype', '')}".strip()
+
+def summarize_variants(result, variants):
+    """Fill the variant columns from a list of {pos, ref, alt, type, genotype} dicts"""
+    sizes = [v['size'] if v.get('size') is not None else indel_size(v.get('ref', ''), v.get('alt', ''))
+             for v in variants]
+    result['Indigo_Variant_Count'] = len(variants)
+    result['Indigo_Variants'] = ';'.join(format_variant(v, size) for v, size in zip(variants, sizes))
+    result['Indigo_Indel_Sizes'] = ';'.join(f"{size:+d}" for size in sizes if size)
+    result['Indigo_Genotype'] = variants[0].get('genotype') if variants else None
+
+def tick_scale(ticks):
+    """Linear pixel -> value mapping fitted to Plotly axis tick labels"""
+    values, pixels = [], []
+    for label, pixel in ticks:
+        try:
+            values.append(float(label.replace('\u2212', '-')))
+            pixels.append(float(pixel))
+        except ValueError:
+            continue
+    if len(values) < 2:
+        return None
+    slope, intercept = np.polyfit(pixels, values, 1)
+    return lambda pixel: slope * pixel + intercept
+
+def parse_decomposition_svg(chart):
+    """(best indel, min error) read back from the rendered decomposition plot"""
+    offset = PLOT_OFFSET_PATTERN.search(chart)
+    x_scale = tick_scale(XTICK_PATTERN.findall(chart))
+    y_scale = tick_scale(YTICK_PATTERN.findall(chart))
+    points = POINT_PATTERN.findall(chart)
+    if not (offset and x_scale and y_scale and points):
+        return None, None
+    origin_x, origin_y = float(offset.group(1)), float(offset.group(2))
+    coordinates = np.array(points, dtype=np.float64)
+    x_values = x_scale(coordinates[:, 0] + origin_x)
+    y_values = y_scale(coordinates[:, 1] + origin_y)
+    best = int(np.argmin(y_values))
+    return int(round(x_values[best])), round(float(y_values[best]), 2)
+
+def parse_indigo_html(html_content):
+    """Typed result columns from an INDIGO result page (page source or downloaded HTML)"""
+    result = empty_indigo_result()
+    
+    table = element_slice(html_content, 'variants-table', '</table>')
+    variants = []
+    for row in VARIANT_ROW_PATTERN.findall(table):
+        cells = dict(VARIANT_CELL_PATTERN.findall(row))
+        if 'pos' in cells:
+            variants.append(cells)
+    if table:
+        summarize_variants(result, variants)
+    
+    fractions = {}
+    for allele, fraction in ALLELE_FRACTION_PATTERN.findall(html_content):
+        fractions.setdefault(allele, float(fraction))
+    result['Indigo_Allele1_Fraction'] = fractions.get('Alt1')
+    result['Indigo_Allele2_Fraction'] = fractions.get('Alt2')
+    
+    score = ALIGNMENT_SCORE_PATTERN.search(element_slice(html_content, 'alignment-chart-1', '</pre>'))
+    result['Indigo_Alignment_Score'] = int(score.group(1)) if score else None
+    
+    chart = element_slice(html_content, 'decomposition-chart', '</svg>')
+    if chart:
+        best_indel, min_error = parse_decomposition_svg(chart)
+        result['Indigo_Decomposition_Best_Indel'] = best_indel
+        result['Indigo_Decomposition_Min_Error'] = min_error
+    
+    return result
+
+def parse_indigo_json(data):
+    """Typed result columns from INDIGO API data or the local engine's results"""
+    result = empty_indigo_result()
+    if not isinstance(data, dict):
+        return result
+    data = data.get('data', data) if isinstance(data.get('data'), dict) else data
+    
+    variants = data.get('variants')
+    if isinstance(variants, dict) and 'columns' in variants:
+        variants = [dict(zip(variants['columns'], row)) for row in variants.get('rows', [])]
+    if isinstance(variants, list):
+        summarize_variants(result, [v for v in variants if isinstance(v, dict)])
+    
+    decomposition = data.get('decomposition')
+    if isinstance(decomposition, dict) and decomposition.get('x') and decomposition.get('y'):
+        # API: decomposition error per indel size
+        errors = np.asarray(decomposition['y'], dtype=np.float64)
+        best = int(np.argmin(errors))
+        result['Indigo_Decomposition_Best_Indel'] = int(decomposition['x'][best])
+        result['Indigo_Decomposition_Min_Error'] = round(float(errors[best]), 2)
+    elif isinstance(decomposition, list) and decomposition:
+        # Local engine: allele fractions per indel size, largest first
+        result['Indigo_Decomposition_Best_Indel'] = decomposition[0].get('indel')
+    
+    alleles = data.get('alleles')
+    if isinstance(alleles, list):
+        fractions = [allele.get('fraction') for allele in alleles if isinstance(allele, dict)]
+    else:
+        fractions = [data.get('allele1fraction'), data.get('allele2fraction')]
+        if fractions == [None, None]:
+            text = json.dumps(data)
+            fractions = [float(f) for f in re.findall(r'Estimated allelic fraction: ([0-9.]+)', text)[:2]]
+    fractions = (fractions + [None, None])[:2]
+    result['Indigo_Allele1_Fraction'] = float(fractions[0]) if fractions[0] is not None else None
+    result['Indigo_Allele2_Fraction'] = float(fractions[1]) if fractions[1] is not None else None
+    
+    score = data.get('align1score')
+    result['Indigo_Alignment_Score'] = int(score) if isinstance(score, (int, float)) else None
+    return result
+
+def parse_indigo_result_file(result_path):
+    """Parse a saved INDIGO result (.html or .json); returns the typed columns, all None on failure"""
+    try:
+        with open(result_path, encoding="utf-8", errors="replace") as result_file:
+            content = result_file.read()
+        if result_path.lower().endswith('.json'):
+            return parse_indigo_json(json.loads(content))
+        return parse_indigo_html(content)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not parse INDIGO result {os.path.basename(result_path)}: {e}")
+        return empty_indigo_result()
+
+def result_sample_name(file_name):
+    """Sample base name of a saved result file"""
+    lower = file_name.lower()
+    for suffix in INDIGO_RESULT_SUFFIXES:
+        if lower.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return os.path.splitext(file_name)[0]
+
+def backfill_indigo_results(folders, output_path=None):
+    """
+    Parse every saved INDIGO result under the given folders into one CSV of typed columns.
+    Returns the CSV path.
+    """
+    result_paths = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            raise AnalysisError(f"Backfill folder not found: {folder}")
+        for root, _, files in os.walk(folder):
+            result_paths.extend(os.path.join(root, name) for name in sorted(files)
+                                if name.lower().endswith(INDIGO_RESULT_SUFFIXES))
+    
+    started = time.perf_counter()
+    records = []
+    for result_path in result_paths:
+        record = {
+            'Sample': result_sample_name(os.path.basename(result_path)),
+            'Folder': os.path.dirname(result_path),
+            'Indigo_Result_File': os.path.basename(result_path),
+        }
+        record.update(parse_indigo_result_file(result_path))
+        records.append(record)
+    elapsed = time.perf_counter() - started
+    
+    if output_path is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_path = os.path.join(folders[0], f"indigo_backfill_{timestamp}.csv")
+    columns = ['Sample', 'Folder', 'Indigo_Result_File'] + INDIGO_RESULT_COLUMNS
+    pd.DataFrame(records, columns=columns).to_csv(output_path, index=False)
+    
+    rate = len(records) / elapsed if elapsed > 0 else float('inf')
+    logger.success(f"Backfilled {len(records)} INDIGO results in {elapsed:.2f}s ({rate:.0f}/s): {output_path}")
+    return output_path
+
+def run_indigo(input_file_path, driver, download_path=None, stats=None):
+    """Dispatch a sample to the configured INDIGO backend with its manifest settings"""
+    settings = settings_for(os.path.basename(input_file_path))
+    if INDIGO_BACKEND == "http":
+        backend = process_input_file_http
+    elif INDIGO_BACKEND == "local":
+        backend = process_input_file_local
+    else:
+        backend = process_input_file
+    return backend(
+        input_file_path,
+        grna_sequences=list(settings.guides),
+        driver=driver,
+        download_path=download_path,
+        stats=stats,
+        settings=settings
+    )
+
+def process_with_ice(input_file_path, ice_target_sequence, wildtype_path=None, retry_count=0):
+    """Process file with ICE as fallback with error handling"""
+    wildtype_path = wildtype_path or wild_type_file_path
+    
     if not ICE_AVAILABLE or single_sanger_analysis is None:
         return False, None, "ICE module not available"
     
-    file_name = os.path.basename(input_file_path)
-    sample_name = os.path.splitext(file_name)[0]
-    sample_dir = os.path.join(ice_output_dir, sample_name)
+    file_name = os.path.basename(input_file_path)
+    sample_name = os.path.splitext(file_name)[0]
+    sample_dir = os.path.join(ice_output_dir, sample_name)
+    timings = {}
+    
+    try:
+        # Create sample directory
+        with timed_stage(timings, 'ice_setup'):
+            try:
+                os.makedirs(sample_dir, exist_ok=True)
+            except OSError as e:
+                raise ICEError(f"Cannot create output directory: {e}")
+        
+            # Verify input file
+            if not os.path.exists(input_file_path):
+                raise ICEError(f"Input file not found: {input_file_path}")
+        
+            if not os.path.exists(wildtype_path):
+                raise ICEError(f"Wildtype file not found: {wildtype_path}")
+        
+            # Verify target sequence
+            if not ice_target_sequence or not isinstance(ice_target_sequence, str):
+                raise ICEError(f"Invalid target sequence: {ice_target_sequence}")
+            
+            # Guide must be in the control - checked once per reference, not per sample
+            try:
+                guide_error = ice_guide_error(wildtype_path, ice_target_sequence)
+            except Exception as e:
+                raise ICEError(f"Cannot read wildtype file: {e}")
+            if guide_error:
+                raise ICEError(guide_error)
+        
+        # Run ICE analysis
+        with timed_stage(timings, 'ice_analysis'):
+            try:
+                result_json = single_sanger_analysis(
+                    control_path=wildtype_path,
+                    sample_path=input_file_path,
+                    base_outputname=os.path.join(sample_dir, "ICE"),
+                    guide=ice_target_sequence,
+                    verbose=False
+                )
+            except Exception as e:
+                error_msg = str(e)
+                if "not found in control sequence" in error_msg:
+                    raise ICEError(f"Target sequence not found in control sequence")
+                elif "No such file or directory" in error_msg:
+                    raise ICEError(f"File not found during ICE analysis")
+                else:
+                    raise ICEError(f"ICE analysis failed: {error_msg[:100]}")
+        
+        # Parse results
+        parse_started = time.perf_counter()
+        try:
+            if isinstance(result_json, str):
+                res_data = json.loads(result_json)
+            else:
+                res_data = result_json
+            
+            indel = res_data.get('ice', 0)
+            r2 = res_data.get('rsq', 0)
+            
+            # Validate results
+            if indel is None:
+                indel = 0.0
+            if r2 is None:
+                r2 = 0.0
+            
+            indel = float(indel)
+            r2 = float(r2)
+            
+            # Check for suspicious results
+            if indel < 0 or indel > 100:
+                logger.warning(f"Unusual indel percentage for {sample_name}: {indel}%")
+            
+            if r2 < 0 or r2 > 1:
+                logger.warning(f"Unusual R² value for {sample_name}: {r2}")
+            
+            timings['stage_seconds']['ice_parse'] = time.perf_counter() - parse_started
+            result_dict = {
+                'indel_percentage': indel,
+                'r_squared': r2,
+                'stage_seconds': timings['stage_seconds']
+            }
+            
+            return True, result_dict, None
+            
+        except (json.JSONDecodeError, ValueError, KeyError) as e:
+            raise ICEError(f"Error parsing ICE results: {e}")
+        
+    except ICEError as e:
+        logger.debug(f"ICE Error: {str(e)}")
+        return False, None, str(e)
+    except Exception as e:
+        logger.debug(f"Unexpected error in process_with_ice: {e}")
+        import traceback
+        logger.debug(traceback.format_exc())
+        return False, None, f"Unexpected error: {str(e)[:100]}"
+
+# ==================================================================================
+# ICE ALIGNMENT PARSING - BATCH INDEL SUMMARY FROM ICE.all.txt
+# ==================================================================================
+ICE_ALIGNMENT_FILE = "ICE.all.txt"
+ICE_INDEL_COLUMNS = ['ICE_Cut_Site', 'ICE_Indel_Positions', 'ICE_Indel_Sizes', 'ICE_Net_Indel', 'ICE_Frameshift']
+GAP = ord('-')
+
+def read_ice_alignment(alignment_path):
+    """(control, edited) rows of an ICE alignment file as bytes, gaps included"""
+    control, edited = [], []
+    with open(alignment_path, 'rb') as alignment_file:
+        for line in alignment_file:
+            fields = line.split()
+            if len(fields) != 2:
+                continue
+            if fields[0] == b'control':
+                control.append(fields[1])
+            elif fields[0] == b'edited':
+                edited.append(fields[1])
+    return b''.join(control).upper(), b''.join(edited).upper()
+
+def load_ice_alignments(sample_names):
+    """
+    Load ICE_RESULTS/<sample>/ICE.all.txt for every sample that has one.
+    Returns (names, control, edited): two padded uint8 matrices, one row per sample (0 = padding).
+    """
+    names, rows = [], []
+    for sample_name in sample_names:
+        alignment_path = os.path.join(ice_output_dir, sample_name, ICE_ALIGNMENT_FILE)
+        if not os.path.exists(alignment_path):
+            continue
+        try:
+            control, edited = read_ice_alignment(alignment_path)
+        except OSError as e:
+            logger.warning(f"Could not read ICE alignment for {sample_name}: {e}")
+            continue
+        if control and len(control) == len(edited):
+            names.append(sample_name)
+            rows.append((control, edited))
+    
+    width = max((len(control) for control, _ in rows), default=0)
+    control_matrix = np.zeros((len(rows), width), dtype=np.uint8)
+    edited_matrix = np.zeros((len(rows), width), dtype=np.uint8)
+    for i, (control, edited) in enumerate(rows):
+        control_matrix[i, :len(control)] = np.frombuffer(control, dtype=np.uint8)
+        edited_matrix[i, :len(edited)] = np.frombuffer(edited, dtype=np.uint8)
+    return names, control_matrix, edited_matrix
+
+def ice_cut_offset(control_row, guide):
+    """Control bases 5' of the Cas9 cut (3 bp from the PAM), i.e. the cut follows base N; -1 if the guide is absent"""
+    if not guide:
+        return -1
+    ungapped = control_row[(control_row != 0) & (control_row != GAP)].tobytes()
+    guide = guide.upper().encode('ascii')
+    index = ungapped.find(guide)
+    if index >= 0:
+        return index + len(guide) - 3
+    index = ungapped.find(reverse_complement(guide.decode('ascii')).encode('ascii'))
+    return index + 3 if index >= 0 else -1
+
+def gap_runs(mask):
+    """(row, start, length) of every run of True along axis 1"""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # Row-major order pairs every end with its start
+    return start_rows, starts, ends - starts
+
+def summarize_ice_indels(control, edited, cut_offsets, window=ICE_INDEL_WINDOW):
+    """
+    Indels within 'window' bases of each sample's cut site, from padded alignment matrices.
+    Terminal gaps (alignment overhangs) are ignored. A cut offset of -1 searches the whole row.
+    Returns one dict of ICE_INDEL_COLUMNS per row.
+    """
+    n_rows = control.shape[0]
+    present = control != 0
+    control_base = present & (control != GAP)
+    edited_base = present & (edited != GAP)
+    
+    # Gaps before the first / after the last base of a row are overhangs, not indels
+    def internal(bases):
+        seen_before = np.logical_or.accumulate(bases, axis=1)
+        seen_after = np.logical_or.accumulate(bases[:, ::-1], axis=1)[:, ::-1]
+        return seen_before & seen_after
+    
+    coordinate = np.cumsum(control_base, axis=1)  # Control bases up to and including each column
+    cut_offsets = np.asarray(cut_offsets, dtype=np.int64)
+    has_cut = cut_offsets >= 0
+    cut_columns = np.argmax(coordinate > cut_offsets[:, None], axis=1)
+    columns = np.arange(control.shape[1])[None, :]
+    near_cut = ~has_cut[:, None] | (np.abs(columns - cut_columns[:, None]) <= window)
+    
+    deletions = present & ~edited_base & control_base & internal(edited_base) & near_cut
+    insertions = present & ~control_base & edited_base & internal(control_base) & near_cut
+    
+    del_rows, del_starts, del_lengths = gap_runs(deletions)
+    ins_rows, ins_starts, ins_lengths = gap_runs(insertions)
+    rows = np.concatenate([del_rows, ins_rows])
+    starts = np.concatenate([del_starts, ins_starts])
+    sizes = np.concatenate([-del_lengths, ins_lengths])
+    # 1-based control coordinate: first deleted base, or the base an insertion follows (VCF style)
+    positions = coordinate[rows, starts]
+    net = np.bincount(rows, weights=sizes, minlength=n_rows).astype(np.int64)
+    
+    order = np.lexsort((positions, rows))
+    rows, positions, sizes = rows[order], positions[order], sizes[order]
+    bounds = np.searchsorted(rows, np.arange(n_rows + 1))
+    summaries = []
+    for i in range(n_rows):
+        row_positions = positions[bounds[i]:bounds[i + 1]]
+        row_sizes = sizes[bounds[i]:bounds[i + 1]]
+        summaries.append({
+            'ICE_Cut_Site': int(cut_offsets[i]) if has_cut[i] else None,
+            'ICE_Indel_Positions': ';'.join(str(p) for p in row_positions.tolist()),
+            'ICE_Indel_Sizes': ';'.join(f"{size:+d}" for size in row_sizes.tolist()),
+            'ICE_Net_Indel': int(net[i]),
+            'ICE_Frameshift': 'Yes' if net[i] % 3 else 'No',
+        })
+    return summaries
+
+def add_ice_indel_columns(records, guide=None):
+    """Append ICE_INDEL_COLUMNS to every report row that carries ICE results (in place)"""
+    guide = ICE_TARGET_SEQUENCE_FALLBACK if guide is None else guide
+    by_sample = {os.path.splitext(r['Sample'])[0]: r for r in records if r.get('ICE_Indel_%') not in (None, '')}
+    if not by_sample:
+        return 0
+    
+    names, control, edited = load_ice_alignments(list(by_sample))
+    if not names:
+        return 0
+    cut_offsets = [ice_cut_offset(row, guide) for row in control]
+    for name, summary in zip(names, summarize_ice_indels(control, edited, cut_offsets)):
+        by_sample[name].update(summary)
+    return len(names)
+
+# ==================================================================================
+# RESULT CACHE - CONTENT-ADDRESSED BY CHROMATOGRAM BYTES AND SETTINGS
+# ==================================================================================
+RESULT_CACHE_VERSION = 1
+
+def hash_file(file_path, digest=None):
+    """Feed a file into a hashlib digest in chunks and return the digest"""
+    digest = digest or hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest
+
+class ResultCache:
+    """
+    On-disk cache of finished samples keyed by sha256(sample bytes, wildtype bytes,
+    gRNAs, ICE guide, trim and peak-ratio settings, INDIGO backend). Each entry stores the report row,
+    the ICE result dict and a copy of the INDIGO result file. Size-bounded LRU eviction.
+    """
+    
+    ENTRY_FILE = "entry.json"
+    
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self._wildtype_digests = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+    
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+    
+    def _load_index(self):
+        """Rebuild the LRU order from entry modification times"""
+        found = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, key)
+                try:
+                    last_used = os.path.getmtime(os.path.join(entry_dir, self.ENTRY_FILE))
+                    size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+                except OSError:
+                    continue
+                found.append((last_used, key, size))
+        
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+    
+    def _wildtype_digest(self, wild_type_path):
+        stat = os.stat(wild_type_path)
+        cache_key = (wild_type_path, stat.st_mtime, stat.st_size)
+        if cache_key not in self._wildtype_digests:
+            self._wildtype_digests[cache_key] = hash_file(wild_type_path).hexdigest()
+        return self._wildtype_digests[cache_key]
+    
+    def make_key(self, input_file_path, sample=None):
+        """Content hash of everything that determines a sample's result"""
+        sample = sample or settings_for(os.path.basename(input_file_path))
+        digest = hash_file(input_file_path)
+        settings = {
+            'version': RESULT_CACHE_VERSION,
+            'wildtype': self._wildtype_digest(sample.wildtype),
+            'grna_sequences': list(sample.guides),
+            'ice_guide': sample.ice_guide,
+            'left_trim': sample.left_trim,
+            'right_trim': sample.right_trim,
+            'peak_ratio': INDIGO_PEAK_RATIO,
+            'backend': INDIGO_BACKEND,
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Return the cached entry dict, or None on a miss"""
+        entry_file = os.path.join(self._entry_dir(key), self.ENTRY_FILE)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            try:
+                with open(entry_file, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                os.utime(entry_file)
+            except (OSError, ValueError):
+                self._evict(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+    
+    def restore_artifacts(self, key, entry, sample_base_name):
+        """
+        Copy cached INDIGO result files back into the output folder if missing.
+        Identical chromatograms may be cached under another sample's name, so files are
+        renamed to the requesting sample. Returns {cached name: restored name}.
+        """
+        source_base_name = entry.get('sample_base_name', '')
+        restored = {}
+        for file_name in entry.get('artifacts', []):
+            restored_name = file_name
+            if source_base_name and file_name.startswith(source_base_name):
+                restored_name = sample_base_name + file_name[len(source_base_name):]
+            restored[file_name] = restored_name
+            
+            destination = os.path.join(indigo_output_dir, restored_name)
+            if not os.path.exists(destination):
+                try:
+                    shutil.copy2(os.path.join(self._entry_dir(key), file_name), destination)
+                except OSError as e:
+                    logger.warning(f"Could not restore cached file {file_name}: {e}")
+        return restored
+    
+    def put(self, key, record, succeeded):
+        """Store a finished sample; only successful results are cached"""
+        if not succeeded:
+            return
+        
+        entry_dir = self._entry_dir(key)
+        sample_base_name = os.path.splitext(record.get('Sample', ''))[0]
+        record = {k: v for k, v in record.items() if k not in ('Sample', 'Cached')}
+        artifacts = []
+        ice_results = None
+        if record.get('ICE_Indel_%'):
+            ice_results = {
+                'indel_percentage': float(record['ICE_Indel_%']),
+                'r_squared': float(record.get('ICE_R²') or 0.0)
+            }
+        
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            result_file = record.get('Indigo_Result_File')
+            if result_file and os.path.exists(os.path.join(indigo_output_dir, result_file)):
+                shutil.copy2(os.path.join(indigo_output_dir, result_file), os.path.join(entry_dir, result_file))
+                artifacts.append(result_file)
+            
+            with open(os.path.join(entry_dir, self.ENTRY_FILE), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'record': record,
+                    'succeeded': succeeded,
+                    'ice': ice_results,
+                    'artifacts': artifacts,
+                    'sample_base_name': sample_base_name
+                }, f)
+            size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+        except OSError as e:
+            logger.warning(f"Could not write result cache entry: {e}")
+            return
+        
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._evict(next(iter(self.entries)))
+    
+    def _evict(self, key):
+        self.total_bytes -= self.entries.pop(key, 0)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+result_cache = None  # ResultCache instance, created in main() when RESULT_CACHE_ENABLED
+
+def lookup_cached_record(file_name):
+    """
+    Look up a sample in the result cache.
+    Returns (key, record, succeeded) - record is None on a miss or when caching is off.
+    """
+    if result_cache is None:
+        return None, None, False
+    
+    try:
+        key = result_cache.make_key(os.path.join(input_folder_path, file_name))
+    except OSError as e:
+        logger.warning(f"Could not hash {file_name} for the result cache: {e}")
+        return None, None, False
+    
+    entry = result_cache.get(key)
+    if entry is None:
+        return key, None, False
+    
+    restored = result_cache.restore_artifacts(key, entry, os.path.splitext(file_name)[0])
+    record = dict(entry['record'])
+    record['Sample'] = file_name
+    if record.get('Indigo_Result_File') in restored:
+        record['Indigo_Result_File'] = restored[record['Indigo_Result_File']]
+    record['Cached'] = 'Yes'
+    # Timings belong to the run that produced the entry, not to this one
+    for column in STAGE_COLUMNS:
+        record.pop(column, None)
+    logger.success(f"Cached result reused: {file_name}")
+    return key, record, entry['succeeded']
+
+# ==================================================================================
+# RUN JOURNAL - CRASH-SAFE, RESUMABLE PROGRESS
+# ==================================================================================
+class RunJournal:
+    """
+    Durable per-sample journal (SQLite in WAL mode). Every state transition
+    (pending -> indigo -> ice -> done/failed) is committed as it happens, so a crash or
+    Ctrl-C loses at most the samples in flight. The final report is rebuilt from it.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS samples (
+                sample TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                record TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sample TEXT NOT NULL,
+                state TEXT NOT NULL,
+                detail TEXT,
+                at TEXT NOT NULL
+            );
+        """)
+    
+    def _now(self):
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def start_run(self, file_names, resume=False):
+        """
+        Register the samples of a run and return the ones still to process.
+        Without resume the journal starts fresh; with resume 'done' samples are skipped.
+        """
+        now = self._now()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not resume:
+                    self.conn.execute("DELETE FROM samples")
+                    self.conn.execute("DELETE FROM events")
+                
+                done = {row[0] for row in self.conn.execute("SELECT sample FROM samples WHERE state = 'done'")}
+                to_process = [f for f in file_names if f not in done]
+                for position, file_name in enumerate(file_names):
+                    self.conn.execute(
+                        "INSERT INTO samples (sample, position, state, updated_at) VALUES (?, ?, 'pending', ?) "
+                        "ON CONFLICT(sample) DO UPDATE SET position = excluded.position, "
+                        "state = CASE WHEN samples.state = 'done' THEN 'done' ELSE 'pending' END, "
+                        "updated_at = excluded.updated_at",
+                        (file_name, position, now)
+                    )
+                self.conn.executemany(
+                    "INSERT INTO events (sample, state, detail, at) VALUES (?, 'pending', ?, ?)",
+                    [(f, 'resume' if resume else 'start', now) for f in to_process]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return to_process
+    
+    def mark(self, file_name, state, detail=''):
+        """Record a state transition of one sample"""
+        now = self._now()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "UPDATE samples SET state = ?, attempts = attempts + (? = 'indigo'), updated_at = ? WHERE sample = ?",
+                (state, state, now, file_name)
+            )
+            self.conn.execute(
+                "INSERT INTO events (sample, state, detail, at) VALUES (?, ?, ?, ?)",
+                (file_name, state, detail[:200], now)
+            )
+            self.conn.execute("COMMIT")
+    
+    def finish(self, record, succeeded):
+        """Store the final report row of a sample"""
+        file_name = record['Sample']
+        state = 'done' if succeeded else 'failed'
+        now = self._now()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "UPDATE samples SET state = ?, record = ?, updated_at = ? WHERE sample = ?",
+                (state, json.dumps(record), now, file_name)
+            )
+            self.conn.execute(
+                "INSERT INTO events (sample, state, detail, at) VALUES (?, ?, ?, ?)",
+                (file_name, state, record.get('Status', ''), now)
+            )
+            self.conn.execute("COMMIT")
+    
+    def records(self):
+        """All finished rows in input order, as (record, succeeded) pairs"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT record, state FROM samples WHERE record IS NOT NULL ORDER BY position"
+            ).fetchall()
+        return [(json.loads(record), state == 'done') for record, state in rows]
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+run_journal = None  # RunJournal instance, created in main() when JOURNAL_ENABLED
+
+def journal_mark(file_name, state, detail=''):
+    """Record a sample state transition if the journal is enabled"""
+    if run_journal is not None:
+        try:
+            run_journal.mark(file_name, state, detail)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update run journal for {file_name}: {e}")
+
+# ==================================================================================
+# DISTRIBUTED QUEUE - SHARED SQLITE WORK QUEUE WITH LEASES
+# ==================================================================================
+class DistributedQueue:
+    """
+    Work queue shared by a coordinator and workers on several machines (one SQLite file on a
+    shared mount). Rollback-journal mode is used instead of WAL, which needs shared memory that
+    network file systems do not provide; BEGIN IMMEDIATE serializes claims through SQLite's
+    file lock. Claimed samples are leased - a lease that is not renewed expires and the sample
+    is queued again. Finished rows are kept in the queue for the coordinator's merged report.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (
+                sample TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                succeeded INTEGER,
+                record TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS queue_state ON queue (state, position);
+        """)
+    
+    def _transaction(self, statements):
+        """Run statements(conn) in one write transaction and return its result"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+    
+    def enqueue(self, file_names):
+        """Add samples in input order; samples already in the queue keep their state (restartable)"""
+        now = time.time()
+        return self._transaction(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO queue (sample, position, state, updated_at) VALUES (?, ?, 'queued', ?)",
+            [(file_name, position, now) for position, file_name in enumerate(file_names)]
+        ).rowcount)
+    
+    def _requeue_expired(self, conn, now):
+        """Queue samples with an expired lease again; fail the ones claimed too often"""
+        expired = conn.execute(
+            "SELECT sample, worker, attempts FROM queue WHERE state = 'leased' AND lease_expires < ?", (now,)
+        ).fetchall()
+        for sample, worker, attempts in expired:
+            if attempts >= QUEUE_MAX_ATTEMPTS:
+                record = {
+                    'Sample': sample,
+                    'Primary_Tool': 'Indigo',
+                    'Status': 'Failed (lease expired)',
+                    'Fallback_Used': 'N/A',
+                    'Error': f"Lease expired after {attempts} claims (last worker: {worker})"
+                }
+                conn.execute(
+                    "UPDATE queue SET state = 'done', succeeded = 0, record = ?, lease_expires = NULL, "
+                    "updated_at = ? WHERE sample = ?",
+                    (json.dumps(record), now, sample)
+                )
+            else:
+                conn.execute(
+                    "UPDATE queue SET state = 'queued', worker = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE sample = ?",
+                    (now, sample)
+                )
+        return len(expired)
+    
+    def requeue_expired(self):
+        """Return expired leases to the queue; returns the number of expired leases"""
+        return self._transaction(lambda conn: self._requeue_expired(conn, time.time()))
+    
+    def claim(self, worker, count=1):
+        """Lease up to 'count' queued samples to a worker; returns [(position, file_name)]"""
+        def statements(conn):
+            now = time.time()
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT position, sample FROM queue WHERE state = 'queued' ORDER BY position LIMIT ?", (count,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE queue SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE sample = ?",
+                [(worker, now + LEASE_SECONDS, now, sample) for _, sample in rows]
+            )
+            return rows
+        return self._transaction(statements)
+    
+    def renew(self, worker):
+        """Extend every lease a worker holds; returns the number of leases"""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE queue SET lease_expires = ? WHERE state = 'leased' AND worker = ?",
+            (now + LEASE_SECONDS, worker)
+        ).rowcount)
+    
+    def complete(self, worker, record, succeeded):
+        """Store the final report row of a sample; the first completion wins"""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE queue SET state = 'done', succeeded = ?, record = ?, worker = ?, lease_expires = NULL, "
+            "updated_at = ? WHERE sample = ? AND state != 'done'",
+            (int(succeeded), json.dumps(record), worker, now, record['Sample'])
+        ).rowcount == 1)
+    
+    def release(self, worker):
+        """Return the unfinished samples of a stopping worker to the queue"""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE queue SET state = 'queued', worker = NULL, lease_expires = NULL, "
+            "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE state = 'leased' AND worker = ?",
+            (now, worker)
+        ).rowcount)
+    
+    def counts(self):
+        """Number of samples per state"""
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM queue GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in ('queued', 'leased', 'done')}
+    
+    def outstanding(self):
+        """Number of samples not finished yet (queued or leased)"""
+        counts = self.counts()
+        return counts['queued'] + counts['leased']
+    
+    def workers(self):
+        """Finished samples per worker"""
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT worker, COUNT(*) FROM queue WHERE state = 'done' AND worker IS NOT NULL GROUP BY worker"
+            ).fetchall())
+    
+    def records(self):
+        """All finished rows in input order, as (record, succeeded) pairs"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT record, succeeded FROM queue WHERE state = 'done' ORDER BY position"
+            ).fetchall()
+        return [(json.loads(record), bool(succeeded)) for record, succeeded in rows]
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+worker_node = None  # Name of this process in --worker mode; keeps its directories apart from other workers
+
+def node_prefix():
+    """Directory name prefix of this worker process ('' outside --worker mode)"""
+    return f"{worker_node}_" if worker_node else ""
+
+# ==================================================================================
+# REPORT - FIXED SCHEMA, STREAMING CSV/PARQUET WRITER
+# ==================================================================================
+REPORT_SCHEMA = [
+    ('Sample', 'str'), ('Wildtype', 'str'), ('Primary_Tool', 'str'), ('Status', 'str'), ('Fallback_Used', 'str'),
+    ('Cached', 'str'), ('Hedged', 'str'), ('Winner', 'str'), ('Indigo_Status', 'str'),
+    ('Indigo_Breaker', 'str'), ('Breaker_Event', 'str'),
+    ('QC_Status', 'str'), ('QC_Mean_Phred', 'float'), ('QC_SNR', 'float'), ('QC_Clean_Length', 'int'),
+    ('QC_Guide_Found', 'str'),
+    ('Indigo_Wait_s', 'float'), ('Indigo_Wait_Saved_s', 'float'), ('Indigo_Latency_s', 'float'),
+    ('Indigo_Result_File', 'str'),
+    ('Indigo_Variant_Count', 'int'), ('Indigo_Variants', 'str'), ('Indigo_Indel_Sizes', 'str'),
+    ('Indigo_Genotype', 'str'), ('Indigo_Allele1_Fraction', 'float'), ('Indigo_Allele2_Fraction', 'float'),
+    ('Indigo_Alignment_Score', 'int'), ('Indigo_Decomposition_Best_Indel', 'int'),
+    ('Indigo_Decomposition_Min_Error', 'float'),
+    ('Local_Indel_Percentage', 'float'), ('Local_R_Squared', 'float'), ('Local_Breakpoint', 'int'),
+    ('Local_Alleles', 'str'),
+    ('ICE_Indel_%', 'float'), ('ICE_R²', 'float'), ('ICE_Latency_s', 'float'),
+    ('ICE_Cut_Site', 'int'), ('ICE_Indel_Positions', 'str'), ('ICE_Indel_Sizes', 'str'),
+    ('ICE_Net_Indel', 'int'), ('ICE_Frameshift', 'str'),
+] + [(column, 'float') for column in STAGE_COLUMNS] + [
+    ('Indigo_Error', 'str'), ('ICE_Error', 'str'), ('Error', 'str'),
+]
+REPORT_COLUMNS = [name for name, _ in REPORT_SCHEMA]
+REPORT_COLUMN_TYPES = dict(REPORT_SCHEMA)
+
+def coerce_report_value(value, kind):
+    """Typed value of a report cell (None when empty or not parseable)"""
+    if value is None or value == '':
+        return None
+    if kind == 'str':
+        return str(value)
+    try:
+        return int(float(value)) if kind == 'int' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+class ReportWriter:
+    """
+    Streams finished report rows to CSV (and Parquet when pyarrow is available).
+    Rows may finish in any order; a reorder buffer releases them in sample_order (the order
+    the samples are scheduled in, so a row waits only for samples started before it), and
+    released rows are appended every REPORT_FLUSH_INTERVAL seconds. Summary counters are
+    updated as rows arrive, so finishing the report never re-reads it.
+    """
+    
+    def __init__(self, csv_path, sample_order, parquet_path=None, flush_interval=REPORT_FLUSH_INTERVAL,
+                 flush_rows=REPORT_FLUSH_ROWS):
+        self.csv_path = csv_path
+        self.parquet_path = parquet_path if pa is not None else None
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.lock = threading.Lock()
+        
+        self.positions = {file_name: position for position, file_name in enumerate(sample_order)}
+        self.expected = sorted(self.positions.values())
+        self.next_slot = 0  # Index into self.expected of the next row to release
+        self.buffered = {}  # position -> row, waiting for earlier samples
+        self.pending = []  # Released rows not yet on disk
+        self.last_flush = time.time()
+        self.unknown_columns = set()
+        
+        self.rows = 0
+        self.successful = 0
+        self.failed = 0
+        self.status_counts = {}
+        self.wait_saved_total = 0.0
+        self.wait_saved_count = 0
+        
+        self.parquet_writer = None
+        self.parquet_schema = None
+        if self.parquet_path:
+            arrow_types = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+            self.parquet_schema = pa.schema([(name, arrow_types[kind]) for name, kind in REPORT_SCHEMA])
+        elif parquet_path:
+            logger.warning("pyarrow not installed - writing the CSV report only")
+        
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            csv.writer(csv_file).writerow(REPORT_COLUMNS)
+    
+    def _row(self, record):
+        unknown = set(record) - set(REPORT_COLUMN_TYPES) - self.unknown_columns
+        if unknown:
+            self.unknown_columns |= unknown
+            logger.warning(f"Report columns not in REPORT_SCHEMA are dropped: {', '.join(sorted(unknown))}")
+        return [record.get(name) for name in REPORT_COLUMNS]
+    
+    def write(self, record, succeeded):
+        """Add one finished sample; rows reach disk in sample order"""
+        row = self._row(record)
+        with self.lock:
+            self.rows += 1
+            if succeeded:
+                self.successful += 1
+            else:
+                self.failed += 1
+            status = record.get('Status', '')
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            wait_saved = coerce_report_value(record.get('Indigo_Wait_Saved_s'), 'float')
+            if wait_saved is not None:
+                self.wait_saved_total += wait_saved
+                self.wait_saved_count += 1
+            
+            position = self.positions.get(record.get('Sample'))
+            if position is None:
+                self.pending.append(row)  # Not part of this run's input - no ordering constraint
+            else:
+                self.buffered[position] = row
+                self._release()
+            
+            if len(self.pending) >= self.flush_rows or time.time() - self.last_flush >= self.flush_interval:
+                self._flush()
+    
+    def _release(self, force=False):
+        """Move rows whose predecessors are all finished from the reorder buffer to pending"""
+        while self.next_slot < len(self.expected):
+            position = self.expected[self.next_slot]
+            if position in self.buffered:
+                self.pending.append(self.buffered.pop(position))
+            elif not force:
+                break
+            self.next_slot += 1
+    
+    def _flush(self):
+        self.last_flush = time.time()
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as csv_file:
+            csv.writer(csv_file).writerows([['' if value is None else value for value in row] for row in rows])
+        
+        if self.parquet_schema is not None:
+            try:
+                columns = [
+                    [coerce_report_value(row[i], kind) for row in rows]
+                    for i, (_, kind) in enumerate(REPORT_SCHEMA)
+                ]
+                table = pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, self.parquet_schema)],
+                    schema=self.parquet_schema
+                )
+                if self.parquet_writer is None:
+                    self.parquet_writer = pq.ParquetWriter(self.parquet_path, self.parquet_schema)
+                self.parquet_writer.write_table(table)
+            except (pa.ArrowException, OSError) as e:
+                logger.warning(f"Parquet report disabled after write error: {e}")
+                self.parquet_schema = None
+    
+    def flush(self):
+        with self.lock:
+            self._flush()
+    
+    def close(self):
+        """Write everything still buffered (samples that never finished leave no row)"""
+        with self.lock:
+            self._release(force=True)
+            self._flush()
+            if self.parquet_writer is not None:
+                self.parquet_writer.close()
+                self.parquet_writer = None
+    
+    def summary(self):
+        with self.lock:
+            return {
+                'rows': self.rows,
+                'successful': self.successful,
+                'failed': self.failed,
+                'status_counts': dict(self.status_counts),
+                'wait_saved_total': self.wait_saved_total,
+                'wait_saved_count': self.wait_saved_count,
+            }
+
+# ==================================================================================
+# CIRCUIT BREAKER - INDIGO HEALTH, RETRY BUDGETS AND BACKOFF
+# ==================================================================================
+BREAKER_OPEN_ERROR = "INDIGO circuit breaker open - sent straight to ICE"
+NO_SESSION_ERROR = "WebDriver session unavailable"  # The worker's browser could not be restarted
+
+# Error classes by message prefix/fragment; 'analysis' (INDIGO rejected the sample) is never retried
+INDIGO_ERROR_CLASSES = [
+    # A dead browser first - its messages can also read like connection errors or timeouts
+    ('session', ("WebDriver session crashed", NO_SESSION_ERROR, "invalid session id", "session deleted",
+                 "chrome not reachable")),
+    ('connection', ("Error posting", "Error polling", "non-JSON response", "WebDriver error accessing")),
+    ('timeout', ("Timeout", "did not finish within")),
+    ('stale', ("Stale element", "Element reference became stale")),
+    ('session', ("WebDriver error",)),
+]
+
+def classify_indigo_error(message):
+    """Error class of an INDIGO failure message ('analysis' when it is not an infrastructure error)"""
+    message = message or ''
+    for error_class, fragments in INDIGO_ERROR_CLASSES:
+        if any(fragment in message for fragment in fragments):
+            return error_class
+    return 'analysis'
+
+class RetryBudget:
+    """Retries left for one sample per error class, with exponential backoff and full jitter"""
+    
+    def __init__(self):
+        self.remaining = dict(RETRY_BUDGETS)
+        self.retries = 0
+    
+    def next_delay(self, error_class):
+        """Seconds to wait before the next attempt, or None when this error is not retried"""
+        if self.remaining.get(error_class, 0) <= 0 or not indigo_breaker.allows_retry():
+            return None
+        self.remaining[error_class] -= 1
+        self.retries += 1
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** self.retries))
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for the INDIGO service. Opens when too many recent samples
+    failed with infrastructure errors or were too slow; while open, samples skip INDIGO. After
+    BREAKER_OPEN_SECONDS one half-open probe sample is let through - success closes the
+    breaker, failure reopens it for twice as long (up to BREAKER_MAX_OPEN_SECONDS).
+    Each sample's view of the breaker and the transitions it caused go into its report row.
+    """
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.state = 'closed'
+        self.window = deque(maxlen=BREAKER_WINDOW)  # (failed, slow) of recent samples
+        self.open_seconds = BREAKER_OPEN_SECONDS
+        self.open_until = 0.0
+        self.probe = None  # Sample currently probing a half-open breaker
+        self.notes = {}  # file name -> report columns, until the row is recorded
+        self.transitions = []
+        self.opens = 0
+        self.rejected = 0
+    
+    def _transition(self, state, reason, file_name):
+        self.state = state
+        event = f"{state}: {reason}"
+        self.transitions.append({'at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'state': state,
+                                 'reason': reason, 'sample': file_name})
+        note = self.notes.setdefault(file_name, {})
+        note['Breaker_Event'] = f"{note['Breaker_Event']}; {event}" if note.get('Breaker_Event') else event
+        if state == 'open':
+            self.opens += 1
+            self.open_until = time.time() + self.open_seconds
+            logger.warning(f"INDIGO circuit breaker opened ({reason}) - samples go straight to ICE "
+                           f"for {self.open_seconds:.0f}s")
+        else:
+            logger.info(f"INDIGO circuit breaker {state.replace('_', '-')} ({reason})")
+    
+    def allow(self, file_name):
+        """
+        Decide whether a sample may use INDIGO: returns 'closed', 'probe' (the half-open test
+        sample) or None (open - send the sample to ICE)
+        """
+        if not self.enabled:
+            return 'closed'
+        with self.lock:
+            if self.state == 'open' and time.time() >= self.open_until:
+                self._transition('half_open', f"probing with {file_name}", file_name)
+            if self.state == 'half_open' and self.probe is None:
+                self.probe = file_name
+                mode = 'probe'
+            elif self.state == 'closed':
+                mode = 'closed'
+            else:
+                mode = None
+                self.rejected += 1
+            self.notes.setdefault(file_name, {})['Indigo_Breaker'] = 'half_open' if mode == 'probe' else self.state
+            return mode
+    
+    def allows_retry(self):
+        """Retries are only spent while the breaker is closed"""
+        return not self.enabled or self.state == 'closed'
+    
+    def record(self, file_name, mode, error, seconds):
+        """
+        Outcome of a sample let through by allow(); error is None on success. A crashed
+        browser session says nothing about the INDIGO service and is left out of the window.
+        """
+        if not self.enabled or mode is None:
+            return
+        error_class = classify_indigo_error(error) if error is not None else None
+        failed = error_class not in (None, 'analysis')
+        slow = seconds >= BREAKER_SLOW_SECONDS
+        with self.lock:
+            if error_class == 'session':
+                if mode == 'probe':
+                    self.probe = None  # The next sample probes instead
+                return
+            if mode == 'probe':
+                self.probe = None
+                if failed or slow:
+                    self.open_seconds = min(self.open_seconds * 2, BREAKER_MAX_OPEN_SECONDS)
+                    self._transition('open', f"probe {file_name} {'failed' if failed else 'slow'}", file_name)
+                else:
+                    self.open_seconds = BREAKER_OPEN_SECONDS
+                    self.window.clear()
+                    self._transition('closed', f"probe {file_name} succeeded", file_name)
+                return
+            if self.state != 'closed':
+                return  # Started before the breaker opened
+            
+            self.window.append((failed, slow))
+            if len(self.window) < BREAKER_MIN_SAMPLES:
+                return
+            failures = sum(f for f, _ in self.window)
+            slow_calls = sum(s for _, s in self.window)
+            if failures >= BREAKER_FAILURE_RATE * len(self.window):
+                self._transition('open', f"{failures}/{len(self.window)} recent samples failed", file_name)
+            elif slow_calls >= BREAKER_SLOW_RATE * len(self.window):
+                self._transition('open', f"{slow_calls}/{len(self.window)} recent samples slower than "
+                                         f"{BREAKER_SLOW_SECONDS}s", file_name)
+    
+    def take(self, file_name):
+        """Report columns of a sample (Indigo_Breaker, Breaker_Event)"""
+        with self.lock:
+            return self.notes.pop(file_name, {})
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'state': self.state,
+                'opens': self.opens,
+                'rejected': self.rejected,
+                'transitions': list(self.transitions),
+            }
+    
+    def prometheus_lines(self):
+        """Breaker metrics in Prometheus text format"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP hybrid_indigo_breaker_state Current INDIGO circuit breaker state",
+            "# TYPE hybrid_indigo_breaker_state gauge",
+        ]
+        for state in ('closed', 'open', 'half_open'):
+            lines.append(f'hybrid_indigo_breaker_state{{state="{state}"}} {int(snapshot["state"] == state)}')
+        lines += [
+            "# HELP hybrid_indigo_breaker_opens_total Times the INDIGO circuit breaker opened",
+            "# TYPE hybrid_indigo_breaker_opens_total counter",
+            f"hybrid_indigo_breaker_opens_total {snapshot['opens']}",
+            "# HELP hybrid_indigo_breaker_rejected_total Samples sent straight to ICE by the open breaker",
+            "# TYPE hybrid_indigo_breaker_rejected_total counter",
+            f"hybrid_indigo_breaker_rejected_total {snapshot['rejected']}",
+        ]
+        return lines
+
+def reset_indigo_breaker():
+    """New circuit breaker from the current settings, so a run never inherits an earlier run's state"""
+    global indigo_breaker
+    # The local engine has no service to protect
+    indigo_breaker = CircuitBreaker(enabled=BREAKER_ENABLED and INDIGO_BACKEND != "local")
+    return indigo_breaker
+
+indigo_breaker = reset_indigo_breaker()
+
+# ==================================================================================
+# HEDGED EXECUTION - ICE RACES SLOW INDIGO SUBMISSIONS
+# ==================================================================================
+class LatencyTracker:
+    """Rolling window of observed latencies with percentile lookup (thread-safe)"""
+    
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+    
+    def observe(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+    
+    def percentile(self, percent):
+        """Nearest-rank percentile, or None when nothing has been observed"""
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        rank = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+    
+    def __len__(self):
+        with self.lock:
+            return len(self.samples)
+
+indigo_latency_tracker = LatencyTracker()
+
+def get_hedge_delay():
+    """Seconds to give INDIGO before ICE is started on the same sample"""
+    if len(indigo_latency_tracker) < HEDGE_MIN_OBSERVATIONS:
+        return HEDGE_DEFAULT_DELAY
+    return indigo_latency_tracker.percentile(HEDGE_PERCENTILE)
+
+def ice_outcome_ok(ice_outcome):
+    """True for a successful (ice_success, ice_results, ice_error) outcome"""
+    return ice_outcome is not None and bool(ice_outcome[0]) and bool(ice_outcome[1])
+
+def pick_hedge_winner(winner, indigo_record, ice_outcome):
+    """First engine with a good result wins; INDIGO wins ties"""
+    if winner:
+        return winner
+    if indigo_record is not None:
+        return 'Indigo'
+    if ice_outcome_ok(ice_outcome):
+        return 'ICE'
+    return ''
+
+def hedged_record(file_name, winner, indigo_record, indigo_error, ice_outcome, indigo_latency, ice_latency):
+    """
+    Combine the outcomes of a hedged sample into one report row.
+    ice_outcome is (ice_success, ice_results, ice_error) or None if ICE did not finish.
+    Returns (record, succeeded).
+    """
+    ice_ok = ice_outcome_ok(ice_outcome)
+    
+    if winner == 'Indigo':
+        record, succeeded = dict(indigo_record), True
+        if HEDGE_KEEP_BOTH and ice_ok:
+            record['ICE_Indel_%'] = f"{ice_outcome[1]['indel_percentage']:.2f}"
+            record['ICE_R²'] = f"{ice_outcome[1]['r_squared']:.4f}"
+    else:
+        if ice_outcome is None:
+            ice_outcome = (False, None, "ICE did not finish")
+        record, succeeded = ice_result_record(file_name, indigo_error, *ice_outcome)
+        if HEDGE_KEEP_BOTH and indigo_record is not None:
+            record.update({k: v for k, v in indigo_record.items() if k.startswith('Indigo_')})
+            record['Indigo_Status'] = 'Success'
+    
+    record['Hedged'] = 'Yes'
+    record['Winner'] = winner
+    record['Indigo_Latency_s'] = f"{indigo_latency:.2f}" if indigo_latency is not None else ''
+    record['ICE_Latency_s'] = f"{ice_latency:.2f}" if ice_latency is not None else ''
+    return record, succeeded
+
+def observe_abandoned_indigo(indigo_future, started):
+    """Latency of an INDIGO run that lost its hedge race, once it finished"""
+    try:
+        record = indigo_future.result()[0]
+    except Exception:
+        return
+    if record is not None:
+        indigo_latency_tracker.observe(time.time() - started)
+
+def hedged_indigo_stage(file_name, driver, worker_download_dir, executor, ice_pool=None, abandoned=None):
+    """
+    Run INDIGO, and start ICE on the same sample if INDIGO has not finished by the hedge delay.
+    Returns (record, succeeded, indigo_error, driver). record is None when INDIGO failed
+    before the hedge fired, so the caller routes the sample to the normal ICE fallback.
+    When ICE wins while INDIGO is still running and an 'abandoned' list is given, the row is
+    returned at once: the INDIGO future is appended to the list and driver is None - the
+    browser is the future's to hand back (indigo_stage returns it last) once INDIGO finishes.
+    """
+    input_file_path = os.path.join(input_folder_path, file_name)
+    delay = get_hedge_delay()
+    started = time.time()
+    indigo_future = executor.submit(indigo_stage, file_name, driver, worker_download_dir)
+    
+    try:
+        record, indigo_error, driver = indigo_future.result(timeout=delay)
+        indigo_latency = time.time() - started
+        if record is not None:
+            indigo_latency_tracker.observe(indigo_latency)
+            record.update({'Hedged': 'No', 'Winner': 'Indigo', 'Indigo_Latency_s': f"{indigo_latency:.2f}"})
+            return record, True, None, driver
+        return None, False, indigo_error, driver
+    except FuturesTimeoutError:
+        pass
+    
+    logger.info(f"INDIGO slower than p{HEDGE_PERCENTILE} ({delay:.1f}s) for {file_name} - starting ICE in parallel")
+    ice_started = time.time()
+    ice_executor = ice_pool.executor if ice_pool is not None else executor
+    ice_future = ice_executor.submit(process_with_ice, *ice_args(input_file_path))
+    
+    indigo_record = indigo_error = ice_outcome = None
+    indigo_latency = ice_latency = None
+    winner = ''
+    pending = {indigo_future, ice_future}
+    
+    while pending:
+        done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+        if indigo_future in done:
+            indigo_latency = time.time() - started
+            try:
+                indigo_record, indigo_error, driver = indigo_future.result()
+            except Exception as e:
+                indigo_error = str(e)
+            if indigo_record is not None:
+                indigo_latency_tracker.observe(indigo_latency)
+        if ice_future in done:
+            ice_latency = time.time() - ice_started
+            try:
+                ice_outcome = ice_future.result()
+            except Exception as e:
+                ice_outcome = (False, None, f"ICE worker error: {e}")
+        
+        winner = pick_hedge_winner(winner, indigo_record, ice_outcome)
+        if winner == 'Indigo' and not HEDGE_KEEP_BOTH:
+            ice_future.cancel()
+            break
+        if winner == 'ICE' and not HEDGE_KEEP_BOTH and abandoned is not None and indigo_future in pending:
+            # Let INDIGO finish in the background, still feeding the latency tracker
+            indigo_future.add_done_callback(lambda future: observe_abandoned_indigo(future, started))
+            abandoned.append(indigo_future)
+            driver = None
+            break
+    
+    record, succeeded = hedged_record(file_name, winner, indigo_record, indigo_error, ice_outcome, indigo_latency, ice_latency)
+    logger.info(f"  Hedge winner for {file_name}: {record['Winner'] or 'none'} "
+                f"(INDIGO {record['Indigo_Latency_s'] or '-'}s, ICE {record['ICE_Latency_s'] or '-'}s)")
+    return record, succeeded, indigo_error, driver
+
+# ==================================================================================
+# BROWSER SESSION POOL - HEALTH CHECKS AND PROACTIVE RECYCLING
+# ==================================================================================
+class BrowserSession:
+    """Health counters of one live browser"""
+    
+    def __init__(self, driver, slot):
+        self.driver = driver
+        self.slot = slot  # Name of the browser's cache directory; only one live browser may use it
+        self.samples = 0
+        self.outcomes = deque(maxlen=SESSION_ERROR_WINDOW)
+        self.rss = None
+
+class BrowserSessionPool:
+    """
+    Tracks sample count, INDIGO error rate and Chrome RSS of every worker's browser and replaces
+    a browser before it degrades. Replacements come from warm spare sessions started in the
+    background, so a recycle costs the worker a hand-over instead of a Chrome start.
+    Sessions are keyed by the worker's download directory.
+    """
+    
+    def __init__(self, warm_spares=SESSION_WARM_SPARES):
+        self.sessions = {}
+        self.spares = queue.Queue()
+        self.free_slots = deque(f"{node_prefix()}spare_{i}" for i in range(1, warm_spares + 1))
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, warm_spares) + 1, thread_name_prefix="browser-spare")
+        self.closed = False
+        self.recycles = {}  # reason -> count
+        self.spare_hits = 0
+        self.spare_misses = 0
+        self.swap_seconds = []
+        self.peak_rss = 0
+    
+    def track(self, download_path, driver):
+        """Start tracking a worker's browser"""
+        with self.lock:
+            self.sessions[download_path] = BrowserSession(driver, os.path.basename(browser_cache_path(download_path)))
+    
+    def start_spares(self):
+        """Start the warm spare sessions in the background"""
+        for _ in range(len(self.free_slots)):
+            self._refill()
+    
+    def _refill(self):
+        with self.lock:
+            if self.closed or not self.free_slots:
+                return
+            slot = self.free_slots.popleft()
+        self.executor.submit(self._start_spare, slot)
+    
+    def _start_spare(self, slot):
+        """Launch a browser and load INDIGO once, so its cache and renderer are warm"""
+        spare_path = os.path.join(indigo_output_dir, "spare_sessions", slot)
+        driver = None
+        try:
+            os.makedirs(spare_path, exist_ok=True)
+            driver = init_driver(spare_path)
+            driver.get(INDIGO_URL)
+        except Exception as e:
+            logger.warning(f"Could not start spare browser session: {e}")
+            self._quit(driver)
+            with self.lock:
+                self.free_slots.append(slot)
+            return
+        
+        with self.lock:
+            closed = self.closed
+            if not closed:
+                self.spares.put((driver, slot))
+        if closed:
+            self._quit(driver)
+    
+    def _quit(self, driver):
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def _retire(self, driver, slot):
+        """Quit a replaced browser, then reuse its cache directory for the next spare"""
+        self._quit(driver)
+        with self.lock:
+            self.free_slots.append(slot)
+        self._refill()
+    
+    def record(self, download_path, succeeded):
+        """Count a finished INDIGO attempt; returns why the browser should be recycled, or None"""
+        with self.lock:
+            session = self.sessions.get(download_path)
+        if session is None:
+            return None
+        
+        session.samples += 1
+        session.outcomes.append(succeeded)
+        session.rss = browser_rss(session.driver)
+        if session.rss:
+            with self.lock:
+                self.peak_rss = max(self.peak_rss, session.rss)
+        
+        if SESSION_RECYCLE_SAMPLES and session.samples >= SESSION_RECYCLE_SAMPLES:
+            return "samples"
+        if SESSION_RECYCLE_RSS_MB and session.rss and session.rss > SESSION_RECYCLE_RSS_MB * 1024 * 1024:
+            return "rss"
+        if (len(session.outcomes) == session.outcomes.maxlen and
+                session.outcomes.count(False) / len(session.outcomes) >= SESSION_RECYCLE_ERROR_RATE):
+            return "error_rate"
+        return None
+    
+    def replace(self, download_path, reason):
+        """
+        Give a worker a new browser: a warm spare if one is ready, otherwise a fresh session.
+        The old browser quits in the background (or first, when its cache directory is needed).
+        """
+        started = time.perf_counter()
+        with self.lock:
+            old = self.sessions.pop(download_path, None)
+        
+        driver = slot = None
+        try:
+            driver, slot = self.spares.get_nowait()
+            # The spare was started with its own download directory
+            driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_path})
+        except queue.Empty:
+            pass
+        except WebDriverException as e:
+            logger.warning(f"Spare browser session unusable: {e}")
+            self.executor.submit(self._retire, driver, slot)
+            driver = None
+        from_spare = driver is not None
+        
+        if not from_spare:
+            # The fresh browser takes over the old one's slot (the worker's own cache directory
+            # may belong to a spare by now), so the old browser must be gone first
+            if old is not None:
+                self._quit(old.driver)
+                slot = old.slot
+            else:
+                with self.lock:
+                    slot = self.free_slots.popleft() if self.free_slots else os.path.basename(browser_cache_path(download_path))
+            try:
+                driver = init_driver(download_path, slot=slot)
+            except Exception:
+                # Leave the slot to the next spare (or the next replace of this worker)
+                self._retire(None, slot)
+                raise
+        
+        seconds = time.perf_counter() - started
+        with self.lock:
+            self.sessions[download_path] = BrowserSession(driver, slot)
+            self.recycles[reason] = self.recycles.get(reason, 0) + 1
+            self.swap_seconds.append(seconds)
+            if from_spare:
+                self.spare_hits += 1
+            else:
+                self.spare_misses += 1
+        if from_spare and old is not None:
+            self.executor.submit(self._retire, old.driver, old.slot)
+        
+        samples = old.samples if old is not None else 0
+        source = "warm spare" if from_spare else "new session"
+        logger.info(f"Browser recycled ({reason}) after {samples} sample(s) - {source} ready in {seconds:.1f}s")
+        return driver
+    
+    def snapshot(self):
+        """Recycle counters and current session health"""
+        with self.lock:
+            sessions = {
+                session.slot: {
+                    'samples': session.samples,
+                    'rss_mb': round(session.rss / (1024 * 1024), 1) if session.rss else None,
+                    'error_rate': round(session.outcomes.count(False) / len(session.outcomes), 3) if session.outcomes else 0.0,
+                }
+                for session in self.sessions.values()
+            }
+            return {
+                'recycles': dict(self.recycles),
+                'recycles_total': sum(self.recycles.values()),
+                'spare_hits': self.spare_hits,
+                'spare_misses': self.spare_misses,
+                'swap_seconds_sum': round(sum(self.swap_seconds), 3),
+                'swap_seconds_max': round(max(self.swap_seconds), 3) if self.swap_seconds else 0.0,
+                'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1) if self.peak_rss else None,
+                'sessions': sessions,
+            }
+    
+    def prometheus_lines(self):
+        """Recycle metrics in Prometheus text format"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP hybrid_browser_recycles_total Browser sessions replaced, by reason",
+            "# TYPE hybrid_browser_recycles_total counter",
+        ]
+        for reason in ("samples", "rss", "error_rate", "crash"):
+            lines.append(f'hybrid_browser_recycles_total{{reason="{reason}"}} {snapshot["recycles"].get(reason, 0)}')
+        lines += [
+            "# HELP hybrid_browser_spare_hits_total Recycles served by a warm spare session",
+            "# TYPE hybrid_browser_spare_hits_total counter",
+            f"hybrid_browser_spare_hits_total {snapshot['spare_hits']}",
+            "# HELP hybrid_browser_spare_misses_total Recycles that had to start a new session",
+            "# TYPE hybrid_browser_spare_misses_total counter",
+            f"hybrid_browser_spare_misses_total {snapshot['spare_misses']}",
+            "# HELP hybrid_browser_swap_seconds Seconds workers waited for a replacement browser",
+            "# TYPE hybrid_browser_swap_seconds summary",
+            f"hybrid_browser_swap_seconds_sum {snapshot['swap_seconds_sum']}",
+            f"hybrid_browser_swap_seconds_count {snapshot['recycles_total']}",
+        ]
+        if snapshot['peak_rss_mb'] is not None:
+            lines += [
+                "# HELP hybrid_browser_peak_rss_bytes Largest Chrome RSS seen for one session",
+                "# TYPE hybrid_browser_peak_rss_bytes gauge",
+                f"hybrid_browser_peak_rss_bytes {int(snapshot['peak_rss_mb'] * 1024 * 1024)}",
+            ]
+        return lines
+    
+    def close(self):
+        """Stop starting spares and quit the idle ones (worker browsers are closed by their pool)"""
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=True)
+        while True:
+            try:
+                driver, _ = self.spares.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+session_pool = None  # BrowserSessionPool of the running WorkerPool (browser backend only)
+
+def restart_session(download_path, driver=None):
+    """New browser for a worker whose session crashed (the dead driver, if given, is quit)"""
+    if session_pool is not None:
+        return session_pool.replace(download_path, "crash")
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    return init_driver(download_path)
+
+# ==================================================================================
+# WORKER POOL - PARALLEL BROWSER SESSIONS
+# ==================================================================================
+def get_worker_download_dir(worker_id):
+    """Return (and create) the private download directory of a worker"""
+    if NUM_WORKERS <= 1 and not worker_node:
+        return indigo_output_dir
+    
+    worker_dir = os.path.join(indigo_output_dir, f"{node_prefix()}worker_{worker_id}")
+    os.makedirs(worker_dir, exist_ok=True)
+    return worker_dir
+
+download_lock = threading.Lock()  # Serializes picking free names in the shared INDIGO output directory
+
+def unused_path(path):
+    """The path itself, or the first free '<name>_2<ext>', '<name>_3<ext>', ... next to it"""
+    base, extension = os.path.splitext(path)
+    counter = 2
+    while os.path.exists(path):
+        path = f"{base}_{counter}{extension}"
+        counter += 1
+    return path
+
+def collect_worker_downloads(worker_dir, sample_base_name=None):
+    """
+    Move finished downloads from a worker directory into the shared INDIGO output directory.
+    Files are renamed to '<sample>_indigo<ext>' (INDIGO serves every result under the same
+    name) and never overwrite an existing file. Returns {downloaded path: collected path}.
+    """
+    collected = {}
+    if os.path.abspath(worker_dir) == os.path.abspath(indigo_output_dir):
+        return collected
+    
+    for file_name in sorted(os.listdir(worker_dir)):
+        if file_name.endswith('.crdownload'):
+            continue
+        source = os.path.join(worker_dir, file_name)
+        if sample_base_name:
+            target_name = f"{sample_base_name}_indigo{os.path.splitext(file_name)[1]}"
+        else:
+            target_name = file_name
+        try:
+            with download_lock:
+                destination = unused_path(os.path.join(indigo_output_dir, target_name))
+                shutil.move(source, destination)
+            collected[source] = destination
+        except OSError as e:
+            logger.warning(f"Could not move download {file_name}: {e}")
+    return collected
+
+def collect_indigo_result(worker_dir, file_name, indigo_stats):
+    """Collect a sample's download and point its stats at the collected result file"""
+    collected = collect_worker_downloads(worker_dir, os.path.splitext(file_name)[0])
+    result_file = indigo_stats.get('result_file')
+    for source, destination in collected.items():
+        if result_file and os.path.abspath(source) == os.path.abspath(result_file):
+            indigo_stats['result_file'] = destination
+
+def indigo_success_record(file_name, indigo_stats):
+    """Report row for a sample that INDIGO analyzed successfully"""
+    wait_saved = indigo_stats.get('wait_saved_seconds')
+    if wait_saved is not None:
+        logger.debug(f"{file_name}: waited {indigo_stats['wait_seconds']:.1f}s, saved {wait_saved:.1f}s vs fixed sleeps")
+    record = {
+        'Sample': file_name,
+        'Primary_Tool': 'Indigo',
+        'Status': 'Success',
+        'Fallback_Used': 'No',
+        'Indigo_Wait_s': f"{indigo_stats.get('wait_seconds', 0.0):.2f}",
+        'Indigo_Wait_Saved_s': f"{wait_saved:.2f}" if wait_saved is not None else '',
+        'Indigo_Result_File': os.path.basename(indigo_stats['result_file']) if indigo_stats.get('result_file') else '',
+        'Error': ''
+    }
+    record.update(stage_columns(indigo_stats.get('stage_seconds')))
+    if indigo_stats.get('result_file'):
+        record.update(parse_indigo_result_file(indigo_stats['result_file']))
+    local_result = indigo_stats.get('local_result')
+    if local_result is not None:
+        record.update({
+            'Local_Indel_Percentage': local_result['indel_percentage'],
+            'Local_R_Squared': local_result['r_squared'],
+            'Local_Breakpoint': local_result['breakpoint'] if local_result['breakpoint'] is not None else '',
+            'Local_Alleles': ';'.join(f"{a['indel']:+d}:{a['fraction']:.2f}" for a in local_result['alleles']),
+        })
+    return record
+
+def analyze_sample(file_name, driver, worker_download_dir):
+    """
+    Run one sample through INDIGO with ICE fallback.
+    Returns (record, succeeded, driver) - the driver may have been reinitialized.
+    """
+    record, indigo_error, driver = indigo_stage(file_name, driver, worker_download_dir)
+    if record is not None:
+        return record, True, driver
+    
+    # Route to ICE fallback
+    record, succeeded = ice_fallback(file_name, indigo_error)
+    return record, succeeded, driver
+
+def indigo_stage(file_name, driver, worker_download_dir):
+    """
+    Run one sample through INDIGO, retrying failures within the per-error-class budgets
+    (exponential backoff with jitter) and replacing a crashed session. A worker left without
+    a browser by a failed restart (driver None) counts as a crashed session, so the restart is
+    retried here. Skipped while the circuit breaker is open.
+    Returns (record, indigo_error, driver) - record is None when INDIGO failed.
+    """
+    input_file_path = os.path.join(input_folder_path, file_name)
+    indigo_stats = {}
+    
+    mode = indigo_breaker.allow(file_name)
+    if mode is None:
+        logger.info(f"INDIGO circuit breaker open - routing {file_name} straight to ICE")
+        return None, BREAKER_OPEN_ERROR, driver
+    
+    budget = RetryBudget()
+    started = time.time()
+    while True:
+        try:
+            if driver is None and INDIGO_BACKEND == "selenium":
+                success, indigo_error = False, NO_SESSION_ERROR
+            else:
+                success, indigo_error = run_indigo(input_file_path, driver, worker_download_dir, indigo_stats)
+        except InvalidSessionIdException:
+            success, indigo_error = False, "WebDriver session crashed"
+        except Exception as e:
+            logger.error(f"Unexpected error during INDIGO processing of {file_name}: {e}")
+            success, indigo_error = False, str(e)
+        
+        if success:
+            collect_indigo_result(worker_download_dir, file_name, indigo_stats)
+            retried = f" (after {budget.retries} retries)" if budget.retries else ""
+            logger.success(f"INDIGO analysis successful{retried}: {file_name}")
+            indigo_breaker.record(file_name, mode, None, time.time() - started)
+            return indigo_success_record(file_name, indigo_stats), None, driver
+        
+        error_class = classify_indigo_error(indigo_error)
+        if error_class == 'session' and INDIGO_BACKEND == "selenium":
+            logger.warning(f"WebDriver session died on {file_name}. Reinitializing...")
+            try:
+                driver = restart_session(worker_download_dir, driver)
+            except Exception as restart_error:
+                logger.error(f"Failed to reinitialize driver: {restart_error}")
+                driver, indigo_error = None, f"{NO_SESSION_ERROR}: {restart_error}"
+        delay = budget.next_delay(error_class)
+        if delay is None:
+            break
+        logger.warning(f"INDIGO {error_class} error for {file_name}, retrying in {delay:.1f}s: {indigo_error[:60]}")
+        time.sleep(delay)
+    
+    logger.warning(f"INDIGO analysis failed for {file_name}: {indigo_error[:60] if indigo_error else 'Unknown'}")
+    indigo_breaker.record(file_name, mode, indigo_error or "Unknown", time.time() - started)
+    stage_metrics.hold(file_name, indigo_stats)
+    return None, indigo_error, driver
+
+def ice_fallback(file_name, indigo_error):
+    """Run ICE inline for a sample INDIGO could not analyze. Returns (record, succeeded)."""
+    if ICE_AVAILABLE:
+        logger.info(f"Routing {file_name} to ICE fallback...")
+        journal_mark(file_name, 'ice', indigo_error or '')
+        
+        try:
+            ice_success, ice_results, ice_error = process_with_ice(
+                *ice_args(os.path.join(input_folder_path, file_name))
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error in ICE fallback for {file_name}: {e}")
+            return ice_result_record(file_name, indigo_error, False, None, str(e))
+        
+        return ice_result_record(file_name, indigo_error, ice_success, ice_results, ice_error)
+    
+    logger.warning(f"ICE not available, skipping fallback for {file_name}")
+    return {
+        'Sample': file_name,
+        'Primary_Tool': 'Indigo',
+        'Status': 'Failed (ICE unavailable)',
+        'Fallback_Used': 'N/A',
+        'Indigo_Error': indigo_error[:80] if indigo_error else '',
+        'Error': 'ICE module not available'
+    }, False
+
+def ice_result_record(file_name, indigo_error, ice_success, ice_results, ice_error):
+    """Report row for an ICE fallback outcome. Returns (record, succeeded)."""
+    if ice_success and ice_results:
+        logger.success(f"ICE analysis successful: {file_name}")
+        logger.info(f"  Indel: {ice_results['indel_percentage']:.2f}% | R²: {ice_results['r_squared']:.4f}")
+        record = {
+            'Sample': file_name,
+            'Primary_Tool': 'Indigo',
+            'Status': 'Success (via ICE)',
+            'Fallback_Used': 'Yes',
+            'Indigo_Error': indigo_error[:80] if indigo_error else '',
+            'ICE_Indel_%': f"{ice_results['indel_percentage']:.2f}",
+            'ICE_R²': f"{ice_results['r_squared']:.4f}",
+            'Error': ''
+        }
+        record.update(stage_columns(ice_results.get('stage_seconds')))
+        return record, True
+    
+    logger.error(f"ICE analysis failed for {file_name}: {ice_error[:60] if ice_error else 'Unknown'}")
+    return {
+        'Sample': file_name,
+        'Primary_Tool': 'Indigo',
+        'Status': 'Failed (both tools)',
+        'Fallback_Used': 'Attempted',
+        'Indigo_Error': indigo_error[:80] if indigo_error else '',
+        'ICE_Error': ice_error[:80] if ice_error else '',
+        'Error': ice_error[:80] if ice_error else ''
+    }, False
+
+# ==================================================================================
+# ICE PROCESS POOL - PARALLEL FALLBACK ANALYSIS
+# ==================================================================================
+def available_cpu_count():
+    """Number of CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def init_ice_worker(ice_path):
+    """ProcessPoolExecutor initializer - patch Biopython and import ICE once per worker process"""
+    global ice_source_path, single_sanger_analysis, ICE_AVAILABLE
+    logger.write_directly()
+    ice_source_path = ice_path
+    apply_biopython_patch()
+    if single_sanger_analysis is None:
+        single_sanger_analysis = load_ice_module()
+    ICE_AVAILABLE = single_sanger_analysis is not None
+
+class IceProcessPool:
+    """Runs ICE fallbacks in worker processes and reports each record as soon as it finishes"""
+    
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or available_cpu_count()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_ice_worker,
+            initargs=(ice_source_path,)
+        )
+        self.pending = 0
+        self.condition = threading.Condition()
+        # Start the worker processes now, before any browser/worker threads exist
+        self.executor.submit(os.getpid).result()
+    
+    def submit(self, index, file_name, indigo_error, on_record):
+        """Queue ICE for a sample; on_record(index, record, succeeded) is called when it finishes"""
+        logger.info(f"Routing {file_name} to ICE fallback (process pool)...")
+        journal_mark(file_name, 'ice', indigo_error or '')
+        with self.condition:
+            self.pending += 1
+        
+        future = self.executor.submit(
+            process_with_ice,
+            *ice_args(os.path.join(input_folder_path, file_name))
+        )
+        
+        def collect(done_future):
+            try:
+                try:
+                    ice_success, ice_results, ice_error = done_future.result()
+                except Exception as e:
+                    logger.error(f"ICE worker process failed for {file_name}: {e}")
+                    ice_success, ice_results, ice_error = False, None, f"ICE worker error: {e}"
+                record, succeeded = ice_result_record(file_name, indigo_error, ice_success, ice_results, ice_error)
+                on_record(index, record, succeeded)
+            finally:
+                with self.condition:
+                    self.pending -= 1
+                    self.condition.notify_all()
+        
+        future.add_done_callback(collect)
+        return future
+    
+    def wait(self):
+        """Block until every submitted ICE task has been collected"""
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class WorkerPool:
+    """Pool of independent WebDriver sessions pulling samples from a shared queue"""
+    
+    def __init__(self, num_workers, total_files):
+        self.num_workers = max(1, num_workers)
+        self.total_files = total_files
+        self.work_queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.report_writer = None  # ReportWriter receiving every finished row
+        self.cache_keys = {}  # index -> result cache key of samples being analyzed
+        self.sample_started = {}  # index -> perf_counter() when the sample was picked up
+        self.started = 0
+        self.successful = 0
+        self.failed = 0
+        self.drivers = {}
+        self.ice_pool = None  # Optional IceProcessPool for non-blocking ICE fallbacks
+        self.hedge_executor = None  # Runs INDIGO beside a hedged ICE when HEDGE_ENABLED
+        self.abandoned = {}  # worker_id -> INDIGO future that lost a hedge race but still holds the worker's browser
+        self.session_pool = None  # BrowserSessionPool recycling the workers' browsers (browser backend)
+        self.shared_queue = None  # DistributedQueue to claim samples from instead of a file list (--worker)
+        self.node = None  # Name this process claims samples under in the distributed queue
+        self.watcher = None  # FolderWatcher feeding new samples as they arrive instead of a file list (--watch)
+        self.idle_refresh = None  # Seconds without work after which a worker reloads its INDIGO page
+    
+    def start_sessions(self):
+        """Start one browser session per worker; returns the number of live sessions"""
+        for worker_id in range(1, self.num_workers + 1):
+            try:
+                download_path = get_worker_download_dir(worker_id)
+                if INDIGO_BACKEND in ("http", "local"):
+                    # Browserless backends - workers share the pooled HTTP client / local engine
+                    self.drivers[worker_id] = (None, download_path)
+                    continue
+                self.drivers[worker_id] = (init_driver(download_path), download_path)
+                logger.success(f"WebDriver {worker_id}/{self.num_workers} initialized successfully")
+            except (IndigoError, OSError) as e:
+                logger.error(f"Failed to initialize WebDriver {worker_id}: {e}")
+        
+        if INDIGO_BACKEND not in ("http", "local") and self.drivers:
+            global session_pool
+            session_pool = self.session_pool = BrowserSessionPool()
+            for driver, download_path in self.drivers.values():
+                self.session_pool.track(download_path, driver)
+            self.session_pool.start_spares()
+        return len(self.drivers)
+    
+    def check_session(self, worker_id, indigo_succeeded):
+        """Record a browser's INDIGO outcome and recycle it if unhealthy; returns the worker's driver"""
+        driver, download_path = self.drivers[worker_id]
+        if self.session_pool is None:
+            return driver
+        
+        reason = self.session_pool.record(download_path, indigo_succeeded)
+        if reason:
+            try:
+                driver = self.session_pool.replace(download_path, reason)
+            except IndigoError as e:
+                logger.error(f"Could not recycle WebDriver {worker_id}: {e}")
+                driver = None  # The old browser is gone - the next sample restarts it
+            self.drivers[worker_id] = (driver, download_path)
+        return driver
+    
+    def _next_position(self, index):
+        with self.lock:
+            self.started += 1
+            self.sample_started[index] = time.perf_counter()
+            return self.started
+    
+    def _cached(self, index, file_name):
+        """Record a cache hit for a sample; returns True if the sample needs no analysis"""
+        key, record, succeeded = lookup_cached_record(file_name)
+        if record is None:
+            if key is not None:
+                with self.lock:
+                    self.cache_keys[index] = key
+            return False
+        
+        self._record(index, record, succeeded)
+        return True
+    
+    def _triage(self, index, file_name):
+        """Apply the sample's pre-flight QC verdict; returns True if it is not submitted to INDIGO"""
+        action, reason = qc_verdict(file_name)
+        if action == 'skip':
+            self._record(index, *qc_skipped_record(file_name, reason))
+            return True
+        if action == 'ice':
+            logger.info(f"{file_name} failed pre-flight QC ({reason}) - skipping INDIGO")
+            indigo_error = f"{QC_SKIPPED_INDIGO_ERROR}: {reason}"
+            if self.ice_pool is not None:
+                self.ice_pool.submit(index, file_name, indigo_error, self._record)
+            else:
+                self._record(index, *ice_fallback(file_name, indigo_error))
+            return True
+        return False
+    
+    def _record(self, index, record, succeeded):
+        with self.lock:
+            key = self.cache_keys.pop(index, None)
+            started = self.sample_started.pop(index, None)
+        stage_metrics.observe(record, time.perf_counter() - started if started is not None else None)
+        settings = settings_for(record.get('Sample'))
+        record.setdefault('Wildtype', os.path.basename(settings.wildtype))
+        record.update(indigo_breaker.take(record.get('Sample')))
+        record.update(qc_columns(record.get('Sample')))
+        if record.get('ICE_Indel_%') not in (None, '') and 'ICE_Net_Indel' not in record:
+            try:
+                add_ice_indel_columns([record], guide=settings.ice_guide)
+            except Exception as e:
+                logger.warning(f"Could not summarize ICE alignment for {record.get('Sample')}: {e}")
+        if key is not None:
+            result_cache.put(key, record, succeeded)
+        if run_journal is not None:
+            try:
+                run_journal.finish(record, succeeded)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not journal result for {record.get('Sample')}: {e}")
+        if self.shared_queue is not None:
+            try:
+                if not self.shared_queue.complete(self.node, record, succeeded):
+                    logger.warning(f"{record.get('Sample')} was already completed by another worker")
+            except sqlite3.Error as e:
+                logger.error(f"Could not store result of {record.get('Sample')} in the distributed queue: {e}")
+        
+        if self.report_writer is not None:
+            try:
+                self.report_writer.write(record, succeeded)
+            except (OSError, csv.Error) as e:
+                logger.error(f"Could not write report row for {record.get('Sample')}: {e}")
+        
+        with self.lock:
+            if succeeded:
+                self.successful += 1
+            else:
+                self.failed += 1
+    
+    def _feed(self, file_names):
+        """
+        Validate samples on a thread pool and stream each one into the work queue as soon
+        as it is parsed, so analysis starts before the whole folder has been read. Samples
+        are queued in the given order, which keeps reference groups together.
+        Unreadable files are reported but still queued (INDIGO/ICE record the failure).
+        """
+        unreadable_files = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, VALIDATION_WORKERS), thread_name_prefix="validate") as executor:
+                futures = [(index, file_name, executor.submit(validate_sample, file_name))
+                           for index, file_name in enumerate(file_names)]
+                for index, file_name, future in futures:
+                    error = future.result()
+                    if error:
+                        unreadable_files.append((file_name, error))
+                    self.work_queue.put((index, file_name))
+        finally:
+            for _ in self.drivers:
+                self.work_queue.put(None)  # One stop signal per worker
+            report_unreadable_files(unreadable_files)
+    
+    def _feed_shared(self):
+        """
+        Claim samples from the distributed queue whenever the local queue runs low, until no
+        sample is queued or leased anywhere (samples re-queued from expired leases included).
+        Each claimed batch is validated on a thread pool and queued in claim order.
+        """
+        unreadable_files = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, VALIDATION_WORKERS), thread_name_prefix="validate") as executor:
+                while True:
+                    capacity = len(self.drivers) - self.work_queue.qsize()
+                    if capacity <= 0:
+                        time.sleep(WAIT_POLL_INTERVAL)
+                        continue
+                    try:
+                        claimed = self.shared_queue.claim(self.node, capacity)
+                        outstanding = self.shared_queue.outstanding() if not claimed else None
+                    except sqlite3.Error as e:
+                        logger.warning(f"Could not claim samples from the distributed queue: {e}")
+                        claimed, outstanding = [], None
+                    
+                    futures = [(index, file_name, executor.submit(validate_sample, file_name))
+                               for index, file_name in claimed]
+                    for index, file_name, future in futures:
+                        error = future.result()
+                        if error:
+                            unreadable_files.append((file_name, error))
+                        self.work_queue.put((index, file_name))
+                    if outstanding == 0:
+                        break
+                    if not claimed:
+                        time.sleep(QUEUE_POLL_INTERVAL)
+        finally:
+            for _ in self.drivers:
+                self.work_queue.put(None)  # One stop signal per worker
+            report_unreadable_files(unreadable_files)
+    
+    def _feed_watch(self):
+        """Queue every new sample as soon as the folder watcher reports it completely written"""
+        index = 0
+        try:
+            while not self.watcher.stop_event.is_set():
+                for file_name in self.watcher.poll():
+                    with self.lock:
+                        self.total_files += 1
+                    validate_sample(file_name)  # Pre-flight QC (unreadable files were reported by the watcher)
+                    self.work_queue.put((index, file_name))
+                    index += 1
+        finally:
+            for _ in self.drivers:
+                self.work_queue.put(None)  # One stop signal per worker
+    
+    def keep_warm(self, worker_id):
+        """Reload an idle worker's INDIGO page (replacing the browser if its session died or never restarted)"""
+        driver, download_path = self.drivers[worker_id]
+        if INDIGO_BACKEND != "selenium":
+            return driver
+        if driver is not None:
+            try:
+                driver.get(INDIGO_URL)
+                return driver
+            except WebDriverException as e:
+                logger.warning(f"Idle WebDriver {worker_id} is not responding ({type(e).__name__}). Reinitializing...")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        else:
+            logger.warning(f"WebDriver {worker_id} has no browser session. Reinitializing...")
+        
+        driver = None
+        try:
+            driver = restart_session(download_path)
+        except IndigoError as e:
+            logger.error(f"Could not restart WebDriver {worker_id}: {e}")
+        self.drivers[worker_id] = (driver, download_path)
+        return driver
+    
+    def _renew_leases(self, stop_event):
+        """Heartbeat - keep this node's leases alive while it is working"""
+        while not stop_event.wait(LEASE_RENEW_INTERVAL):
+            try:
+                self.shared_queue.renew(self.node)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew leases in the distributed queue: {e}")
+    
+    def _reclaim(self, worker_id, driver):
+        """Wait for a worker's abandoned INDIGO run and take its browser back; returns the worker's driver"""
+        indigo_future = self.abandoned.pop(worker_id, None)
+        if indigo_future is None:
+            return driver
+        download_path = self.drivers[worker_id][1]
+        try:
+            _, indigo_error, driver = indigo_future.result()
+        except Exception as e:
+            logger.error(f"Abandoned INDIGO run of worker {worker_id} failed: {e}")
+            indigo_error, driver = str(e), None
+        self.drivers[worker_id] = (driver, download_path)
+        return self.check_session(worker_id, indigo_error is None)
+    
+    def _worker(self, worker_id):
+        """Worker loop - owns one driver and recovers its own session crashes"""
+        driver, download_path = self.drivers[worker_id]
+        
+        while True:
+            try:
+                item = self.work_queue.get(timeout=self.idle_refresh)
+            except queue.Empty:
+                driver = self._reclaim(worker_id, driver)
+                driver = self.keep_warm(worker_id)
+                continue
+            if item is None:
+                self._reclaim(worker_id, driver)
+                self.work_queue.task_done()
+                break
+            index, file_name = item
+            
+            position = self._next_position(index)
+            worker_tag = f" (worker {worker_id})" if self.num_workers > 1 else ""
+            logger.info(f"[{position}/{self.total_files}] Processing: {file_name}{worker_tag}")
+            
+            if self._triage(index, file_name) or self._cached(index, file_name):
+                self.work_queue.task_done()
+                continue
+            journal_mark(file_name, 'indigo')
+            indigo_error = "worker error"
+            driver = self._reclaim(worker_id, driver)  # One INDIGO run per worker at a time
+            
+            try:
+                if self.hedge_executor is not None:
+                    abandoned = []
+                    record, succeeded, indigo_error, driver = hedged_indigo_stage(
+                        file_name, driver, download_path, self.hedge_executor, self.ice_pool, abandoned
+                    )
+                    if abandoned:
+                        self.abandoned[worker_id] = abandoned[0]
+                else:
+                    record, indigo_error, driver = indigo_stage(file_name, driver, download_path)
+                    succeeded = record is not None
+                
+                if record is None and self.ice_pool is not None:
+                    # Hand off to ICE and keep submitting to INDIGO
+                    self.ice_pool.submit(index, file_name, indigo_error, self._record)
+                    self.drivers[worker_id] = (driver, download_path)
+                    driver = self.check_session(worker_id, False)
+                    self.work_queue.task_done()
+                    logger.info("")
+                    continue
+                if record is None:
+                    record, succeeded = ice_fallback(file_name, indigo_error)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed on {file_name}: {e}")
+                record, succeeded = {
+                    'Sample': file_name,
+                    'Primary_Tool': 'Indigo',
+                    'Status': 'Failed (worker error)',
+                    'Fallback_Used': 'N/A',
+                    'Error': str(e)[:80]
+                }, False
+            
+            self._record(index, record, succeeded)
+            self.drivers[worker_id] = (driver, download_path)
+            if worker_id not in self.abandoned:  # Otherwise checked once the browser is back
+                driver = self.check_session(worker_id, indigo_error is None)
+            self.work_queue.task_done()
+            logger.info("")  # Blank line for readability
+    
+    def run(self, file_names=None):
+        """
+        Validate and process all files (or the samples claimed from a shared_queue / reported
+        by a watcher); rows go to the report writer as they finish
+        """
+        lease_stop = threading.Event()
+        if self.watcher is not None:
+            feeder = threading.Thread(target=self._feed_watch, name="watch-feeder", daemon=True)
+        elif self.shared_queue is not None:
+            feeder = threading.Thread(target=self._feed_shared, name="queue-feeder", daemon=True)
+            threading.Thread(target=self._renew_leases, args=(lease_stop,), name="lease-renewal", daemon=True).start()
+        else:
+            feeder = threading.Thread(target=self._feed, args=(file_names,), name="validation-feeder", daemon=True)
+        feeder.start()
+        
+        if HEDGE_ENABLED and ICE_AVAILABLE:
+            self.hedge_executor = ThreadPoolExecutor(max_workers=2 * len(self.drivers), thread_name_prefix="hedge")
+        
+        threads = []
+        for worker_id in self.drivers:
+            thread = threading.Thread(target=self._worker, args=(worker_id,), name=f"indigo-worker-{worker_id}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        
+        try:
+            for thread in threads:
+                thread.join()
+            feeder.join()
+            
+            if self.ice_pool is not None:
+                self.ice_pool.wait()
+            if self.hedge_executor is not None:
+                self.hedge_executor.shutdown(wait=True)
+        finally:
+            lease_stop.set()
+    
+    def close(self):
+        """Quit every browser session and clean up worker download directories"""
+        if self.session_pool is not None:
+            self.session_pool.close()
+        for worker_id, (driver, download_path) in self.drivers.items():
+            if driver:
+                try:
+                    driver.quit()
+                    logger.success(f"WebDriver {worker_id} closed successfully")
+                except Exception as e:
+                    logger.warning(f"Error closing WebDriver {worker_id}: {e}")
+            
+            if os.path.abspath(download_path) != os.path.abspath(indigo_output_dir):
+                collect_worker_downloads(download_path)
+                try:
+                    os.rmdir(download_path)
+                except OSError:
+                    pass
+
+# ==================================================================================
+# ASYNC PIPELINE - OVERLAPPING INDIGO WAITS AND ICE COMPUTE
+# ==================================================================================
+class AsyncPipeline:
+    """
+    asyncio orchestrator: every sample is a task moving through upload -> poll -> save -> ICE
+    stages, each bounded by its own semaphore, so waits and compute of different samples overlap.
+    Blocking work (Selenium, HTTP, ICE) runs in worker threads. Browser sessions and result
+    counters come from a WorkerPool.
+    """
+    
+    def __init__(self, pool):
+        self.pool = pool
+    
+    async def _indigo_http(self, input_file_path, stats, started_event=None):
+        """HTTP backend split into separately bounded submit/poll/save stages"""
+        input_file_base_name = os.path.splitext(os.path.basename(input_file_path))[0]
+        settings = settings_for(os.path.basename(input_file_path))
+        started = time.time()
+        budget = RetryBudget()
+        
+        while True:
+            try:
+                async with self.upload_slots:
+                    if started_event is not None:
+                        started_event.set()
+                    with timed_stage(stats, 'upload'):
+                        payload = await asyncio.to_thread(submit_indigo_http, input_file_path, settings.wildtype,
+                                                          settings.left_trim, settings.right_trim)
+                
+                data = payload.get('data')
+                if data is None:
+                    job_id = payload.get('uuid') or payload.get('id')
+                    if not job_id:
+                        raise IndigoError("INDIGO API response has neither data nor job id")
+                    async with self.poll_slots:
+                        with timed_stage(stats, 'indigo_compute'):
+                            data = await asyncio.to_thread(poll_indigo_http, job_id, INDIGO_WAIT_TIME + DRIVER_TIMEOUT)
+                
+                async with self.save_slots:
+                    with timed_stage(stats, 'save'):
+                        stats['result_file'] = await asyncio.to_thread(save_indigo_http_result, input_file_base_name, data)
+                
+                stats['wait_seconds'] = time.time() - started
+                return True, None
+                
+            except IndigoError as e:
+                message = str(e)
+                error_class = classify_indigo_error(message)
+                delay = budget.next_delay(error_class)
+                if delay is None:
+                    return False, message
+                logger.warning(f"INDIGO {error_class} error, retrying in {delay:.1f}s: {message[:60]}")
+                await asyncio.sleep(delay)
+    
+    async def _indigo_local(self, input_file_path, stats, started_event=None):
+        """Local engine - CPU-bound decomposition in a thread, bounded by the upload slots"""
+        async with self.upload_slots:
+            if started_event is not None:
+                started_event.set()
+            settings = settings_for(os.path.basename(input_file_path))
+            return await asyncio.to_thread(process_input_file_local, input_file_path, list(settings.guides), None, None,
+                                           stats, settings)
     
-    try:
-        # Create sample directory
+    async def _indigo_browser(self, input_file_path, stats, started_event=None):
+        """Browser backend - borrow a session, run the form, then collect its download"""
+        worker_id = await self.sessions.get()
+        driver, download_path = self.pool.drivers[worker_id]
+        
         try:
-            os.makedirs(sample_dir, exist_ok=True)
-        except OSError as e:
-            raise ICEError(f"Cannot create output directory: {e}")
+            budget = RetryBudget()
+            while True:
+                async with self.upload_slots:
+                    if started_event is not None:
+                        started_event.set()
+                    try:
+                        success, error = await asyncio.to_thread(run_indigo, input_file_path, driver, download_path, stats)
+                    except InvalidSessionIdException:
+                        success, error = False, "WebDriver session crashed"
+                if success:
+                    break
+                
+                error_class = classify_indigo_error(error)
+                if error_class == 'session':
+                    logger.warning(f"WebDriver session {worker_id} died. Reinitializing...")
+                    driver = await asyncio.to_thread(restart_session, download_path, driver)
+                    self.pool.drivers[worker_id] = (driver, download_path)
+                
+                # Back off without holding an upload slot
+                delay = budget.next_delay(error_class)
+                if delay is None:
+                    break
+                logger.warning(f"INDIGO {error_class} error, retrying in {delay:.1f}s: {error[:60]}")
+                await asyncio.sleep(delay)
+            
+            if success:
+                async with self.save_slots:
+                    await asyncio.to_thread(collect_indigo_result, download_path, os.path.basename(input_file_path), stats)
+            await asyncio.to_thread(self.pool.check_session, worker_id, success)
+            return success, error
+        finally:
+            self.sessions.put_nowait(worker_id)
+    
+    async def _process_sample(self, index, file_name):
+        """Validate one sample, then run it through INDIGO and, if needed, the ICE fallback stage"""
+        async with self.in_flight:
+            async with self.validation_slots:
+                error = await asyncio.to_thread(validate_sample, file_name)
+            if error:
+                self.unreadable_files.append((file_name, error))
+            await self._process_sample_stages(index, file_name)
+    
+    async def _process_sample_stages(self, index, file_name):
+        input_file_path = os.path.join(input_folder_path, file_name)
+        position = self.pool._next_position(index)
+        logger.info(f"[{position}/{self.pool.total_files}] Processing: {file_name}")
         
-        # Verify input file
-        if not os.path.exists(input_file_path):
-            raise ICEError(f"Input file not found: {input_file_path}")
+        action, reason = qc_verdict(file_name)
+        if action == 'skip':
+            self.pool._record(index, *qc_skipped_record(file_name, reason))
+            return
+        if action == 'ice':
+            logger.info(f"{file_name} failed pre-flight QC ({reason}) - skipping INDIGO")
+            async with self.ice_slots:
+                record, succeeded = await self._ice(file_name, f"{QC_SKIPPED_INDIGO_ERROR}: {reason}")
+            self.pool._record(index, record, succeeded)
+            return
         
-        if not os.path.exists(wild_type_file_path):
-            raise ICEError(f"Wildtype file not found: {wild_type_file_path}")
+        if await asyncio.to_thread(self.pool._cached, index, file_name):
+            return
+        await asyncio.to_thread(journal_mark, file_name, 'indigo')
         
-        # Verify target sequence
-        if not ice_target_sequence or not isinstance(ice_target_sequence, str):
-            raise ICEError(f"Invalid target sequence: {ice_target_sequence}")
+        if HEDGE_ENABLED and ICE_AVAILABLE:
+            record, succeeded, indigo_error = await self._hedged(file_name, input_file_path)
+            if record is not None:
+                self.pool._record(index, record, succeeded)
+                return
+            success, indigo_stats = False, {}
+        else:
+            success, indigo_error, indigo_stats = await self._indigo(file_name, input_file_path)
         
-        # Run ICE analysis
+        if success:
+            logger.success(f"INDIGO analysis successful: {file_name}")
+            record, succeeded = indigo_success_record(file_name, indigo_stats), True
+        else:
+            logger.warning(f"INDIGO analysis failed for {file_name}: {indigo_error[:60] if indigo_error else 'Unknown'}")
+            async with self.ice_slots:
+                record, succeeded = await self._ice(file_name, indigo_error)
+        
+        self.pool._record(index, record, succeeded)
+    
+    async def _indigo(self, file_name, input_file_path, started_event=None):
+        """
+        INDIGO stage for one sample with the configured backend. Returns (success, error, stats).
+        started_event is set once the sample holds an upload slot (and session).
+        """
+        indigo_stats = {}
+        mode = indigo_breaker.allow(file_name)
+        if mode is None:
+            logger.info(f"INDIGO circuit breaker open - routing {file_name} straight to ICE")
+            if started_event is not None:
+                started_event.set()
+            return False, BREAKER_OPEN_ERROR, indigo_stats
+        
+        started = time.time()
         try:
-            result_json = single_sanger_analysis(
-                control_path=wild_type_file_path,
-                sample_path=input_file_path,
-                base_outputname=os.path.join(sample_dir, "ICE"),
-                guide=ice_target_sequence,
-                verbose=False
+            if INDIGO_BACKEND == "http":
+                success, indigo_error = await self._indigo_http(input_file_path, indigo_stats, started_event)
+            elif INDIGO_BACKEND == "local":
+                success, indigo_error = await self._indigo_local(input_file_path, indigo_stats, started_event)
+            else:
+                success, indigo_error = await self._indigo_browser(input_file_path, indigo_stats, started_event)
+        except Exception as e:
+            logger.error(f"Unexpected error during INDIGO processing of {file_name}: {e}")
+            success, indigo_error = False, str(e)
+        indigo_breaker.record(file_name, mode, None if success else indigo_error or "Unknown", time.time() - started)
+        if not success:
+            stage_metrics.hold(file_name, indigo_stats)
+        return success, indigo_error, indigo_stats
+    
+    async def _ice_outcome(self, input_file_path):
+        """Raw ICE outcome (ice_success, ice_results, ice_error) in the process pool or a thread"""
+        ice_pool = self.pool.ice_pool
+        executor = ice_pool.executor if ice_pool is not None else None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, process_with_ice, *ice_args(input_file_path)
             )
         except Exception as e:
-            error_msg = str(e)
-            if "not found in control sequence" in error_msg:
-                raise ICEError(f"Target sequence not found in control sequence")
-            elif "No such file or directory" in error_msg:
-                raise ICEError(f"File not found during ICE analysis")
-            else:
-                raise ICEError(f"ICE analysis failed: {error_msg[:100]}")
+            return False, None, f"ICE worker error: {e}"
+    
+    async def _hedged(self, file_name, input_file_path):
+        """
+        Hedged INDIGO/ICE race for one sample. Returns (record, succeeded, indigo_error);
+        record is None when INDIGO failed before the hedge fired.
+        """
+        started_event = asyncio.Event()
+        indigo_task = asyncio.ensure_future(self._indigo(file_name, input_file_path, started_event))
         
-        # Parse results
-        try:
-            if isinstance(result_json, str):
-                res_data = json.loads(result_json)
-            else:
-                res_data = result_json
-            
-            indel = res_data.get('ice', 0)
-            r2 = res_data.get('rsq', 0)
-            
-            # Validate results
-            if indel is None:
-                indel = 0.0
-            if r2 is None:
-                r2 = 0.0
-            
-            indel = float(indel)
-            r2 = float(r2)
-            
-            # Check for suspicious results
-            if indel < 0 or indel > 100:
-                logger.warning(f"Unusual indel percentage for {sample_name}: {indel}%")
-            
-            if r2 < 0 or r2 > 1:
-                logger.warning(f"Unusual R² value for {sample_name}: {r2}")
-            
-            result_dict = {
-                'indel_percentage': indel,
-                'r_squared': r2
-            }
-            
-            return True, result_dict, None
+        # Queueing for a session is not INDIGO latency - start the hedge clock when INDIGO starts
+        started_wait = asyncio.ensure_future(started_event.wait())
+        await asyncio.wait({indigo_task, started_wait}, return_when=asyncio.FIRST_COMPLETED)
+        started_wait.cancel()
+        
+        delay = get_hedge_delay()
+        started = time.time()
+        done, _ = await asyncio.wait({indigo_task}, timeout=delay)
+        
+        if done:
+            success, indigo_error, indigo_stats = indigo_task.result()
+            indigo_latency = time.time() - started
+            if not success:
+                return None, False, indigo_error
+            indigo_latency_tracker.observe(indigo_latency)
+            logger.success(f"INDIGO analysis successful: {file_name}")
+            record = indigo_success_record(file_name, indigo_stats)
+            record.update({'Hedged': 'No', 'Winner': 'Indigo', 'Indigo_Latency_s': f"{indigo_latency:.2f}"})
+            return record, True, None
+        
+        logger.info(f"INDIGO slower than p{HEDGE_PERCENTILE} ({delay:.1f}s) for {file_name} - starting ICE in parallel")
+        ice_started = time.time()
+        async with self.ice_slots:
+            ice_task = asyncio.ensure_future(self._ice_outcome(input_file_path))
+            indigo_record = indigo_error = ice_outcome = None
+            indigo_latency = ice_latency = None
+            winner = ''
+            pending = {indigo_task, ice_task}
             
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
-            raise ICEError(f"Error parsing ICE results: {e}")
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if indigo_task in done:
+                    indigo_latency = time.time() - started
+                    success, indigo_error, indigo_stats = indigo_task.result()
+                    if success:
+                        indigo_latency_tracker.observe(indigo_latency)
+                        indigo_record = indigo_success_record(file_name, indigo_stats)
+                if ice_task in done:
+                    ice_latency = time.time() - ice_started
+                    ice_outcome = ice_task.result()
+                
+                winner = pick_hedge_winner(winner, indigo_record, ice_outcome)
+                if winner and not HEDGE_KEEP_BOTH:
+                    break
         
-    except ICEError as e:
-        logger.debug(f"ICE Error: {str(e)}")
-        return False, None, str(e)
-    except Exception as e:
-        logger.debug(f"Unexpected error in process_with_ice: {e}")
-        import traceback
-        logger.debug(traceback.format_exc())
-        return False, None, f"Unexpected error: {str(e)[:100]}"
+        if not indigo_task.done():
+            # ICE won - let INDIGO finish in the background so its session is returned
+            self.abandoned.append(indigo_task)
+        
+        record, succeeded = hedged_record(file_name, winner, indigo_record, indigo_error, ice_outcome, indigo_latency, ice_latency)
+        logger.info(f"  Hedge winner for {file_name}: {record['Winner'] or 'none'} "
+                    f"(INDIGO {record['Indigo_Latency_s'] or '-'}s, ICE {record['ICE_Latency_s'] or '-'}s)")
+        return record, succeeded, indigo_error
+    
+    async def _ice(self, file_name, indigo_error):
+        """ICE stage - runs in the ICE process pool when available, otherwise in a thread"""
+        if self.pool.ice_pool is None:
+            return await asyncio.to_thread(ice_fallback, file_name, indigo_error)
+        
+        logger.info(f"Routing {file_name} to ICE fallback (process pool)...")
+        await asyncio.to_thread(journal_mark, file_name, 'ice', indigo_error or '')
+        ice_success, ice_results, ice_error = await self._ice_outcome(os.path.join(input_folder_path, file_name))
+        return ice_result_record(file_name, indigo_error, ice_success, ice_results, ice_error)
+    
+    async def run(self, file_names):
+        """Process all files concurrently; rows go to the pool's report writer as they finish"""
+        ice_concurrency = ASYNC_ICE_CONCURRENCY
+        if self.pool.ice_pool is not None:
+            ice_concurrency = max(ice_concurrency, self.pool.ice_pool.max_workers)
+        
+        self.upload_slots = asyncio.Semaphore(ASYNC_UPLOAD_CONCURRENCY)
+        self.poll_slots = asyncio.Semaphore(ASYNC_POLL_CONCURRENCY)
+        self.save_slots = asyncio.Semaphore(ASYNC_SAVE_CONCURRENCY)
+        self.ice_slots = asyncio.Semaphore(ice_concurrency)
+        self.validation_slots = asyncio.Semaphore(max(1, VALIDATION_WORKERS))
+        self.unreadable_files = []
+        self.sessions = asyncio.Queue()
+        self.abandoned = []  # INDIGO tasks that lost a hedge race but still hold a session
+        for worker_id in self.pool.drivers:
+            self.sessions.put_nowait(worker_id)
+        
+        # Enough threads for every stage to be saturated at once
+        thread_count = (ASYNC_UPLOAD_CONCURRENCY + ASYNC_POLL_CONCURRENCY + ASYNC_SAVE_CONCURRENCY
+                        + ice_concurrency + max(1, VALIDATION_WORKERS))
+        self.in_flight = asyncio.Semaphore(thread_count)
+        executor = ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix="pipeline")
+        asyncio.get_running_loop().set_default_executor(executor)
+        
+        try:
+            await asyncio.gather(*(self._process_sample(index, file_name) for index, file_name in enumerate(file_names)))
+            if self.abandoned:
+                await asyncio.gather(*self.abandoned, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=False)
+            report_unreadable_files(self.unreadable_files)
+
+# ==================================================================================
+# WATCH FOLDER - CONTINUOUS INGESTION OF NEW SEQUENCER FILES
+# ==================================================================================
+class InotifyWatch:
+    """Minimal inotify binding through ctypes (Linux): names of files closed after writing or moved in"""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+    
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+    
+    def read(self, timeout):
+        """Wait up to timeout seconds for events; returns the file names they name"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        names = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+    
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """
+    Reports every new .ab1 file of a folder once, as soon as it is completely written. A file
+    is complete when it parses as ABIF and either inotify saw it closed/moved in or its size and
+    mtime did not change for WATCH_SETTLE_SECONDS. Without inotify (Windows, macOS) the folder
+    is polled; with it, the folder is still rescanned now and then for events inotify cannot
+    see (files written by other hosts on a network mount).
+    """
+    
+    def __init__(self, folder, include_existing=True):
+        self.folder = folder
+        self.stop_event = threading.Event()
+        self.seen = set()  # Files already reported
+        self.pending = {}  # file name -> [size, mtime, unchanged since, close event seen]
+        self.last_scan = 0.0
+        try:
+            self.inotify = InotifyWatch(folder)
+            logger.info(f"Watching {folder} with inotify")
+        except (OSError, AttributeError) as e:
+            self.inotify = None
+            logger.info(f"inotify unavailable ({e}) - polling {folder} every {WATCH_POLL_INTERVAL}s")
+        if not include_existing:
+            self.seen.update(self._scan())
+    
+    def _scan(self):
+        return [f for f in os.listdir(self.folder) if f.endswith('.ab1')]
+    
+    def _wait_for_names(self):
+        """File names with activity since the last call (blocks up to WATCH_POLL_INTERVAL)"""
+        names = []
+        closed = set()
+        if self.inotify is not None:
+            closed.update(self.inotify.read(WATCH_POLL_INTERVAL))
+            names.extend(closed)
+        else:
+            self.stop_event.wait(WATCH_POLL_INTERVAL)
+        
+        rescan_interval = WATCH_RESCAN_INTERVAL if self.inotify is not None else WATCH_POLL_INTERVAL
+        if time.time() - self.last_scan >= rescan_interval:
+            self.last_scan = time.time()
+            try:
+                names.extend(self._scan())
+            except OSError as e:
+                logger.warning(f"Cannot list watch folder: {e}")
+        return [name for name in names if name.endswith('.ab1') and name not in self.seen], closed
+    
+    def poll(self):
+        """Wait for folder activity and return the files that are now completely written"""
+        names, closed = self._wait_for_names()
+        now = time.time()
+        for name in names:
+            state = self.pending.setdefault(name, [None, None, now, False])
+            state[3] = state[3] or name in closed
+        
+        ready = []
+        for name, state in list(self.pending.items()):
+            try:
+                stat = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                del self.pending[name]  # Deleted or renamed before it settled
+                continue
+            if (stat.st_size, stat.st_mtime) != (state[0], state[1]):
+                state[0], state[1], state[2] = stat.st_size, stat.st_mtime, min(now, stat.st_mtime)
+            if not state[3] and now - state[2] < WATCH_SETTLE_SECONDS:
+                continue
+            
+            error = validate_sample(name)
+            if error and now - state[2] < WATCH_MAX_SETTLE_SECONDS:
+                state[3] = False  # Not a complete ABIF file yet - wait until it stops changing again
+                continue
+            if error:
+                logger.warning(f"{name} is still unreadable {WATCH_MAX_SETTLE_SECONDS}s after its last change: {error[:50]}")
+            del self.pending[name]
+            self.seen.add(name)
+            ready.append(name)
+        return sorted(ready)
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
 
 # ==================================================================================
 # MAIN ANALYSIS WORKFLOW
 # ==================================================================================
-def main():
+def open_result_cache():
+    """Open the on-disk result cache if enabled"""
+    global result_cache
+    if RESULT_CACHE_ENABLED:
+        try:
+            result_cache = ResultCache(result_cache_dir, RESULT_CACHE_MAX_MB * 1024 * 1024)
+            logger.info(f"Result cache: {len(result_cache.entries)} entries in {result_cache_dir}")
+        except OSError as e:
+            logger.warning(f"Result cache unavailable: {e}")
+            result_cache = None
+
+def start_worker_pool(total_files):
+    """Start the ICE process pool and the INDIGO sessions; exits if no session could be started"""
+    # Start ICE worker processes before any browser or worker thread exists
+    pool = WorkerPool(NUM_WORKERS, total_files)
+    if ICE_AVAILABLE and ICE_USE_PROCESS_POOL:
+        try:
+            pool.ice_pool = IceProcessPool(ICE_PROCESS_WORKERS or None)
+            logger.success(f"ICE process pool started ({pool.ice_pool.max_workers} workers)")
+        except Exception as e:
+            logger.warning(f"Could not start ICE process pool, running ICE inline: {e}")
+            pool.ice_pool = None
+    
+    # Initialize drivers
+    if pool.start_sessions() == 0:
+        logger.info("Cannot continue without WebDriver. Exiting.")
+        if pool.ice_pool is not None:
+            pool.ice_pool.shutdown()
+        sys.exit(1)
+    return pool
+
+def metrics_collectors(pool):
+    """Extra snapshots for the metrics files: browser session recycling and the INDIGO circuit breaker"""
+    collectors = {}
+    if pool.session_pool is not None:
+        collectors['browser_sessions'] = pool.session_pool
+    if indigo_breaker.enabled:
+        collectors['indigo_breaker'] = indigo_breaker
+    return collectors or None
+
+def main(resume=False):
     """Main analysis workflow with comprehensive error handling"""
+    global run_journal
     
     # Validate prerequisites
     ab1_files = validate_prerequisites()
     
     # Initialize tracking
-    file_count = 0
-    successful_files = 0
-    failed_files = 0
-    results_tracker = []
     start_time = time.time()
     start_timestamp = datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')
+    stage_metrics.run_started = start_time
+    reset_indigo_breaker()
     
-    total_files = len(ab1_files)
+    files_to_process = sorted(ab1_files)
+    if JOURNAL_ENABLED:
+        try:
+            run_journal = RunJournal(journal_path)
+            files_to_process = run_journal.start_run(sorted(ab1_files), resume=resume)
+        except sqlite3.Error as e:
+            if resume:
+                logger.error(f"Cannot resume - run journal unavailable: {e}")
+                sys.exit(1)
+            logger.warning(f"Run journal unavailable, progress will not be resumable: {e}")
+            run_journal = None
+    
+    files_to_process = group_by_reference(files_to_process)
+    total_files = len(files_to_process)
     
     logger.info("="*80)
     logger.info("SANGER SEQUENCING HYBRID ANALYSIS (IMPROVED ERROR HANDLING)")
     logger.info("="*80)
     logger.info(f"Total files to process: {total_files}")
+    if resume:
+        logger.info(f"Resuming: {len(ab1_files) - total_files} sample(s) already completed")
     logger.info(f"Start time: {start_timestamp}")
-    logger.info(f"gRNA sequences: {grna_sequences}")
+    if sample_settings:
+        references = len({settings_for(f) for f in files_to_process})
+        logger.info(f"Manifest: {MANIFEST_PATH} ({references} reference group(s))")
+    else:
+        logger.info(f"gRNA sequences: {grna_sequences}")
     logger.info(f"ICE Available: {ICE_AVAILABLE}")
+    logger.info(f"INDIGO backend: {INDIGO_BACKEND}")
+    logger.info(f"Parallel workers: {NUM_WORKERS} ({PIPELINE_MODE} mode)")
     logger.info("="*80 + "\n")
     
-    # Initialize driver
-    driver = None
+    # Open the result cache, ICE process pool and INDIGO sessions
+    open_result_cache()
+    pool = start_worker_pool(total_files)
+    
+    # Open the report - rows are appended as samples finish
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_path = os.path.join(os.path.dirname(indigo_output_dir), f"hybrid_analysis_report_{timestamp}.csv")
+    parquet_path = os.path.splitext(report_path)[0] + ".parquet" if REPORT_PARQUET else None
     try:
-        driver = init_driver()
-        logger.success("WebDriver initialized successfully")
-    except IndigoError as e:
-        logger.error(f"Failed to initialize WebDriver: {e}")
-        logger.info("Cannot continue without WebDriver. Exiting.")
-        sys.exit(1)
+        # Rows follow the processing order; samples completed by earlier runs come first
+        remaining = set(files_to_process)
+        completed = [file_name for file_name in group_by_reference(sorted(ab1_files)) if file_name not in remaining]
+        pool.report_writer = ReportWriter(report_path, completed + files_to_process, parquet_path)
+        if run_journal is not None:
+            # Samples completed by earlier runs keep their rows
+            for record, succeeded in run_journal.records():
+                if record.get('Sample') not in remaining:
+                    pool.report_writer.write(record, succeeded)
+    except OSError as e:
+        logger.error(f"Error creating report: {e}")
+        pool.report_writer = None
+        report_path = "Unable to save"
     
     # Process each file
-    for file_name in sorted(ab1_files):
-        file_count += 1
-        input_file_path = os.path.join(input_folder_path, file_name)
-        
-        logger.info(f"[{file_count}/{total_files}] Processing: {file_name}")
-        
-        try:
-            # Try INDIGO
-            success, indigo_error = process_input_file(
-                input_file_path,
-                grna_sequences=grna_sequences,
-                driver=driver
-            )
-            
-            if success:
-                logger.success(f"INDIGO analysis successful")
-                successful_files += 1
-                results_tracker.append({
-                    'Sample': file_name,
-                    'Primary_Tool': 'Indigo',
-                    'Status': 'Success',
-                    'Fallback_Used': 'No',
-                    'Error': ''
-                })
-                continue
-            else:
-                logger.warning(f"INDIGO analysis failed: {indigo_error[:60] if indigo_error else 'Unknown'}")
-            
-        except InvalidSessionIdException as e:
-            logger.warning("WebDriver session crashed. Reinitializing...")
-            try:
-                if driver:
-                    driver.quit()
-                driver = init_driver()
-                
-                # Retry INDIGO
-                success, indigo_error = process_input_file(
-                    input_file_path,
-                    grna_sequences=grna_sequences,
-                    driver=driver
-                )
-                
-                if success:
-                    logger.success(f"INDIGO analysis successful (after retry)")
-                    successful_files += 1
-                    results_tracker.append({
-                        'Sample': file_name,
-                        'Primary_Tool': 'Indigo',
-                        'Status': 'Success',
-                        'Fallback_Used': 'No',
-                        'Error': ''
-                    })
-                    continue
-                    
-            except Exception as retry_error:
-                logger.error(f"Failed to reinitialize driver: {retry_error}")
-                indigo_error = str(retry_error)
-        
-        except Exception as e:
-            logger.error(f"Unexpected error during INDIGO processing: {e}")
-            indigo_error = str(e)
-        
-        # Route to ICE fallback
-        if ICE_AVAILABLE:
-            logger.info("Routing to ICE fallback...")
-            
-            try:
-                ice_success, ice_results, ice_error = process_with_ice(
-                    input_file_path,
-                    ICE_TARGET_SEQUENCE_FALLBACK
-                )
-                
-                if ice_success and ice_results:
-                    logger.success(f"ICE analysis successful")
-                    logger.info(f"  Indel: {ice_results['indel_percentage']:.2f}% | R²: {ice_results['r_squared']:.4f}")
-                    successful_files += 1
-                    results_tracker.append({
-                        'Sample': file_name,
-                        'Primary_Tool': 'Indigo',
-                        'Status': 'Success (via ICE)',
-                        'Fallback_Used': 'Yes',
-                        'Indigo_Error': indigo_error[:80] if indigo_error else '',
-                        'ICE_Indel_%': f"{ice_results['indel_percentage']:.2f}",
-                        'ICE_R²': f"{ice_results['r_squared']:.4f}",
-                        'Error': ''
-                    })
-                else:
-                    logger.error(f"ICE analysis failed: {ice_error[:60] if ice_error else 'Unknown'}")
-                    failed_files += 1
-                    results_tracker.append({
-                        'Sample': file_name,
-                        'Primary_Tool': 'Indigo',
-                        'Status': 'Failed (both tools)',
-                        'Fallback_Used': 'Attempted',
-                        'Indigo_Error': indigo_error[:80] if indigo_error else '',
-                        'ICE_Error': ice_error[:80] if ice_error else '',
-                        'Error': ice_error[:80] if ice_error else ''
-                    })
-                
-            except Exception as e:
-                logger.error(f"Unexpected error in ICE fallback: {e}")
-                failed_files += 1
-                results_tracker.append({
-                    'Sample': file_name,
-                    'Primary_Tool': 'Indigo',
-                    'Status': 'Failed (both tools)',
-                    'Fallback_Used': 'Attempted',
-                    'Indigo_Error': indigo_error[:80] if indigo_error else '',
-                    'ICE_Error': str(e)[:80],
-                    'Error': str(e)[:80]
-                })
-        
+    try:
+        if PIPELINE_MODE == "async":
+            asyncio.run(AsyncPipeline(pool).run(files_to_process))
         else:
-            logger.warning("ICE not available, skipping fallback")
-            failed_files += 1
-            results_tracker.append({
-                'Sample': file_name,
-                'Primary_Tool': 'Indigo',
-                'Status': 'Failed (ICE unavailable)',
-                'Fallback_Used': 'N/A',
-                'Indigo_Error': indigo_error[:80] if indigo_error else '',
-                'Error': 'ICE module not available'
-            })
-        
-        logger.info("")  # Blank line for readability
-    
-    # Cleanup
-    if driver:
-        try:
-            driver.quit()
-            logger.success("WebDriver closed successfully")
-        except Exception as e:
-            logger.warning(f"Error closing WebDriver: {e}")
+            pool.run(files_to_process)
+    finally:
+        # Cleanup
+        pool.close()
+        if pool.ice_pool is not None:
+            pool.ice_pool.shutdown()
+        if pool.report_writer is not None:
+            pool.report_writer.close()
+        if run_journal is not None:
+            run_journal.close()
     
-    # Generate report
-    try:
-        end_time = time.time()
-        end_timestamp = datetime.fromtimestamp(end_time).strftime('%Y-%m-%d %H:%M:%S')
-        total_time = end_time - start_time
-        
-        # Create DataFrame
-        df = pd.DataFrame(results_tracker)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join(os.path.dirname(indigo_output_dir), f"hybrid_analysis_report_{timestamp}.csv")
-        
-        df.to_csv(report_path, index=False)
+    end_time = time.time()
+    end_timestamp = datetime.fromtimestamp(end_time).strftime('%Y-%m-%d %H:%M:%S')
+    total_time = end_time - start_time
+    
+    if pool.report_writer is not None:
+        report_stats = pool.report_writer.summary()
+        file_count = report_stats['rows']
+        successful_files = report_stats['successful']
+        failed_files = report_stats['failed']
         logger.success(f"Report saved: {report_path}")
-        
-    except Exception as e:
-        logger.error(f"Error generating report: {e}")
-        report_path = "Unable to save"
+        if pool.report_writer.parquet_path:
+            logger.success(f"Parquet report saved: {pool.report_writer.parquet_path}")
+    else:
+        report_stats = {'wait_saved_total': 0.0, 'wait_saved_count': 0}
+        file_count = pool.started
+        successful_files = pool.successful
+        failed_files = pool.failed
     
     # Print summary
     summary = (
@@ -764,13 +4972,40 @@ def main():
         f"Total files analyzed: {file_count}\n"
         f"Successfully processed: {successful_files}\n"
         f"Failed: {failed_files}\n"
-        f"Success rate: {successful_files/file_count*100:.1f}%\n"
+        f"Success rate: {successful_files/max(file_count, 1)*100:.1f}%\n"
         f"Start time: {start_timestamp}\n"
         f"End time: {end_timestamp}\n"
         f"Total time: {total_time:.2f} seconds ({total_time/60:.1f} minutes)\n"
         f"Report: {report_path}\n"
     )
     
+    if report_stats['wait_saved_count']:
+        wait_saved_total, wait_saved_count = report_stats['wait_saved_total'], report_stats['wait_saved_count']
+        summary += (
+            f"Wait time saved vs fixed sleeps: {wait_saved_total:.1f} seconds "
+            f"({wait_saved_total/wait_saved_count:.1f} s/sample over {wait_saved_count} INDIGO samples)\n"
+        )
+    
+    # Export stage latency histograms
+    metrics_dir = os.path.dirname(indigo_output_dir)
+    metrics_path = os.path.join(metrics_dir, f"run_metrics_{timestamp}.json")
+    try:
+        collectors = metrics_collectors(pool)
+        metrics = stage_metrics.write(metrics_path, os.path.join(metrics_dir, METRICS_PROMETHEUS_FILE), collectors)
+        summary += f"Stage metrics: {metrics_path}\n"
+        if 'browser_sessions' in metrics:
+            sessions = metrics['browser_sessions']
+            summary += (f"Browser recycles: {sessions['recycles_total']} {sessions['recycles']} "
+                        f"(warm spare used {sessions['spare_hits']}x)\n")
+        if metrics.get('indigo_breaker', {}).get('opens'):
+            breaker = metrics['indigo_breaker']
+            summary += (f"INDIGO circuit breaker opened {breaker['opens']}x, "
+                        f"{breaker['rejected']} samples sent straight to ICE\n")
+        for column, stats in metrics['stages'].items():
+            summary += f"  {column:<24} p50 {stats['p50']:>8.2f}s  p95 {stats['p95']:>8.2f}s  p99 {stats['p99']:>8.2f}s  (n={stats['count']})\n"
+    except OSError as e:
+        logger.warning(f"Could not write stage metrics: {e}")
+    
     # Add error summary if there were issues
     error_summary = logger.get_summary()
     if error_summary['error_count'] > 0 or error_summary['warning_count'] > 0:
@@ -784,15 +5019,317 @@ def main():
     
     logger.info(summary)
 
+def open_distributed_queue(queue_path):
+    """Open the shared work queue or exit"""
+    try:
+        return DistributedQueue(queue_path)
+    except sqlite3.Error as e:
+        logger.error(f"Cannot open distributed queue {queue_path}: {e}")
+        sys.exit(1)
+
+def run_coordinator(queue_path):
+    """
+    Coordinator of a distributed run: queue the input folder's samples, re-queue expired
+    leases while --worker processes analyze them, then merge their rows into one report.
+    Restarting the coordinator on the same queue keeps the progress made so far.
+    """
+    ab1_files = validate_prerequisites(check_browser=False)
+    sample_names = group_by_reference(sorted(ab1_files))  # Queue (and report) order
+    start_time = time.time()
+    
+    work_queue = open_distributed_queue(queue_path)
+    added = work_queue.enqueue(sample_names)
+    logger.info("="*80)
+    logger.info("SANGER SEQUENCING HYBRID ANALYSIS - COORDINATOR")
+    logger.info("="*80)
+    logger.info(f"Queue: {queue_path}")
+    logger.info(f"Samples queued: {added} new, {len(sample_names) - added} already in the queue")
+    logger.info(f"Start workers with: --worker {queue_path}")
+    logger.info("="*80 + "\n")
+    
+    try:
+        last_done = None
+        while True:
+            try:
+                expired = work_queue.requeue_expired()
+                counts = work_queue.counts()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read distributed queue: {e}")
+                time.sleep(QUEUE_POLL_INTERVAL)
+                continue
+            if expired:
+                logger.warning(f"{expired} lease(s) expired - samples re-queued")
+            if counts['done'] != last_done:
+                logger.info(f"Progress: {counts['done']}/{sum(counts.values())} done, "
+                            f"{counts['leased']} in progress, {counts['queued']} queued")
+                last_done = counts['done']
+            if counts['queued'] + counts['leased'] == 0:
+                break
+            time.sleep(QUEUE_POLL_INTERVAL)
+        
+        merge_distributed_report(work_queue, sample_names, start_time)
+    finally:
+        work_queue.close()
+
+def merge_distributed_report(work_queue, sample_names, start_time):
+    """Write the rows finished by every worker into one hybrid report"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_path = os.path.join(os.path.dirname(indigo_output_dir), f"hybrid_analysis_report_{timestamp}.csv")
+    parquet_path = os.path.splitext(report_path)[0] + ".parquet" if REPORT_PARQUET else None
+    try:
+        report_writer = ReportWriter(report_path, sample_names, parquet_path)
+        for record, succeeded in work_queue.records():
+            report_writer.write(record, succeeded)
+        report_writer.close()
+    except OSError as e:
+        logger.error(f"Error creating report: {e}")
+        return
+    
+    report_stats = report_writer.summary()
+    total_time = time.time() - start_time
+    summary = (
+        f"\n{'='*80}\n"
+        f"DISTRIBUTED ANALYSIS COMPLETE\n"
+        f"{'='*80}\n"
+        f"Total files analyzed: {report_stats['rows']}\n"
+        f"Successfully processed: {report_stats['successful']}\n"
+        f"Failed: {report_stats['failed']}\n"
+        f"Total time: {total_time:.2f} seconds ({total_time/60:.1f} minutes)\n"
+        f"Report: {report_path}\n"
+        f"Samples per worker:\n"
+    )
+    for worker, count in sorted(work_queue.workers().items()):
+        summary += f"  {worker:<32} {count}\n"
+    summary += f"{'='*80}\n"
+    logger.success(f"Report saved: {report_path}")
+    logger.info(summary)
+
+def run_worker(queue_path, name=None):
+    """
+    Worker of a distributed run: claim samples from the coordinator's queue and analyze them
+    with this machine's INDIGO sessions until the queue is drained. Rows are stored in the
+    queue; the coordinator writes the report.
+    """
+    global worker_node
+    worker_node = name or f"{socket.gethostname()}-{os.getpid()}"
+    validate_prerequisites()
+    stage_metrics.run_started = time.time()
+    reset_indigo_breaker()
+    
+    work_queue = open_distributed_queue(queue_path)
+    logger.info(f"Worker {worker_node} waiting for samples in {queue_path}")
+    while not sum(work_queue.counts().values()):
+        time.sleep(QUEUE_POLL_INTERVAL)  # Coordinator has not queued the samples yet
+    if PIPELINE_MODE != "pool":
+        logger.warning(f"PIPELINE_MODE '{PIPELINE_MODE}' is not supported by workers, using pool mode")
+    
+    open_result_cache()
+    pool = start_worker_pool(sum(work_queue.counts().values()))
+    pool.shared_queue = work_queue
+    pool.node = worker_node
+    try:
+        pool.run()
+    finally:
+        pool.close()
+        if pool.ice_pool is not None:
+            pool.ice_pool.shutdown()
+        released = work_queue.release(worker_node)
+        if released:
+            logger.warning(f"Returned {released} unfinished sample(s) to the queue")
+        work_queue.close()
+    
+    # Per-worker stage metrics (the textfile collector picks up one file per worker)
+    metrics_dir = os.path.dirname(indigo_output_dir)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    try:
+        collectors = metrics_collectors(pool)
+        stage_metrics.write(os.path.join(metrics_dir, f"run_metrics_{node_prefix()}{timestamp}.json"),
+                            os.path.join(metrics_dir, f"{node_prefix()}{METRICS_PROMETHEUS_FILE}"), collectors)
+    except OSError as e:
+        logger.warning(f"Could not write stage metrics: {e}")
+    logger.info(f"Worker {worker_node} finished: {pool.successful} successful, {pool.failed} failed")
+
+def run_watch():
+    """
+    Daemon mode: keep the INDIGO sessions open and analyze every .ab1 file dropped into the
+    input folder as soon as it is completely written. The report and stage metrics are
+    updated while watching; Ctrl-C finishes the samples in progress and exits.
+    """
+    validate_prerequisites(require_samples=False)
+    start_time = time.time()
+    stage_metrics.run_started = start_time
+    reset_indigo_breaker()
+    
+    open_result_cache()
+    pool = start_worker_pool(0)
+    pool.idle_refresh = WATCH_KEEPALIVE_SECONDS
+    
+    # Rows are appended in arrival order. CSV only - a Parquet file cannot be read before it is closed.
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    metrics_dir = os.path.dirname(indigo_output_dir)
+    report_path = os.path.join(metrics_dir, f"hybrid_analysis_report_{timestamp}.csv")
+    metrics_path = os.path.join(metrics_dir, f"run_metrics_{timestamp}.json")
+    prometheus_path = os.path.join(metrics_dir, METRICS_PROMETHEUS_FILE)
+    try:
+        pool.report_writer = ReportWriter(report_path, [])
+    except OSError as e:
+        logger.error(f"Error creating report: {e}")
+        pool.close()
+        if pool.ice_pool is not None:
+            pool.ice_pool.shutdown()
+        sys.exit(1)
+    
+    pool.watcher = FolderWatcher(input_folder_path, include_existing=WATCH_PROCESS_EXISTING)
+    logger.info("="*80)
+    logger.info("SANGER SEQUENCING HYBRID ANALYSIS - WATCHING FOR NEW SAMPLES")
+    logger.info("="*80)
+    logger.info(f"Folder: {input_folder_path}")
+    logger.info(f"Report: {report_path}")
+    logger.info(f"INDIGO backend: {INDIGO_BACKEND} ({len(pool.drivers)} session(s) kept warm)")
+    logger.info("Press Ctrl-C to stop")
+    logger.info("="*80 + "\n")
+    
+    def write_metrics():
+        collectors = metrics_collectors(pool)
+        try:
+            stage_metrics.write(metrics_path, prometheus_path, collectors)
+        except OSError as e:
+            logger.warning(f"Could not write stage metrics: {e}")
+    
+    runner = threading.Thread(target=pool.run, name="watch-pool", daemon=True)
+    runner.start()
+    last_metrics = time.time()
+    try:
+        while runner.is_alive():
+            runner.join(timeout=REPORT_FLUSH_INTERVAL)
+            pool.report_writer.flush()
+            if time.time() - last_metrics >= WATCH_METRICS_INTERVAL:
+                write_metrics()
+                last_metrics = time.time()
+    except KeyboardInterrupt:
+        logger.warning("Stopping - finishing samples in progress (press Ctrl-C again to abort)")
+        pool.watcher.stop()
+        runner.join()
+    finally:
+        pool.watcher.stop()
+        if not runner.is_alive():
+            pool.watcher.close()
+        pool.close()
+        if pool.ice_pool is not None:
+            pool.ice_pool.shutdown()
+        pool.report_writer.close()
+        write_metrics()
+    
+    report_stats = pool.report_writer.summary()
+    uptime = time.time() - start_time
+    logger.info(
+        f"\n{'='*80}\n"
+        f"WATCH STOPPED\n"
+        f"{'='*80}\n"
+        f"Samples analyzed: {report_stats['rows']}\n"
+        f"Successfully processed: {report_stats['successful']}\n"
+        f"Failed: {report_stats['failed']}\n"
+        f"Uptime: {uptime/60:.1f} minutes\n"
+        f"Report: {report_path}\n"
+        f"Stage metrics: {metrics_path}\n"
+        f"{'='*80}\n"
+    )
+
 # ==================================================================================
 # RUN SCRIPT
 # ==================================================================================
+def parse_arguments():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Hybrid INDIGO/ICE analysis of Sanger .ab1 files")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue the previous run from its journal: skip completed samples, retry pending/failed ones"
+    )
+    parser.add_argument(
+        "--manifest", metavar="CSV",
+        help="per-sample wildtype, guides and trims (overrides MANIFEST_PATH)"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running and analyze each new .ab1 file in the input folder as soon as it is completely written"
+    )
+    parser.add_argument(
+        "--coordinator", metavar="QUEUE_DB",
+        help="queue the input folder in a shared SQLite queue (e.g. on a network mount), wait for --worker processes and merge their results into one report"
+    )
+    parser.add_argument(
+        "--worker", metavar="QUEUE_DB",
+        help="claim and analyze samples from a coordinator's queue until it is drained"
+    )
+    parser.add_argument(
+        "--worker-name", metavar="NAME",
+        help="name of this worker in the queue and its directories (default: <hostname>-<pid>)"
+    )
+    parser.add_argument(
+        "--backfill", nargs="+", metavar="FOLDER",
+        help="parse saved INDIGO results in these folders into a CSV of typed columns and exit"
+    )
+    parser.add_argument(
+        "--backfill-output", metavar="CSV",
+        help="output path for --backfill (default: indigo_backfill_<timestamp>.csv in the first folder)"
+    )
+    parser.add_argument(
+        "--qc", action="store_true",
+        help="run only the pre-flight chromatogram QC on the input folder, write qc_report_<timestamp>.csv and exit"
+    )
+    parser.add_argument(
+        "--benchmark-logging", action="store_true",
+        help="measure the per-message cost of file logging and exit"
+    )
+    parser.add_argument(
+        "--benchmark-highlight", metavar="HTML_FILE",
+        help="time the gRNA highlighter on a saved INDIGO result page and exit"
+    )
+    parser.add_argument(
+        "--benchmark-browser", nargs="?", const="", metavar="SAMPLE_AB1",
+        help="compare page-load time and memory of the full and lean browser profiles (and, given a sample, result extraction) and exit"
+    )
+    parser.add_argument(
+        "--guides", nargs="+", metavar="SEQ",
+        help="gRNA sequences for --benchmark-highlight (default: grna_sequences)"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_arguments()
+    if args.manifest:
+        MANIFEST_PATH = args.manifest
+    if args.backfill:
+        backfill_indigo_results(args.backfill, args.backfill_output)
+        sys.exit(0)
+    if args.qc:
+        run_qc_report()
+        sys.exit(0)
+    if args.benchmark_logging:
+        benchmark_logging()
+        sys.exit(0)
+    if args.benchmark_highlight:
+        benchmark_highlight(args.benchmark_highlight, guides=args.guides)
+        sys.exit(0)
+    if args.benchmark_browser is not None:
+        benchmark_browser(sample_path=args.benchmark_browser or None)
+        sys.exit(0)
     try:
-        main()
+        if args.watch:
+            run_watch()
+        elif args.coordinator:
+            run_coordinator(args.coordinator)
+        elif args.worker:
+            run_worker(args.worker, args.worker_name)
+        else:
+            main(resume=args.resume)
         logger.success("PIPELINE COMPLETED SUCCESSFULLY")
     except KeyboardInterrupt:
         logger.warning("Pipeline interrupted by user")
+        if args.coordinator or args.worker:
+            logger.info("Progress is saved in the distributed queue - restart the coordinator/workers to continue")
+        elif JOURNAL_ENABLED:
+            logger.info(f"Progress is saved in {journal_path} - rerun with --resume to continue")
         sys.exit(0)
     except Exception as e:
         logger.error(f"CRITICAL PIPELINE ERROR: {e}")
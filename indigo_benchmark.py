@@ -0,0 +1,670 @@
+# Benchmark suite for the hybrid INDIGO/ICE pipeline
+# Local INDIGO stand-in server, synthetic .ab1 generator and throughput harness,
+# so execution modes can be compared without sending traffic to gear-genomics.com.
+#
+#   python indigo_benchmark.py generate OUT_DIR --count 48
+#   python indigo_benchmark.py serve --port 8765 --latency 3 --error-rate 0.05
+#   python indigo_benchmark.py run --count 24 --mode selenium:pool:1 --mode http:async:8 --mode local:pool:4
+
+import os
+import re
+import sys
+import ast
+import csv
+import json
+import glob
+import time
+import uuid
+import types
+import random
+import zipfile
+import struct
+import argparse
+import threading
+import numpy as np
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==================================================================================
+# CONFIGURATION
+# ==================================================================================
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_SCRIPT = os.path.join(SCRIPT_DIR, "Integrated_hybrid_script_final.py")
+PIPELINE_MODULE = "Integrated_hybrid_script_final"
+RECORDED_RESULT_HTML = os.path.join(SCRIPT_DIR, "FILES", "html_result_indigo.html")  # Read from example.zip if not extracted
+EXAMPLE_ARCHIVE = os.path.join(SCRIPT_DIR, "example.zip")
+
+# Mock INDIGO server
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 0  # 0 = any free port
+MOCK_LATENCY = 2.0  # Mean seconds from submission until a result is ready
+MOCK_LATENCY_JITTER = 0.25  # Latency varies uniformly by +/- this fraction
+MOCK_ERROR_RATE = 0.0  # Fraction of jobs answered with "Error in running Indigo: ..."
+MOCK_ALIGNMENT_FAILURE_RATE = 0.0  # Fraction of jobs answered with "Alignment of trace to reference failed"
+MOCK_CRASH_RATE = 0.0  # Fraction of submissions where the server drops the connection without answering
+MOCK_INDIGO_ERRORS = [
+    "Error in running Indigo: Trace too short after trimming",
+    "Error in running Indigo: package:stats non-finite value",
+]
+MOCK_ALIGNMENT_ERROR = "Alignment of trace to reference failed"
+
+# Synthetic chromatograms
+SYNTHETIC_LENGTH = 700  # Bases per read
+SYNTHETIC_CUT_SITE = 350  # Cas9 cut position (0-based, between base N-1 and N)
+SYNTHETIC_PEAK_SPACING = 12  # Trace samples between called peaks
+SYNTHETIC_PEAK_WIDTH = 2.5  # Gaussian sigma of a peak, in trace samples
+SYNTHETIC_NOISE = 0.02  # Baseline noise relative to peak height
+SYNTHETIC_EDIT_RATE = 0.75  # Fraction of samples carrying at least one indel allele
+
+# Benchmark
+BENCHMARK_MODES = ["selenium:pool:1"]  # backend:pipeline_mode:workers; the first one is the baseline
+BENCHMARK_SAMPLES = 24  # Synthetic samples per benchmark run
+BENCHMARK_INDIGO_WAIT = 15  # INDIGO_WAIT_TIME used by the benchmarked pipeline
+BENCHMARK_DRIVER_TIMEOUT = 30  # DRIVER_TIMEOUT used by the benchmarked pipeline
+
+# ==================================================================================
+# SYNTHETIC .AB1 GENERATOR
+# ==================================================================================
+ABIF_CHANNEL_ORDER = "GATC"  # FWO_1 - DATA9..DATA12 hold the G, A, T, C traces
+ABIF_HEADER_SIZE = 128
+ABIF_DIRECTORY_FORMAT = ">4sI2H4I"
+ABIF_CHAR, ABIF_SHORT, ABIF_PSTRING = 2, 4, 18
+
+def abif_entry(name, number, elem_type, elem_size, values):
+    """(name, number, elem_type, elem_size, element count, data bytes) of one ABIF directory entry"""
+    if elem_type == ABIF_SHORT:
+        values = np.asarray(values, dtype='>i2')
+        return name, number, elem_type, elem_size, len(values), values.tobytes()
+    if elem_type == ABIF_PSTRING:
+        data = bytes([len(values)]) + values
+        return name, number, elem_type, elem_size, len(data), data
+    return name, number, elem_type, elem_size, len(values), bytes(values)
+
+def write_abif(path, entries):
+    """Write an ABIF file: 128-byte header, tag data, then the tag directory"""
+    data_area = bytearray()
+    directory = bytearray()
+    for name, number, elem_type, elem_size, count, data in entries:
+        if len(data) <= 4:
+            # Small values live in the directory entry's offset field
+            offset_field = int.from_bytes(data.ljust(4, b'\0'), 'big')
+        else:
+            offset_field = ABIF_HEADER_SIZE + len(data_area)
+            data_area += data
+        directory += struct.pack(ABIF_DIRECTORY_FORMAT, name.encode('ascii'), number, elem_type, elem_size,
+                                 count, len(data), offset_field, 0)
+    
+    directory_offset = ABIF_HEADER_SIZE + len(data_area)
+    # Version, then the root directory entry (tdir) pointing at the tag directory
+    header = b"ABIF" + struct.pack(">H4sI2H4I", 101, b"tdir", 1, 1023, 28, len(entries),
+                                   len(directory), directory_offset, 0)
+    with open(path, 'wb') as f:
+        f.write(header.ljust(ABIF_HEADER_SIZE, b'\0'))
+        f.write(data_area)
+        f.write(directory)
+
+def allele_trace(sequence, length, rng):
+    """(4 x samples) G/A/T/C trace of a pure sequence on the shared peak grid"""
+    samples = (length + 1) * SYNTHETIC_PEAK_SPACING
+    trace = np.zeros((4, samples))
+    heights = rng.uniform(0.7, 1.0, size=length)
+    centers = (np.arange(length) + 1) * SYNTHETIC_PEAK_SPACING
+    window = np.arange(-4 * SYNTHETIC_PEAK_SPACING // 2, 4 * SYNTHETIC_PEAK_SPACING // 2)
+    shape = np.exp(-0.5 * (window / SYNTHETIC_PEAK_WIDTH) ** 2)
+    for i, base in enumerate(sequence[:length]):
+        channel = ABIF_CHANNEL_ORDER.find(base)
+        if channel < 0:
+            continue
+        span = centers[i] + window
+        keep = (span >= 0) & (span < samples)
+        trace[channel, span[keep]] += heights[i] * shape[keep]
+    return trace, centers
+
+def mutate(sequence, position, indel, rng):
+    """Sequence with a deletion (indel < 0) or a random insertion (indel > 0) at position"""
+    if indel < 0:
+        return sequence[:position] + sequence[position - indel:]
+    return sequence[:position] + ''.join(rng.choice(list("ACGT"), size=indel)) + sequence[position:]
+
+def write_chromatogram(path, alleles, sample_name, rng, length=SYNTHETIC_LENGTH):
+    """
+    Write a Sanger .ab1 for a mixture of alleles [(sequence, fraction), ...].
+    The traces are the fraction-weighted sum of each allele's peaks, so edited reads show
+    the double peaks that INDIGO, ICE and the local engine decompose.
+    """
+    mixture = None
+    for sequence, fraction in alleles:
+        trace, centers = allele_trace(sequence, length, rng)
+        mixture = fraction * trace if mixture is None else mixture + fraction * trace
+    mixture += np.abs(rng.normal(0, SYNTHETIC_NOISE, size=mixture.shape))
+    scaled = np.clip(mixture * 1000, 0, 32767).astype(np.int64)
+    
+    peaks = mixture[:, centers].T
+    order = np.argsort(peaks, axis=1)
+    primary = peaks[np.arange(length), order[:, -1]]
+    secondary = peaks[np.arange(length), order[:, -2]]
+    basecalls = np.frombuffer(ABIF_CHANNEL_ORDER.encode('ascii'), dtype=np.uint8)[order[:, -1]]
+    # Phred-like quality: clean peaks score high, mixed peaks low
+    ratio = secondary / np.maximum(primary, 1e-9)
+    qualities = np.clip(np.round(60 * (1 - ratio) ** 2), 2, 60).astype(np.uint8)
+    
+    entries = [abif_entry("DATA", 9 + i, ABIF_SHORT, 2, scaled[i]) for i in range(4)]
+    entries += [
+        abif_entry("FWO_", 1, ABIF_CHAR, 1, ABIF_CHANNEL_ORDER.encode('ascii')),
+        abif_entry("PBAS", 1, ABIF_CHAR, 1, basecalls.tobytes()),
+        abif_entry("PBAS", 2, ABIF_CHAR, 1, basecalls.tobytes()),
+        abif_entry("PLOC", 1, ABIF_SHORT, 2, centers),
+        abif_entry("PLOC", 2, ABIF_SHORT, 2, centers),
+        abif_entry("PCON", 1, ABIF_CHAR, 1, qualities.tobytes()),
+        abif_entry("PCON", 2, ABIF_CHAR, 1, qualities.tobytes()),
+        abif_entry("SMPL", 1, ABIF_PSTRING, 1, sample_name.encode('ascii')[:255]),
+    ]
+    write_abif(path, entries)
+
+def generate_samples(output_dir, count, seed=0, length=SYNTHETIC_LENGTH, cut_site=SYNTHETIC_CUT_SITE):
+    """
+    Write wildtype.ab1 plus 'count' edited/unedited samples to output_dir.
+    Returns (wildtype_path, sample_paths, guide). The allele truth of every sample is
+    written to synthetic_truth.csv for accuracy checks.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Random wildtype with an NGG PAM right after the cut site + 3
+    bases = list(rng.choice(list("ACGT"), size=length + 40))
+    bases[cut_site + 4:cut_site + 6] = ['G', 'G']
+    wildtype = ''.join(bases)
+    guide = wildtype[cut_site - 17:cut_site + 3]
+    
+    wildtype_path = os.path.join(output_dir, "wildtype.ab1")
+    write_chromatogram(wildtype_path, [(wildtype, 1.0)], "wildtype", rng, length)
+    
+    sample_paths = []
+    truth_path = os.path.join(output_dir, "synthetic_truth.csv")
+    with open(truth_path, 'w', newline='', encoding='utf-8') as truth_file:
+        writer = csv.writer(truth_file)
+        writer.writerow(['Sample', 'Alleles'])
+        for i in range(count):
+            sample_name = f"synthetic_{i:04d}"
+            if rng.random() >= SYNTHETIC_EDIT_RATE:
+                alleles = [(0, 1.0)]
+            elif rng.random() < 0.3:
+                alleles = [(int(rng.choice([-7, -4, -2, -1, 1, 2])), 1.0)]
+            else:
+                edited_fraction = round(float(rng.uniform(0.3, 0.7)), 2)
+                alleles = [(0, round(1 - edited_fraction, 2)), (int(rng.choice([-10, -5, -3, -1, 1, 3])), edited_fraction)]
+            
+            mixture = [(mutate(wildtype, cut_site, indel, rng) if indel else wildtype, fraction)
+                       for indel, fraction in alleles]
+            sample_path = os.path.join(output_dir, f"{sample_name}.ab1")
+            write_chromatogram(sample_path, mixture, sample_name, rng, length)
+            sample_paths.append(sample_path)
+            writer.writerow([f"{sample_name}.ab1", ';'.join(f"{indel:+d}:{fraction:.2f}" for indel, fraction in alleles)])
+    
+    return wildtype_path, sample_paths, guide
+
+# ==================================================================================
+# MOCK INDIGO SERVER
+# ==================================================================================
+MOCK_FORM_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Indigo: Rapid Indel Characterization (local stand-in)</title>
+  <style>.d-none { display: none; } .tab-pane { display: none; } .tab-pane.active { display: block; }</style>
+</head>
+<body>
+  <div id="input-tab">
+    <input type="file" id="inputFile">
+    <div id="target-tabs">
+      <a id="target-fasta-tab" href="#target-fasta">FASTA file (single sequence)</a>
+      <a id="target-chromatogram-tab" href="#target-chromatogram">Chromatogram file (wildtype)</a>
+    </div>
+    <div class="tab-pane" id="target-fasta"><input type="file" id="targetFileFasta"></div>
+    <div class="tab-pane" id="target-chromatogram"><input type="file" id="targetFileChromatogram"></div>
+    <input type="number" id="leftTrim" value="50">
+    <input type="number" id="rightTrim" value="50">
+    <input type="number" id="peakRatio" value="33">
+    <button id="btn-submit">Launch Analysis</button>
+  </div>
+  <div id="result-tab">
+    <div id="result-info" class="d-none">Analysis is running, please be patient.</div>
+    <div id="result-error" class="d-none"><span id="error-message"></span></div>
+    <div id="result-container" class="d-none"></div>
+  </div>
+  <script>
+    const API = "__API__";
+    const $ = (id) => document.getElementById(id);
+    const show = (id, on) => $(id).classList.toggle("d-none", !on);
+    $("target-chromatogram-tab").addEventListener("click", (event) => {
+      event.preventDefault();
+      $("target-fasta").classList.remove("active");
+      $("target-chromatogram").classList.add("active");
+    });
+    function fail(payload) {
+      const titles = (payload.errors || []).map((error) => error.title || error);
+      $("error-message").textContent = titles.join("; ") || "Unknown error";
+      show("result-info", false);
+      show("result-error", true);
+    }
+    $("btn-submit").addEventListener("click", async () => {
+      show("result-info", true);
+      show("result-error", false);
+      show("result-container", false);
+      const form = new FormData();
+      form.append("queryFile", $("inputFile").files[0]);
+      form.append("chromatogramFile", $("targetFileChromatogram").files[0]);
+      form.append("leftTrim", $("leftTrim").value);
+      form.append("rightTrim", $("rightTrim").value);
+      form.append("peakRatio", $("peakRatio").value);
+      try {
+        let response = await fetch(API + "/upload", {method: "POST", body: form});
+        let payload = await response.json();
+        if (!response.ok) return fail(payload);
+        const job = payload.uuid;
+        while (true) {
+          await new Promise((resolve) => setTimeout(resolve, 250));
+          response = await fetch(API + "/results/" + job);
+          payload = await response.json();
+          if (!response.ok) return fail(payload);
+          if (payload.data) break;
+        }
+        $("result-container").innerHTML =
+          '<a id="link-html" href="' + API + '/download/' + job + '/html">Download HTML</a>';
+        show("result-info", false);
+        show("result-container", true);
+      } catch (error) {
+        // Crashed backend: like the real site, the spinner keeps running
+      }
+    });
+  </script>
+</body>
+</html>
+"""
+
+MOCK_RESULT_DATA = {
+    'variants': {
+        'columns': ['chr', 'pos', 'ref', 'alt', 'type', 'genotype'],
+        'rows': [['Wildtype', 350, 'ACGTA', 'A', 'Deletion', 'het.']],
+    },
+    'decomposition': {'x': [-4, -3, -2, -1, 0, 1, 2], 'y': [0.9, 0.7, 0.8, 0.6, 0.5, 0.7, 0.9]},
+    'allele1fraction': 0.52,
+    'allele2fraction': 0.48,
+    'align1score': 1240,
+}
+
+class MockIndigoState:
+    """Job table and outcome draws shared by all request handler threads"""
+    
+    def __init__(self, latency=MOCK_LATENCY, jitter=MOCK_LATENCY_JITTER, error_rate=MOCK_ERROR_RATE,
+                 alignment_failure_rate=MOCK_ALIGNMENT_FAILURE_RATE, crash_rate=MOCK_CRASH_RATE,
+                 result_html_path=RECORDED_RESULT_HTML, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.alignment_failure_rate = alignment_failure_rate
+        self.crash_rate = crash_rate
+        self.result_html = self._load_result_html(result_html_path)
+        self.random = random.Random(seed)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.counts = {'submitted': 0, 'succeeded': 0, 'errors': 0, 'alignment_failures': 0, 'crashes': 0}
+    
+    def _load_result_html(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass
+        try:
+            with zipfile.ZipFile(EXAMPLE_ARCHIVE) as archive:
+                return archive.read("FILES/" + os.path.basename(path))
+        except (OSError, KeyError, zipfile.BadZipFile):
+            print(f"WARNING: Recorded INDIGO result not found at {path}, serving a placeholder page")
+            return b"<html><body><div id=\"result-container\">INDIGO result placeholder</div></body></html>"
+    
+    def submit(self):
+        """Draw the outcome of a new submission. Returns a job id, or None to simulate a crash."""
+        with self.lock:
+            self.counts['submitted'] += 1
+            draw = self.random.random()
+            if draw < self.crash_rate:
+                self.counts['crashes'] += 1
+                return None
+            draw -= self.crash_rate
+            if draw < self.error_rate:
+                outcome, key = self.random.choice(MOCK_INDIGO_ERRORS), 'errors'
+            elif draw < self.error_rate + self.alignment_failure_rate:
+                outcome, key = MOCK_ALIGNMENT_ERROR, 'alignment_failures'
+            else:
+                outcome, key = None, 'succeeded'
+            self.counts[key] += 1
+            latency = self.latency * (1 + self.random.uniform(-self.jitter, self.jitter))
+            job_id = str(uuid.uuid4())
+            self.jobs[job_id] = (time.time() + max(0.0, latency), outcome)
+            return job_id
+    
+    def status(self, job_id):
+        """('unknown' | 'running' | 'error' | 'done', error message)"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return 'unknown', None
+        ready_at, outcome = job
+        if time.time() < ready_at:
+            return 'running', None
+        return ('error', outcome) if outcome else ('done', None)
+
+class MockIndigoHandler(BaseHTTPRequestHandler):
+    """
+    Routes of the INDIGO web app used by the pipeline:
+    GET /indigo/ (form page), POST /indigo/api/v1/upload, GET /indigo/api/v1/results/<id>
+    and GET /indigo/api/v1/download/<id>/html (the recorded result page).
+    """
+    
+    server_version = "MockIndigo/1.0"
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode('utf-8'), "application/json")
+    
+    def do_GET(self):
+        state = self.server.state
+        path = self.path.split('?', 1)[0].rstrip('/')
+        
+        if path in ("", "/indigo"):
+            api_url = f"http://{self.headers.get('Host')}/indigo/api/v1"
+            self._send(200, MOCK_FORM_PAGE.replace("__API__", api_url).encode('utf-8'), "text/html; charset=utf-8")
+            return
+        
+        match = re.fullmatch(r"/indigo/api/v1/results/([\w-]+)", path)
+        if match:
+            status, error = state.status(match.group(1))
+            if status == 'unknown':
+                self._send_json(404, {'errors': [{'title': "Unknown job"}]})
+            elif status == 'running':
+                self._send_json(200, {'uuid': match.group(1)})
+            elif status == 'error':
+                self._send_json(400, {'errors': [{'title': error}]})
+            else:
+                self._send_json(200, {'uuid': match.group(1), 'data': MOCK_RESULT_DATA})
+            return
+        
+        match = re.fullmatch(r"/indigo/api/v1/download/([\w-]+)/html", path)
+        if match and state.status(match.group(1))[0] == 'done':
+            self._send(200, state.result_html, "text/html; charset=utf-8",
+                       {"Content-Disposition": f'attachment; filename="indigo_{match.group(1)[:8]}.html"'})
+            return
+        
+        self._send(404, b"Not found", "text/plain")
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        
+        if self.path.rstrip('/') != "/indigo/api/v1/upload":
+            self._send(404, b"Not found", "text/plain")
+            return
+        
+        job_id = self.server.state.submit()
+        if job_id is None:
+            # Simulated backend crash - drop the connection without a response
+            self.close_connection = True
+            return
+        self._send_json(200, {'uuid': job_id})
+
+class MockIndigoServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding a MockIndigoState"""
+    
+    daemon_threads = True
+    
+    def __init__(self, state, host=MOCK_HOST, port=MOCK_PORT):
+        super().__init__((host, port), MockIndigoHandler)
+        self.state = state
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """Serve on a daemon thread; returns self"""
+        threading.Thread(target=self.serve_forever, name="mock-indigo", daemon=True).start()
+        return self
+
+# ==================================================================================
+# BENCHMARK HARNESS
+# ==================================================================================
+def load_pipeline(overrides, script_path=PIPELINE_SCRIPT):
+    """
+    Import the pipeline script with its top-level configuration assignments replaced.
+    The script keeps its settings as module constants, so the values are substituted in
+    the parsed source before it runs (the output directories are created at import time).
+    """
+    with open(script_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), script_path)
+    
+    pending = dict(overrides)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in pending:
+                node.value = ast.parse(repr(pending.pop(name)), mode='eval').body
+    if pending:
+        raise ValueError(f"Unknown pipeline settings: {', '.join(sorted(pending))}")
+    
+    module = types.ModuleType(PIPELINE_MODULE)
+    module.__file__ = script_path
+    sys.modules[PIPELINE_MODULE] = module
+    exec(compile(ast.fix_missing_locations(tree), script_path, 'exec'), module.__dict__)
+    return module
+
+def parse_mode(spec):
+    """'backend:pipeline_mode:workers' -> pipeline settings"""
+    parts = spec.split(':')
+    if len(parts) != 3 or parts[0] not in ("selenium", "http", "local") or parts[1] not in ("pool", "async"):
+        raise argparse.ArgumentTypeError(f"Mode must look like selenium:pool:1 or http:async:8, got {spec!r}")
+    try:
+        workers = int(parts[2])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Worker count must be an integer, got {parts[2]!r}")
+    return {'INDIGO_BACKEND': parts[0], 'PIPELINE_MODE': parts[1], 'NUM_WORKERS': workers}
+
+def read_report(work_dir):
+    """(rows, successful) of the newest report in a benchmark work directory"""
+    reports = sorted(glob.glob(os.path.join(work_dir, "hybrid_analysis_report_*.csv")))
+    if not reports:
+        return 0, 0
+    with open(reports[-1], newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return len(rows), sum(1 for row in rows if row.get('Status', '').startswith('Success'))
+
+def read_sample_p50(work_dir):
+    """Median Sample_Total_s from the run's stage metrics, or None"""
+    metrics = sorted(glob.glob(os.path.join(work_dir, "run_metrics_*.json")))
+    if not metrics:
+        return None
+    with open(metrics[-1], encoding='utf-8') as f:
+        stages = json.load(f).get('stages', {})
+    return stages.get('Sample_Total_s', {}).get('p50')
+
+def run_benchmark(spec, samples_dir, wildtype_path, guide, server_url, work_root,
+                  chromedriver=None, ice_path=None):
+    """Run the pipeline once in the given mode against the mock server. Returns a result dict."""
+    work_dir = os.path.join(work_root, spec.replace(':', '_'))
+    overrides = dict(parse_mode(spec))
+    overrides.update({
+        'input_folder_path': samples_dir,
+        'wild_type_file_path': wildtype_path,
+        'download_dir': os.path.join(work_dir, "INDIGO_RESULTS"),
+        'grna_sequences': [guide],
+        'ICE_TARGET_SEQUENCE_FALLBACK': guide,
+        'INDIGO_URL': f"{server_url}/indigo/",
+        'INDIGO_API_URL': f"{server_url}/indigo/api/v1",
+        'INDIGO_WAIT_TIME': BENCHMARK_INDIGO_WAIT,
+        'DRIVER_TIMEOUT': BENCHMARK_DRIVER_TIMEOUT,
+        'ice_source_path': ice_path or os.path.join(work_dir, "no-ice"),
+        # Spawned ICE workers would re-import the unpatched script - keep ICE in threads
+        'ICE_USE_PROCESS_POOL': False,
+    })
+    if chromedriver:
+        overrides['chromedriver_path'] = chromedriver
+    
+    print(f"\n{'='*80}\nBENCHMARK: {spec}\n{'='*80}")
+    pipeline = load_pipeline(overrides)
+    started = time.perf_counter()
+    completed = True
+    try:
+        pipeline.main()
+    except SystemExit:
+        completed = False
+    finally:
+        seconds = time.perf_counter() - started
+        pipeline.logger.close()
+    
+    rows, successful = read_report(work_dir)
+    return {
+        'mode': spec,
+        'completed': completed,
+        'samples': rows,
+        'successful': successful,
+        'seconds': round(seconds, 2),
+        'samples_per_minute': round(rows / seconds * 60, 2) if seconds > 0 else 0.0,
+        'sample_p50_s': read_sample_p50(work_dir),
+    }
+
+def print_results(results):
+    """Throughput table; speedups are relative to the first (baseline) mode"""
+    baseline = results[0]['samples_per_minute'] if results else 0
+    print(f"\n{'='*80}\nBENCHMARK RESULTS\n{'='*80}")
+    print(f"{'Mode':<22}{'Samples':>8}{'OK':>6}{'Seconds':>10}{'Samples/min':>13}{'p50 s':>8}{'Speedup':>9}")
+    for result in results:
+        speedup = f"{result['samples_per_minute'] / baseline:.2f}x" if baseline else "-"
+        p50 = f"{result['sample_p50_s']:.2f}" if result['sample_p50_s'] is not None else "-"
+        status = "" if result['completed'] else "  (aborted)"
+        print(f"{result['mode']:<22}{result['samples']:>8}{result['successful']:>6}{result['seconds']:>10.1f}"
+              f"{result['samples_per_minute']:>13.1f}{p50:>8}{speedup:>9}{status}")
+    print("="*80)
+
+# ==================================================================================
+# RUN SCRIPT
+# ==================================================================================
+def add_server_arguments(parser):
+    parser.add_argument("--latency", type=float, default=MOCK_LATENCY, help="mean seconds until a result is ready")
+    parser.add_argument("--jitter", type=float, default=MOCK_LATENCY_JITTER, help="latency variation (fraction)")
+    parser.add_argument("--error-rate", type=float, default=MOCK_ERROR_RATE, help="fraction of 'Error in running Indigo' results")
+    parser.add_argument("--alignment-failure-rate", type=float, default=MOCK_ALIGNMENT_FAILURE_RATE,
+                        help="fraction of 'Alignment of trace to reference failed' results")
+    parser.add_argument("--crash-rate", type=float, default=MOCK_CRASH_RATE, help="fraction of dropped submissions")
+    parser.add_argument("--result-html", default=RECORDED_RESULT_HTML, help="recorded INDIGO result page to serve")
+    parser.add_argument("--seed", type=int, default=0, help="seed for outcome draws and synthetic samples")
+
+def make_state(args):
+    return MockIndigoState(args.latency, args.jitter, args.error_rate, args.alignment_failure_rate,
+                           args.crash_rate, args.result_html, args.seed)
+
+def parse_arguments():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark suite for the hybrid INDIGO/ICE pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    generate = commands.add_parser("generate", help="write synthetic .ab1 samples and a wildtype")
+    generate.add_argument("output_dir")
+    generate.add_argument("--count", type=int, default=BENCHMARK_SAMPLES)
+    generate.add_argument("--seed", type=int, default=0)
+    
+    serve = commands.add_parser("serve", help="run the mock INDIGO server until interrupted")
+    serve.add_argument("--host", default=MOCK_HOST)
+    serve.add_argument("--port", type=int, default=8765)
+    add_server_arguments(serve)
+    
+    run = commands.add_parser("run", help="benchmark pipeline modes against the mock server")
+    run.add_argument("--mode", action="append", type=str, metavar="BACKEND:MODE:WORKERS",
+                     help=f"execution mode to benchmark, repeatable; the first is the baseline (default {BENCHMARK_MODES[0]})")
+    run.add_argument("--count", type=int, default=BENCHMARK_SAMPLES, help="synthetic samples per run")
+    run.add_argument("--samples", metavar="DIR", help="use existing .ab1 files instead of synthetic ones")
+    run.add_argument("--wildtype", metavar="AB1", help="wildtype for --samples")
+    run.add_argument("--guide", help="gRNA for --samples")
+    run.add_argument("--work-dir", default=os.path.join(SCRIPT_DIR, "BENCHMARK"), help="output root for all runs")
+    run.add_argument("--server-url", help="use an already running server instead of starting one")
+    run.add_argument("--chromedriver", help="ChromeDriver for the selenium backend (default: the pipeline's setting)")
+    run.add_argument("--ice-path", help="ICE checkout, to include the ICE fallback in the measurement")
+    add_server_arguments(run)
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    
+    if args.command == "generate":
+        wildtype_path, sample_paths, guide = generate_samples(args.output_dir, args.count, args.seed)
+        print(f"Wrote {len(sample_paths)} samples and {wildtype_path} (guide {guide})")
+        return
+    
+    if args.command == "serve":
+        server = MockIndigoServer(make_state(args), args.host, args.port)
+        print(f"Mock INDIGO serving at {server.url}/indigo/ - Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"Requests: {server.state.counts}")
+        return
+    
+    modes = args.mode or BENCHMARK_MODES
+    for spec in modes:
+        parse_mode(spec)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    work_root = os.path.join(args.work_dir, timestamp)
+    if args.samples:
+        if not (args.wildtype and args.guide):
+            sys.exit("--samples needs --wildtype and --guide")
+        samples_dir, wildtype_path, guide = args.samples, args.wildtype, args.guide
+    else:
+        samples_dir = os.path.join(work_root, "SAMPLES")
+        wildtype_dir = os.path.join(work_root, "WILDTYPE")
+        generated_wildtype, _, guide = generate_samples(samples_dir, args.count, args.seed)
+        # The input folder must only hold samples
+        os.makedirs(wildtype_dir, exist_ok=True)
+        wildtype_path = os.path.join(wildtype_dir, "wildtype.ab1")
+        os.replace(generated_wildtype, wildtype_path)
+    
+    server = None
+    server_url = args.server_url
+    if not server_url:
+        server = MockIndigoServer(make_state(args)).start()
+        server_url = server.url
+        print(f"Mock INDIGO serving at {server_url}/indigo/")
+    
+    results = []
+    try:
+        for spec in modes:
+            results.append(run_benchmark(spec, samples_dir, wildtype_path, guide, server_url, work_root,
+                                         args.chromedriver, args.ice_path))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    
+    print_results(results)
+    results_path = os.path.join(work_root, "benchmark_results.json")
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': timestamp, 'server': server.state.counts if server else None, 'results': results}, f, indent=2)
+    print(f"Results saved: {results_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Shared fixtures: the pipeline script loaded with test settings (through indigo_benchmark),
+sample chromatograms taken from the bundled example.zip and a stand-in for the INDIGO API.
+"""
+import csv
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIPELINE_SCRIPT = os.path.join(REPO_DIR, "Integrated_hybrid_script_final.py")
+SAMPLE_COUNT = 6
+GUIDE = "CAGTCCTGCCATCACCATCC"  # 20-mer followed by an AGG PAM in demo.ab1
+
+sys.path.insert(0, REPO_DIR)
+
+import indigo_benchmark  # noqa: E402
+
+@pytest.fixture(scope="session")
+def example(tmp_path_factory):
+    """Directory holding the extracted example.zip (demo.ab1, INDIGO result page, ICE alignment)"""
+    folder = tmp_path_factory.mktemp("example")
+    with zipfile.ZipFile(os.path.join(REPO_DIR, "example.zip")) as archive:
+        archive.extractall(folder)
+    return str(folder / "FILES")
+
+@pytest.fixture
+def input_folder(tmp_path, example):
+    """
+    Fresh input folder holding copies of the example chromatogram. Each copy carries a
+    trailer after the ABIF data so the samples have distinct content hashes.
+    """
+    input_path = tmp_path / "input"
+    input_path.mkdir()
+    with open(os.path.join(example, "demo.ab1"), 'rb') as f:
+        chromatogram = f.read()
+    for index in range(1, SAMPLE_COUNT + 1):
+        (input_path / f"sample_{index}.ab1").write_bytes(chromatogram + f"\0sample_{index}".encode('ascii'))
+    return str(input_path)
+
+@pytest.fixture
+def load_pipeline(tmp_path, example, input_folder):
+    """
+    Factory importing the pipeline script with test settings (no ICE, no cache/journal,
+    short timeouts) plus the given overrides
+    """
+    loaded = []
+    
+    def load(**overrides):
+        settings = {
+            'input_folder_path': input_folder,
+            'wild_type_file_path': os.path.join(example, "demo.ab1"),
+            'download_dir': str(tmp_path / "output" / "INDIGO_RESULTS"),
+            'chromedriver_path': PIPELINE_SCRIPT,
+            'grna_sequences': [GUIDE],
+            'ICE_TARGET_SEQUENCE_FALLBACK': GUIDE,
+            'ice_source_path': str(tmp_path / "no-ice"),
+            'NUM_WORKERS': 1,
+            'RESULT_CACHE_ENABLED': False,
+            'JOURNAL_ENABLED': False,
+            'DRIVER_TIMEOUT': 5,
+            'INDIGO_WAIT_TIME': 0,
+        }
+        settings.update(overrides)
+        pipeline = indigo_benchmark.load_pipeline(settings)
+        loaded.append(pipeline)
+        return pipeline
+    
+    yield load
+    for pipeline in loaded:
+        pipeline.logger.close()
+
+def read_report(pipeline):
+    """Rows of the newest hybrid report of a loaded pipeline, by sample name"""
+    reports = sorted(glob.glob(os.path.join(os.path.dirname(pipeline.indigo_output_dir), "hybrid_analysis_report_*.csv")))
+    assert reports, "no report written"
+    with open(reports[-1], newline='', encoding='utf-8') as f:
+        return {row['Sample']: row for row in csv.DictReader(f)}
+
+class IndigoApiStub(ThreadingHTTPServer):
+    """
+    INDIGO API stand-in: POST /upload queues a job, GET /results/<uuid> returns its data from
+    the second poll on. 'error' makes uploads fail the way INDIGO reports analysis errors.
+    """
+    daemon_threads = True
+    
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), IndigoApiHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}/indigo/api/v1"
+        self.error = None
+        self.uploads = []
+        self.upload_times = []
+        self.polls = {}
+        self.lock = threading.Lock()
+
+class IndigoApiHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.uploads.append(body)
+            self.server.upload_times.append(time.time())
+        if self.server.error:
+            return self._reply(400, {'errors': [{'title': self.server.error}]})
+        self._reply(200, {'uuid': str(uuid.uuid4())})
+    
+    def do_GET(self):
+        job_id = self.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.polls[job_id] = self.server.polls.get(job_id, 0) + 1
+            ready = self.server.polls[job_id] > 1
+        self._reply(200, {'data': {'allele1fraction': 0.52, 'align1score': 1240}} if ready else {})
+
+@pytest.fixture
+def indigo_api():
+    """INDIGO API stand-in on a free port"""
+    server = IndigoApiStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+FAKE_ICE_ANALYSIS = """
+import json
+import os
+import shutil
+import time
+
+def single_sanger_analysis(control_path, sample_path, base_outputname, guide, verbose=False):
+    started = time.time()
+    time.sleep({delay!r})
+    if {alignment!r}:
+        shutil.copy({alignment!r}, base_outputname + ".all.txt")
+    with open({calls!r}, 'a') as f:
+        f.write(json.dumps([os.getpid(), os.path.basename(sample_path), started, time.time()]) + "\\n")
+    return {{'ice': 42.0, 'rsq': 0.95}}
+"""
+
+@pytest.fixture
+def fake_ice(tmp_path):
+    """
+    Factory writing a stand-in ICE package (42% indels) and returning its source path.
+    With 'alignment' every analysis writes a copy of that file as its ICE.all.txt.
+    Each call is logged to fake_ice.calls as [pid, sample, started, finished].
+    """
+    source = tmp_path / "fake-ice"
+    calls_path = tmp_path / "fake_ice_calls.jsonl"
+    
+    def make(delay=0.0, alignment=None):
+        (source / "ice").mkdir(parents=True, exist_ok=True)
+        (source / "ice" / "__init__.py").write_text("")
+        (source / "ice" / "analysis.py").write_text(FAKE_ICE_ANALYSIS.format(delay=delay, alignment=alignment, calls=str(calls_path)))
+        return str(source)
+    
+    def calls():
+        if not calls_path.exists():
+            return []
+        return [json.loads(line) for line in calls_path.read_text().splitlines()]
+    
+    make.calls = calls
+    yield make
+    for name in [name for name in sys.modules if name == "ice" or name.startswith("ice.")]:
+        del sys.modules[name]
+    if str(source) in sys.path:
+        sys.path.remove(str(source))
@@ -0,0 +1,84 @@
+"""indigo_benchmark: synthetic chromatograms, the mock INDIGO server and the benchmark harness"""
+import argparse
+import csv
+import json
+import os
+import urllib.request
+
+import pytest
+from Bio import SeqIO
+
+import indigo_benchmark
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory):
+    folder = str(tmp_path_factory.mktemp("synthetic"))
+    wildtype_path, sample_paths, guide = indigo_benchmark.generate_samples(folder, 4, seed=11)
+    return folder, wildtype_path, sample_paths, guide
+
+@pytest.fixture
+def mock_server():
+    server = indigo_benchmark.MockIndigoServer(indigo_benchmark.MockIndigoState(latency=0.05, seed=3), port=0).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_synthetic_samples_are_readable_ab1_files(synthetic):
+    folder, wildtype_path, sample_paths, guide = synthetic
+    wildtype = SeqIO.read(wildtype_path, "abi")
+    assert len(wildtype.seq) == indigo_benchmark.SYNTHETIC_LENGTH
+    assert guide in str(wildtype.seq)
+    
+    with open(os.path.join(folder, "synthetic_truth.csv"), newline='') as f:
+        truth = list(csv.DictReader(f))
+    assert [row['Sample'] for row in truth] == [os.path.basename(path) for path in sample_paths]
+    for path in sample_paths:
+        record = SeqIO.read(path, "abi")
+        assert len(record.annotations['abif_raw']['PLOC2']) == len(record.seq)
+
+def test_mock_server_serves_the_form_and_the_api(mock_server):
+    with urllib.request.urlopen(f"{mock_server.url}/indigo/") as response:
+        page = response.read().decode('utf-8')
+    for element_id in ("inputFile", "target-chromatogram-tab", "targetFileChromatogram", "btn-submit"):
+        assert f'id="{element_id}"' in page
+    
+    request = urllib.request.Request(f"{mock_server.url}/indigo/api/v1/upload", data=b"sample", method="POST")
+    with urllib.request.urlopen(request) as response:
+        job_id = json.load(response)['uuid']
+    assert mock_server.state.status(job_id)[0] == 'running'
+
+def test_pipeline_runs_against_the_mock_api(load_pipeline, mock_server, input_folder):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=f"{mock_server.url}/indigo/api/v1",
+                             WAIT_POLL_INTERVAL=0.01)
+    sample = os.path.join(input_folder, sorted(os.listdir(input_folder))[0])
+    success, error = pipeline.process_input_file_http(sample, pipeline.grna_sequences)
+    assert success, error
+    assert mock_server.state.counts['succeeded'] == 1
+
+def test_mock_errors_reach_the_pipeline(load_pipeline, mock_server, input_folder):
+    mock_server.state.error_rate = 1.0
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=f"{mock_server.url}/indigo/api/v1",
+                             WAIT_POLL_INTERVAL=0.01)
+    sample = os.path.join(input_folder, sorted(os.listdir(input_folder))[0])
+    success, error = pipeline.process_input_file_http(sample, pipeline.grna_sequences)
+    assert not success
+    assert error.startswith("Error in running Indigo:")
+
+def test_parse_mode_rejects_unknown_backends():
+    assert indigo_benchmark.parse_mode("http:async:8") == {'INDIGO_BACKEND': "http", 'PIPELINE_MODE': "async", 'NUM_WORKERS': 8}
+    with pytest.raises(argparse.ArgumentTypeError):
+        indigo_benchmark.parse_mode("chrome:pool:1")
+
+def test_run_benchmark_reports_throughput(synthetic, mock_server, tmp_path):
+    folder, wildtype_path, sample_paths, guide = synthetic
+    samples_dir = tmp_path / "samples"
+    samples_dir.mkdir()
+    for path in sample_paths:
+        (samples_dir / os.path.basename(path)).write_bytes(open(path, 'rb').read())
+    
+    result = indigo_benchmark.run_benchmark("http:async:2", str(samples_dir), wildtype_path, guide,
+                                            mock_server.url, str(tmp_path / "work"))
+    assert result['completed']
+    assert (result['samples'], result['successful']) == (len(sample_paths), len(sample_paths))
+    assert result['samples_per_minute'] > 0
+    assert result['sample_p50_s'] is not None
@@ -0,0 +1,53 @@
+"""Browser backend with several workers: downloads are collected per sample and parsed into typed columns"""
+import os
+import shutil
+
+import pytest
+
+from conftest import read_report
+
+class FakeDriver:
+    """Stands in for a Chrome session; the fake backend below does the page work"""
+    
+    def get(self, url):
+        pass
+    
+    def execute_cdp_cmd(self, command, params):
+        pass
+    
+    def quit(self):
+        pass
+
+def use_fake_browser(pipeline, result_page):
+    """
+    Replace Chrome with a backend that saves the recorded INDIGO result page into the worker's
+    download directory under INDIGO's fixed name, as Chrome does
+    """
+    def process_input_file(input_file_path, grna_sequences, driver, retry_count=0, download_path=None, stats=None,
+                           settings=None):
+        result_path = os.path.join(download_path, "indigo_result.html")
+        shutil.copy(result_page, result_path)
+        stats['result_file'] = result_path
+        return True, None
+    
+    pipeline.init_driver = lambda download_path=None, profile=None, slot=None: FakeDriver()
+    pipeline.process_input_file = process_input_file
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_typed_columns_filled_with_two_workers(load_pipeline, example, mode):
+    pipeline = load_pipeline(PIPELINE_MODE=mode, NUM_WORKERS=2, SESSION_WARM_SPARES=0)
+    use_fake_browser(pipeline, os.path.join(example, "html_result_indigo.html"))
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == 6
+    result_files = set()
+    for sample, row in rows.items():
+        assert row['Status'] == 'Success', sample
+        assert row['Indigo_Result_File'] == f"{os.path.splitext(sample)[0]}_indigo.html"
+        assert os.path.exists(os.path.join(pipeline.indigo_output_dir, row['Indigo_Result_File']))
+        assert row['Indigo_Variant_Count'] == '1'
+        for column in ('Indigo_Genotype', 'Indigo_Allele1_Fraction', 'Indigo_Alignment_Score'):
+            assert row[column] != '', (sample, column)
+        result_files.add(row['Indigo_Result_File'])
+    assert len(result_files) == 6
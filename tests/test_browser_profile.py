@@ -0,0 +1,51 @@
+"""Browser profiles: options and CDP calls init_driver hands to Chrome (no Chrome needed)"""
+import os
+
+import pytest
+
+class RecordingChrome:
+    """Stands in for webdriver.Chrome and keeps what init_driver configured"""
+    
+    def __init__(self, service=None, options=None):
+        self.options = options
+        self.cdp_commands = []
+    
+    def set_page_load_timeout(self, seconds):
+        pass
+    
+    def set_script_timeout(self, seconds):
+        pass
+    
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+
+@pytest.fixture
+def pipeline(load_pipeline, monkeypatch):
+    pipeline = load_pipeline(NUM_WORKERS=2)
+    monkeypatch.setattr(pipeline.webdriver, "Chrome", RecordingChrome)
+    return pipeline
+
+def test_lean_profile_runs_headless_with_blocked_assets(pipeline):
+    download_path = pipeline.get_worker_download_dir(2)
+    driver = pipeline.init_driver(download_path, "lean")
+    
+    arguments = driver.options.arguments
+    assert "--headless=new" in arguments
+    cache_path = os.path.join(pipeline.browser_cache_dir, "worker_2")
+    assert f"--disk-cache-dir={cache_path}" in arguments
+    assert os.path.isdir(cache_path)
+    
+    prefs = driver.options.experimental_options["prefs"]
+    assert prefs["download.default_directory"] == download_path
+    assert prefs["profile.managed_default_content_settings.images"] == 2
+    assert ("Network.setBlockedURLs", {"urls": pipeline.BROWSER_BLOCKED_URLS}) in driver.cdp_commands
+
+def test_full_profile_keeps_the_visible_browser(pipeline):
+    driver = pipeline.init_driver(None)  # The default profile
+    assert not any(argument.startswith("--headless") for argument in driver.options.arguments)
+    assert "profile.managed_default_content_settings.images" not in driver.options.experimental_options["prefs"]
+    assert driver.cdp_commands == []
+
+def test_sessions_of_a_slot_share_one_cache(pipeline):
+    assert pipeline.browser_cache_path(None) == pipeline.browser_cache_path(pipeline.indigo_output_dir)
+    assert pipeline.browser_cache_path(pipeline.get_worker_download_dir(1)) != pipeline.browser_cache_path(pipeline.get_worker_download_dir(2))
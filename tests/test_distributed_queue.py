@@ -0,0 +1,112 @@
+"""DistributedQueue leases: claims, renewals, expiry and the first completion winning"""
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(QUEUE_POLL_INTERVAL=0.05, WAIT_POLL_INTERVAL=0.01)
+
+@pytest.fixture
+def shared_queue(pipeline, tmp_path):
+    work_queue = pipeline.DistributedQueue(str(tmp_path / "queue.db"))
+    yield work_queue
+    work_queue.close()
+
+def expire_leases(shared_queue):
+    with shared_queue.lock:
+        shared_queue.conn.execute("UPDATE queue SET lease_expires = 0 WHERE state = 'leased'")
+
+def test_expired_lease_is_queued_again(shared_queue):
+    shared_queue.enqueue(["a.ab1", "b.ab1"])
+    assert shared_queue.claim("node-a", 1) == [(0, "a.ab1")]
+    expire_leases(shared_queue)
+    
+    assert shared_queue.requeue_expired() == 1
+    assert shared_queue.counts()['leased'] == 0
+    assert shared_queue.claim("node-b", 2) == [(0, "a.ab1"), (1, "b.ab1")]
+
+def test_renewed_lease_does_not_expire(pipeline, shared_queue):
+    shared_queue.enqueue(["a.ab1"])
+    shared_queue.claim("node-a")
+    expire_leases(shared_queue)
+    assert shared_queue.renew("node-a") == 1
+    assert shared_queue.requeue_expired() == 0
+    assert shared_queue.claim("node-b") == []
+
+def test_sample_is_failed_after_max_attempts(pipeline, shared_queue):
+    shared_queue.enqueue(["crashes.ab1"])
+    for attempt in range(pipeline.QUEUE_MAX_ATTEMPTS):
+        assert shared_queue.claim(f"node-{attempt}") == [(0, "crashes.ab1")]
+        expire_leases(shared_queue)
+    shared_queue.requeue_expired()
+    
+    assert shared_queue.outstanding() == 0
+    [(record, succeeded)] = shared_queue.records()
+    assert not succeeded
+    assert record['Status'] == 'Failed (lease expired)'
+
+def test_first_completion_wins(shared_queue):
+    shared_queue.enqueue(["a.ab1"])
+    shared_queue.claim("node-a")
+    expire_leases(shared_queue)
+    shared_queue.claim("node-b")  # Re-leased while node-a is still finishing
+    assert shared_queue.complete("node-b", {'Sample': "a.ab1", 'Status': 'Success'}, True) == 1
+    assert shared_queue.complete("node-a", {'Sample': "a.ab1", 'Status': 'Failed (both tools)'}, False) == 0
+    assert shared_queue.workers() == {"node-b": 1}
+
+def test_claimed_samples_are_validated_in_parallel(pipeline, shared_queue):
+    samples = sorted(os.listdir(pipeline.input_folder_path))[:4]
+    shared_queue.enqueue(samples)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    
+    def slow_validate(file_name):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+        return None
+    
+    pipeline.validate_sample = slow_validate
+    pool = pipeline.WorkerPool(4, len(samples))
+    pool.drivers = {worker_id: (None, pipeline.indigo_output_dir) for worker_id in range(1, 5)}
+    pool.shared_queue, pool.node = shared_queue, "node-a"
+    
+    def consume():
+        stops = 0
+        while stops < len(pool.drivers):
+            item = pool.work_queue.get()
+            if item is None:
+                stops += 1
+                continue
+            shared_queue.complete("node-a", {'Sample': item[1]}, True)
+    
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    pool._feed_shared()
+    consumer.join(timeout=5)
+    assert peak[0] == 4
+    assert shared_queue.counts()['done'] == 4
+
+def test_worker_rows_are_merged_by_the_coordinator(load_pipeline, indigo_api, input_folder, tmp_path):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, NUM_WORKERS=2,
+                             QUEUE_POLL_INTERVAL=0.05, WAIT_POLL_INTERVAL=0.01)
+    queue_path = str(tmp_path / "queue.db")
+    samples = sorted(os.listdir(input_folder))
+    work_queue = pipeline.DistributedQueue(queue_path)
+    work_queue.enqueue(samples)
+    work_queue.close()
+    
+    pipeline.run_worker(queue_path, "node-a")
+    pipeline.run_coordinator(queue_path)
+    
+    rows = read_report(pipeline)
+    assert list(rows) == samples
+    assert {row['Status'] for row in rows.values()} == {'Success'}
@@ -0,0 +1,90 @@
+"""Hedged execution: ICE races INDIGO runs slower than the hedge delay"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import read_report
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+@pytest.fixture
+def hedged_pipeline(load_pipeline, fake_ice):
+    """Loader for a hedging pipeline whose browser INDIGO run takes indigo_seconds"""
+    def load(indigo_seconds, **overrides):
+        pipeline = load_pipeline(HEDGE_ENABLED=True, HEDGE_DEFAULT_DELAY=0.1, HEDGE_MIN_OBSERVATIONS=1000,
+                                 ICE_USE_PROCESS_POOL=False, ice_source_path=fake_ice(), **overrides)
+        
+        def process_input_file(input_file_path, grna_sequences, driver, retry_count=0, download_path=None, stats=None, settings=None):
+            time.sleep(indigo_seconds)
+            return True, None
+        
+        pipeline.init_driver = lambda download_path=None, profile=None, slot=None: FakeDriver()
+        pipeline.process_input_file = process_input_file
+        return pipeline
+    
+    return load
+
+def test_latency_percentile(load_pipeline):
+    pipeline = load_pipeline()
+    tracker = pipeline.LatencyTracker()
+    assert tracker.percentile(90) is None
+    for seconds in range(1, 11):
+        tracker.observe(seconds)
+    assert tracker.percentile(90) == 9
+    assert tracker.percentile(100) == 10
+
+def test_hedge_delay_waits_for_enough_observations(load_pipeline):
+    pipeline = load_pipeline(HEDGE_DEFAULT_DELAY=7, HEDGE_MIN_OBSERVATIONS=3, HEDGE_PERCENTILE=50)
+    assert pipeline.get_hedge_delay() == 7
+    for seconds in (1, 2, 3):
+        pipeline.indigo_latency_tracker.observe(seconds)
+    assert pipeline.get_hedge_delay() == 2
+
+def test_pool_hedge_returns_when_ice_wins(hedged_pipeline):
+    pipeline = hedged_pipeline(1.0)
+    sample = sorted(os.listdir(pipeline.input_folder_path))[0]
+    abandoned = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        started = time.time()
+        record, succeeded, _, driver = pipeline.hedged_indigo_stage(
+            sample, "browser", pipeline.indigo_output_dir, executor, abandoned=abandoned
+        )
+        assert time.time() - started < 0.8  # Did not wait for INDIGO
+        assert succeeded and record['Winner'] == 'ICE'
+        assert driver is None
+        assert len(abandoned) == 1
+        assert abandoned[0].result()[2] == "browser"  # The browser comes back with the INDIGO run
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_slow_indigo_samples_are_won_by_ice(hedged_pipeline, mode):
+    pipeline = hedged_pipeline(0.5, PIPELINE_MODE=mode)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == 6
+    for row in rows.values():
+        assert row['Hedged'] == 'Yes'
+        assert row['Winner'] == 'ICE'
+        assert row['Status'] == 'Success (via ICE)'
+        assert row['ICE_Indel_%'] == '42.00'
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_fast_indigo_samples_are_not_hedged(hedged_pipeline, fake_ice, mode):
+    pipeline = hedged_pipeline(0.0, PIPELINE_MODE=mode)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert {(row['Hedged'], row['Winner'], row['Status']) for row in rows.values()} == {('No', 'Indigo', 'Success')}
+    assert fake_ice.calls() == []
+
+def test_async_hedge_returns_indigo_error_of_early_failure(hedged_pipeline):
+    pipeline = hedged_pipeline(0.0, PIPELINE_MODE="async")
+    pipeline.process_input_file = lambda *args, **kwargs: (False, "Trace too short")
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert {row['Indigo_Error'] for row in rows.values()} == {"Trace too short"}
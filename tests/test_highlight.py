@@ -0,0 +1,55 @@
+"""Single-pass gRNA highlighting of INDIGO result pages"""
+import os
+import re
+
+import pytest
+
+GUIDE = "CAGTCCTGCCATCACCATCC"
+SPAN = '<span style="background-color: cyan; font-weight: bold;">{}</span>'
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(grna_sequences=[GUIDE])
+
+def reverse_complement(sequence):
+    return sequence.translate(str.maketrans("ACGTacgt", "TGCAtgca"))[::-1]
+
+def test_guide_and_reverse_complement_are_highlighted(pipeline):
+    html = f"<p>aa{GUIDE.lower()}tt</p><p>{reverse_complement(GUIDE)}</p>"
+    assert pipeline.highlight_pam_sequence(html, [GUIDE]) == (
+        f"<p>aa{SPAN.format(GUIDE.lower())}tt</p><p>{SPAN.format(reverse_complement(GUIDE))}</p>"
+    )
+
+def test_markup_and_scripts_are_left_alone(pipeline):
+    html = (f'<div title="{GUIDE}"><script>var s = "{GUIDE}";</script>'
+            f'<style>/* {GUIDE} */</style><!-- {GUIDE} --></div>')
+    assert pipeline.highlight_pam_sequence(html, [GUIDE]) == html
+
+def test_matches_do_not_overlap(pipeline):
+    guides = ["ACGTAC", "GTACGG"]
+    highlighter = pipeline.GuideHighlighter(guides, ["cyan", "yellow"])
+    assert highlighter.find("xxACGTACGGxx") == [(2, 8, "cyan")]
+    assert highlighter.find("GTACGGACGTAC") == [(0, 6, "yellow"), (6, 12, "cyan")]
+
+def test_every_guide_gets_its_color(pipeline):
+    highlighter = pipeline.GuideHighlighter(["AAAACCCC", "GGGGTTTA"], ["cyan", "yellow"])
+    assert [color for _, _, color in highlighter.find("AAAACCCC-GGGGTTTA")] == ["cyan", "yellow"]
+
+def test_example_result_page_highlights_every_text_match(pipeline, example):
+    with open(os.path.join(example, "html_result_indigo.html"), encoding='utf-8') as f:
+        html = f.read()
+    sequence = max(re.findall(r'[ACGT]{40,}', html), key=len)
+    guide = sequence[10:30]
+    # The recorded page already carries cyan highlights, so mark this guide in another color
+    highlighter = pipeline.GuideHighlighter([guide], ["magenta"])
+    highlighted = ''.join(highlighter.iter_chunks(html))
+    
+    assert highlighted.count('background-color: magenta') >= 1
+    # Removing the new spans gives back the original page
+    assert re.sub(r'<span style="background-color: magenta; font-weight: bold;">([^<]*)</span>', r'\1', highlighted) == html
+
+def test_written_file_matches_the_in_memory_result(pipeline, tmp_path):
+    html = f"<html><body><p>{GUIDE}</p></body></html>"
+    output_path = tmp_path / "highlighted.html"
+    pipeline.write_highlighted_html(html, str(output_path), [GUIDE])
+    assert output_path.read_text(encoding='utf-8') == pipeline.highlight_pam_sequence(html, [GUIDE])
@@ -0,0 +1,49 @@
+"""Browserless HTTP backend: samples go straight to the INDIGO API"""
+import json
+import os
+
+from conftest import read_report
+
+def no_browser(download_path=None):
+    raise AssertionError("the HTTP backend must not start a browser")
+
+def test_http_backend_analyzes_every_sample_without_a_browser(load_pipeline, indigo_api, input_folder):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, NUM_WORKERS=2, WAIT_POLL_INTERVAL=0.01)
+    pipeline.init_driver = no_browser
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert sorted(rows) == sorted(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    assert len(indigo_api.uploads) == len(rows)
+    
+    for sample in rows:
+        result_path = os.path.join(pipeline.indigo_output_dir, f"{os.path.splitext(sample)[0]}_indigo.json")
+        with open(result_path, encoding='utf-8') as f:
+            assert json.load(f)['allele1fraction'] == 0.52
+
+def test_upload_carries_the_form_fields(load_pipeline, indigo_api, input_folder):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01)
+    sample = os.path.join(input_folder, sorted(os.listdir(input_folder))[0])
+    success, error = pipeline.process_input_file_http(sample, pipeline.grna_sequences)
+    assert success, error
+    
+    body = indigo_api.uploads[0]
+    for field in (b'name="queryFile"', b'name="chromatogramFile"', b'name="leftTrim"', b'name="rightTrim"', b'name="peakRatio"'):
+        assert field in body
+
+def test_api_errors_are_reported_as_indigo_failures(load_pipeline, indigo_api):
+    indigo_api.error = "Error in running Indigo: Trace too short"
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01)
+    pipeline.main()
+    
+    for row in read_report(pipeline).values():
+        assert row['Status'] == 'Failed (ICE unavailable)'
+        assert row['Indigo_Error'] == "Error in running Indigo: Trace too short"
+
+def test_connection_pool_fits_every_concurrent_request(load_pipeline):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", NUM_WORKERS=2, ASYNC_UPLOAD_CONCURRENCY=4, ASYNC_POLL_CONCURRENCY=8)
+    assert pipeline.get_http_pool().connection_pool_kw['maxsize'] == 12
+    
+    pipeline = load_pipeline(INDIGO_BACKEND="http", NUM_WORKERS=16)
+    assert pipeline.get_http_pool().connection_pool_kw['maxsize'] == 16
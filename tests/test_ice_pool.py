@@ -0,0 +1,49 @@
+"""ICE fallbacks run in worker processes and never hold up INDIGO submissions"""
+import os
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def failing_indigo(load_pipeline, indigo_api, fake_ice):
+    """Loader for an HTTP-backend pipeline whose every INDIGO run fails, with the stand-in ICE"""
+    indigo_api.error = "Error in running Indigo: Trace too short"
+    
+    def load(ice_delay=0.0, **overrides):
+        return load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01,
+                             ice_source_path=fake_ice(ice_delay), **overrides)
+    
+    return load
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_ice_fallbacks_run_in_worker_processes(failing_indigo, fake_ice, input_folder, mode):
+    pipeline = failing_indigo(PIPELINE_MODE=mode, ICE_PROCESS_WORKERS=2)
+    assert pipeline.ICE_AVAILABLE
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert sorted(rows) == sorted(os.listdir(input_folder))
+    for row in rows.values():
+        assert row['Status'] == 'Success (via ICE)'
+        assert row['ICE_Indel_%'] == '42.00'
+        assert row['Indigo_Error'] == "Error in running Indigo: Trace too short"
+    
+    calls = fake_ice.calls()
+    assert sorted(sample for _, sample, _, _ in calls) == sorted(rows)
+    assert os.getpid() not in {pid for pid, _, _, _ in calls}
+
+def test_indigo_keeps_submitting_while_ice_runs(failing_indigo, fake_ice, indigo_api):
+    pipeline = failing_indigo(ice_delay=0.5, ICE_PROCESS_WORKERS=2)
+    pipeline.main()
+    
+    first_ice_finished = min(finished for _, _, _, finished in fake_ice.calls())
+    assert len(indigo_api.upload_times) == 6
+    assert max(indigo_api.upload_times) < first_ice_finished
+
+def test_inline_ice_without_the_process_pool(failing_indigo, fake_ice):
+    pipeline = failing_indigo(ICE_USE_PROCESS_POOL=False)
+    pipeline.main()
+    
+    assert {row['Status'] for row in read_report(pipeline).values()} == {'Success (via ICE)'}
+    assert {pid for pid, _, _, _ in fake_ice.calls()} == {os.getpid()}
@@ -0,0 +1,81 @@
+"""Typed report columns parsed from saved INDIGO results, and --backfill"""
+import csv
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import read_report
+
+API_DATA = {
+    'variants': {
+        'columns': ['chr', 'pos', 'ref', 'alt', 'type', 'genotype'],
+        'rows': [['Wildtype', 350, 'ACGTA', 'A', 'Deletion', 'het.']],
+    },
+    'decomposition': {'x': [-4, -3, -2, -1, 0, 1, 2], 'y': [0.9, 0.7, 0.8, 0.6, 0.5, 0.7, 0.9]},
+    'allele1fraction': 0.52,
+    'allele2fraction': 0.48,
+    'align1score': 1240,
+}
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def test_recorded_result_page(pipeline, example):
+    result = pipeline.parse_indigo_result_file(os.path.join(example, "html_result_indigo.html"))
+    assert result['Indigo_Variant_Count'] == 1
+    assert result['Indigo_Variants'] == "333 C>CT Insertion hom. ALT"
+    assert result['Indigo_Indel_Sizes'] == "+1"
+    assert result['Indigo_Genotype'] == "hom. ALT"
+    assert result['Indigo_Allele1_Fraction'] == 0.5
+    assert result['Indigo_Allele2_Fraction'] == 0.5
+    assert result['Indigo_Alignment_Score'] == 671
+    assert isinstance(result['Indigo_Decomposition_Best_Indel'], int)
+
+def test_api_data(pipeline):
+    result = pipeline.parse_indigo_json({'data': API_DATA})
+    assert result['Indigo_Variant_Count'] == 1
+    assert result['Indigo_Indel_Sizes'] == "-4"
+    assert result['Indigo_Genotype'] == "het."
+    assert result['Indigo_Allele1_Fraction'] == 0.52
+    assert result['Indigo_Alignment_Score'] == 1240
+    assert result['Indigo_Decomposition_Best_Indel'] == 0
+    assert result['Indigo_Decomposition_Min_Error'] == 0.5
+
+def test_local_engine_results(pipeline):
+    result = pipeline.parse_indigo_json({
+        'decomposition': [{'indel': -3, 'fraction': 0.6}, {'indel': 0, 'fraction': 0.4}],
+        'alleles': [{'indel': -3, 'fraction': 0.6}, {'indel': 0, 'fraction': 0.4}],
+        'variants': [{'pos': 120, 'type': 'Deletion', 'size': -3, 'fraction': 0.6, 'genotype': 'het.'}],
+    })
+    assert result['Indigo_Variants'] == "120 -3 Deletion het."
+    assert result['Indigo_Decomposition_Best_Indel'] == -3
+    assert (result['Indigo_Allele1_Fraction'], result['Indigo_Allele2_Fraction']) == (0.6, 0.4)
+
+def test_unreadable_result_gives_empty_columns(pipeline, tmp_path):
+    broken = tmp_path / "broken_indigo.json"
+    broken.write_text("{not json")
+    assert pipeline.parse_indigo_result_file(str(broken)) == pipeline.empty_indigo_result()
+
+def test_backfill_parses_every_saved_result(pipeline, example, tmp_path):
+    folder = tmp_path / "old_run"
+    (folder / "nested").mkdir(parents=True)
+    shutil.copy(os.path.join(example, "html_result_indigo.html"), folder / "plate1_A01_results_highlighted.html")
+    (folder / "nested" / "plate1_A02_indigo.json").write_text(json.dumps(API_DATA))
+    output_path = tmp_path / "backfill.csv"
+    
+    assert pipeline.backfill_indigo_results([str(folder)], str(output_path)) == str(output_path)
+    with open(output_path, newline='', encoding='utf-8') as f:
+        rows = {row['Sample']: row for row in csv.DictReader(f)}
+    assert sorted(rows) == ["plate1_A01", "plate1_A02"]
+    assert rows["plate1_A01"]['Indigo_Alignment_Score'] == "671"
+    assert rows["plate1_A02"]['Indigo_Genotype'] == "het."
+
+def test_report_carries_the_typed_columns(load_pipeline, indigo_api):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01)
+    pipeline.main()
+    for row in read_report(pipeline).values():
+        assert row['Indigo_Allele1_Fraction'] == "0.52"
+        assert row['Indigo_Alignment_Score'] == "1240"
@@ -0,0 +1,67 @@
+"""RunJournal states and resuming an interrupted run"""
+import os
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def journal(load_pipeline, tmp_path):
+    pipeline = load_pipeline()
+    journal = pipeline.RunJournal(str(tmp_path / "journal.sqlite"))
+    yield journal
+    journal.close()
+
+def test_resume_skips_only_done_samples(journal):
+    assert journal.start_run(["a.ab1", "b.ab1", "c.ab1"]) == ["a.ab1", "b.ab1", "c.ab1"]
+    journal.mark("a.ab1", 'indigo')
+    journal.finish({'Sample': "a.ab1", 'Status': 'Success'}, True)
+    journal.mark("b.ab1", 'indigo')
+    journal.finish({'Sample': "b.ab1", 'Status': 'Failed (both tools)'}, False)
+    journal.mark("c.ab1", 'indigo')  # In flight when the run stopped
+    
+    assert journal.start_run(["a.ab1", "b.ab1", "c.ab1"], resume=True) == ["b.ab1", "c.ab1"]
+    assert [record['Sample'] for record, _ in journal.records()] == ["a.ab1", "b.ab1"]
+
+def test_fresh_start_forgets_earlier_runs(journal):
+    journal.start_run(["a.ab1"])
+    journal.finish({'Sample': "a.ab1", 'Status': 'Success'}, True)
+    assert journal.start_run(["a.ab1"]) == ["a.ab1"]
+    assert journal.records() == []
+
+def test_every_transition_is_logged(journal):
+    journal.start_run(["a.ab1"])
+    journal.mark("a.ab1", 'indigo')
+    journal.mark("a.ab1", 'ice', "Trace too short")
+    journal.finish({'Sample': "a.ab1", 'Status': 'Success (via ICE)'}, True)
+    with journal.lock:
+        states = [row[0] for row in journal.conn.execute("SELECT state FROM events WHERE sample = 'a.ab1' ORDER BY id")]
+        attempts = journal.conn.execute("SELECT attempts FROM samples WHERE sample = 'a.ab1'").fetchone()[0]
+    assert states == ['pending', 'indigo', 'ice', 'done']
+    assert attempts == 1
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_main_resume_keeps_finished_rows_and_runs_the_rest(load_pipeline, indigo_api, input_folder, mode):
+    settings = dict(JOURNAL_ENABLED=True, INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url,
+                    WAIT_POLL_INTERVAL=0.01, PIPELINE_MODE=mode)
+    file_names = sorted(os.listdir(input_folder))
+    first = load_pipeline(**settings)
+    first.main()
+    assert len(indigo_api.uploads) == 6
+    
+    # Pretend the run stopped before the last two samples finished
+    journal = first.RunJournal(first.journal_path)
+    with journal.lock:
+        journal.conn.executemany("UPDATE samples SET state = 'indigo', record = NULL WHERE sample = ?",
+                                 [(file_name,) for file_name in file_names[-2:]])
+    journal.close()
+    
+    resumed = load_pipeline(**settings)
+    resumed.main(resume=True)
+    
+    assert len(indigo_api.uploads) == 8
+    for file_name in file_names[-2:]:
+        assert f'filename="{file_name}"'.encode('ascii') in b''.join(indigo_api.uploads[6:])
+    rows = read_report(resumed)
+    assert sorted(rows) == file_names
+    assert {row['Status'] for row in rows.values()} == {'Success'}
@@ -0,0 +1,79 @@
+"""Local NumPy engine: trace decomposition of edited chromatograms built from the example trace"""
+import copy
+import json
+import os
+
+import pytest
+from Bio import SeqIO
+
+from conftest import read_report
+
+EDIT_AT = 300  # Index of the first edited called base
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(INDIGO_BACKEND="local")
+
+@pytest.fixture
+def wildtype(pipeline):
+    return SeqIO.read(pipeline.wild_type_file_path, "abi")
+
+def deletion_record(record, size):
+    """Homozygous deletion: the called peaks skip 'size' bases after EDIT_AT"""
+    edited = copy.deepcopy(record)
+    raw = edited.annotations['abif_raw']
+    raw['PLOC2'] = tuple(raw['PLOC2'][:EDIT_AT]) + tuple(raw['PLOC2'][EDIT_AT + size:])
+    raw['PBAS2'] = raw['PBAS2'][:EDIT_AT] + raw['PBAS2'][EDIT_AT + size:]
+    return edited
+
+def heterozygous_record(pipeline, record, size):
+    """50/50 mix of the wildtype and a 'size' bp deletion after EDIT_AT"""
+    edited = copy.deepcopy(record)
+    raw = edited.annotations['abif_raw']
+    peaks = raw['PLOC2']
+    for tag in pipeline.ABIF_TRACE_TAGS:
+        trace = list(raw[tag])
+        original = record.annotations['abif_raw'][tag]
+        for i in range(EDIT_AT, len(peaks) - size):
+            trace[peaks[i]] = (original[peaks[i]] + original[peaks[i + size]]) // 2
+        raw[tag] = tuple(trace)
+    return edited
+
+def test_wildtype_against_itself_is_unedited(pipeline, wildtype):
+    result = pipeline.decompose_trace(wildtype, wildtype)
+    assert result['alleles'][0]['indel'] == 0
+    assert all(variant['fraction'] < 0.2 for variant in result['variants'])
+
+@pytest.mark.parametrize("size", [1, 4, 7])
+def test_homozygous_deletion(pipeline, wildtype, size):
+    result = pipeline.decompose_trace(deletion_record(wildtype, size), wildtype)
+    assert result['alleles'][0] == {'indel': -size, 'fraction': 1.0}
+    assert result['variants'][0]['type'] == 'Deletion'
+    assert result['variants'][0]['genotype'] == 'hom. ALT'
+    assert abs(result['breakpoint'] - EDIT_AT) <= 3
+
+def test_heterozygous_deletion_is_split_between_two_alleles(pipeline, wildtype):
+    result = pipeline.decompose_trace(heterozygous_record(pipeline, wildtype, 4), wildtype)
+    fractions = {allele['indel']: allele['fraction'] for allele in result['alleles']}
+    assert set(fractions) == {0, -4}
+    assert fractions[-4] == pytest.approx(0.5, abs=0.1)
+    assert result['indel_percentage'] == pytest.approx(50, abs=10)
+    assert result['r_squared'] > 0.9
+
+def test_trace_too_short_is_an_indigo_error(pipeline, wildtype):
+    with pytest.raises(pipeline.IndigoError):
+        pipeline.decompose_trace(wildtype, wildtype, left_trim=600, right_trim=600)
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_local_backend_needs_no_browser_or_server(pipeline, mode):
+    pipeline.PIPELINE_MODE = mode
+    pipeline.init_driver = lambda download_path=None: pytest.fail("the local backend must not start a browser")
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == 6
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    for sample in rows:
+        result_path = os.path.join(pipeline.indigo_output_dir, f"{os.path.splitext(sample)[0]}_local_results.json")
+        with open(result_path, encoding='utf-8') as f:
+            assert json.load(f)['alleles'][0]['indel'] == 0
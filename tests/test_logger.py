@@ -0,0 +1,46 @@
+"""AnalysisLogger: queued file writes, size-based rotation and bounded message history"""
+import os
+
+import pytest
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def test_lines_reach_the_file_after_flush(pipeline, tmp_path):
+    logger = pipeline.AnalysisLogger(str(tmp_path / "log.txt"), flush_interval=0.05)
+    for i in range(50):
+        logger.debug(f"message {i}")
+    logger.flush()
+    lines = (tmp_path / "log.txt").read_text().splitlines()
+    assert len(lines) == 50
+    assert lines[0].endswith("[DEBUG] message 0") and lines[-1].endswith("[DEBUG] message 49")
+    logger.close()
+    assert not logger.writer.is_alive()
+
+def test_messages_after_close_are_still_written(pipeline, tmp_path):
+    logger = pipeline.AnalysisLogger(str(tmp_path / "log.txt"))
+    logger.close()
+    logger.debug("late message")
+    assert (tmp_path / "log.txt").read_text().endswith("[DEBUG] late message\n")
+
+def test_log_rotates_beyond_max_bytes(pipeline, tmp_path):
+    log_path = str(tmp_path / "log.txt")
+    logger = pipeline.AnalysisLogger(log_path, max_bytes=200, backup_count=2, flush_interval=0.05)
+    for i in range(5):
+        logger.debug("x" * 100)
+        logger.flush()
+    logger.close()
+    assert os.path.exists(f"{log_path}.1") and os.path.exists(f"{log_path}.2")
+    assert not os.path.exists(f"{log_path}.3")
+
+def test_summary_keeps_exact_counts_with_bounded_history(pipeline, tmp_path, capsys):
+    logger = pipeline.AnalysisLogger(str(tmp_path / "log.txt"), keep_messages=5)
+    for i in range(20):
+        logger.error(f"error {i}")
+    logger.warning("only warning")
+    summary = logger.get_summary()
+    logger.close()
+    assert summary['error_count'] == 20
+    assert summary['errors'] == [f"error {i}" for i in range(15, 20)]
+    assert (summary['warning_count'], summary['warnings']) == (1, ["only warning"])
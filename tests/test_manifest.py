@@ -0,0 +1,78 @@
+"""Sample manifest parsing, reference grouping and per-sample references in a run"""
+import os
+import shutil
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def write_manifest(tmp_path, text):
+    path = tmp_path / "manifest.csv"
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_rows_fill_gaps_from_the_configuration(pipeline, tmp_path):
+    path = write_manifest(tmp_path, (
+        "Sample,Wildtype,Guides,ICE_Guide,Left_Trim,Right_Trim\n"
+        "a,refs/locus2.ab1,acgtacgtacgtacgtacgt;GGGGCCCCAAAATTTTGGGG,,20,\n"
+        "b.ab1,,,,,\n"
+    ))
+    settings = pipeline.load_manifest(path)
+    defaults = pipeline.default_settings()
+    
+    a = settings["a.ab1"]
+    assert a.wildtype == os.path.join(str(tmp_path), "refs/locus2.ab1")
+    assert a.guides == ("acgtacgtacgtacgtacgt", "GGGGCCCCAAAATTTTGGGG")
+    assert a.ice_guide == "ACGTACGTACGTACGTACGT"  # First own guide
+    assert (a.left_trim, a.right_trim) == (20, defaults.right_trim)
+    assert settings["b.ab1"] == defaults
+
+def test_guides_may_be_space_separated(pipeline, tmp_path):
+    path = write_manifest(tmp_path, "sample,guides,ice_guide\na,ACGT  TTGG,ccaa\n")
+    settings = pipeline.load_manifest(path)["a.ab1"]
+    assert settings.guides == ("ACGT", "TTGG")
+    assert settings.ice_guide == "CCAA"
+
+def test_byte_order_mark_and_unknown_columns_are_accepted(pipeline, tmp_path):
+    path = tmp_path / "manifest.csv"
+    path.write_bytes(b"\xef\xbb\xbfsample,notes\na,first plate\n")
+    assert list(pipeline.load_manifest(str(path))) == ["a.ab1"]
+
+@pytest.mark.parametrize("text, message", [
+    ("wildtype\nref.ab1\n", "no 'sample' column"),
+    ("sample\na\na.ab1\n", "listed twice"),
+    ("sample,guides\na,ACGT-XYZ\n", "invalid guide sequence"),
+    ("sample,left_trim\na,ten\n", "whole numbers"),
+    ("sample\n\n", "lists no samples"),
+])
+def test_invalid_manifests_are_rejected(pipeline, tmp_path, text, message):
+    with pytest.raises(pipeline.PrerequisiteError, match=message):
+        pipeline.load_manifest(write_manifest(tmp_path, text))
+
+def test_missing_manifest_is_a_prerequisite_error(pipeline, tmp_path):
+    with pytest.raises(pipeline.PrerequisiteError, match="Cannot read manifest"):
+        pipeline.load_manifest(str(tmp_path / "missing.csv"))
+
+def test_samples_are_grouped_by_reference_in_first_seen_order(pipeline, tmp_path):
+    path = write_manifest(tmp_path, "sample,wildtype\nb,ref2.ab1\nd,ref2.ab1\n")
+    pipeline.sample_settings.update(pipeline.load_manifest(path))
+    assert pipeline.group_by_reference(["a.ab1", "b.ab1", "c.ab1", "d.ab1", "e.ab1"]) == \
+        ["a.ab1", "c.ab1", "e.ab1", "b.ab1", "d.ab1"]
+
+def test_run_uses_each_samples_reference(load_pipeline, indigo_api, example, input_folder, tmp_path):
+    shutil.copy(os.path.join(example, "demo.ab1"), tmp_path / "locus2.ab1")
+    manifest = write_manifest(tmp_path, "sample,wildtype\nsample_2,locus2.ab1\nsample_5,locus2.ab1\n")
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01,
+                             MANIFEST_PATH=manifest)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    assert {name for name, row in rows.items() if row['Wildtype'] == "locus2.ab1"} == {"sample_2.ab1", "sample_5.ab1"}
+    assert {row['Wildtype'] for row in rows.values()} == {"locus2.ab1", "demo.ab1"}
+    # Rows are written in the order the samples ran - grouped by reference
+    assert list(rows) == [f"sample_{i}.ab1" for i in (1, 3, 4, 6, 2, 5)]
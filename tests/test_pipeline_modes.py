@@ -0,0 +1,61 @@
+"""The pool and async pipelines produce the same report for both INDIGO backends"""
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import read_report
+
+def http_pipeline(load_pipeline, indigo_api, **overrides):
+    return load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01, **overrides)
+
+@pytest.mark.parametrize("mode, workers", [("pool", 1), ("pool", 3), ("async", 3)])
+def test_http_backend_analyzes_every_sample(load_pipeline, indigo_api, input_folder, mode, workers):
+    pipeline = http_pipeline(load_pipeline, indigo_api, PIPELINE_MODE=mode, NUM_WORKERS=workers)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert sorted(rows) == sorted(os.listdir(input_folder))
+    for sample, row in rows.items():
+        assert row['Status'] == 'Success', (sample, row['Error'])
+        assert row['Primary_Tool'] == 'Indigo'
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_indigo_errors_are_routed_to_the_ice_fallback(load_pipeline, indigo_api, mode):
+    indigo_api.error = "Error in running Indigo: Trace too short"
+    pipeline = http_pipeline(load_pipeline, indigo_api, PIPELINE_MODE=mode, NUM_WORKERS=2)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == 6
+    for row in rows.values():
+        assert row['Status'] == 'Failed (ICE unavailable)'
+        assert row['Indigo_Error'] == "Error in running Indigo: Trace too short"
+
+def test_async_browser_backend_never_shares_a_session(load_pipeline, input_folder):
+    pipeline = load_pipeline(PIPELINE_MODE="async", NUM_WORKERS=2)
+    busy, lock, seen = set(), threading.Lock(), []
+    
+    class FakeDriver:
+        def quit(self):
+            pass
+    
+    def process_input_file(input_file_path, grna_sequences, driver, retry_count=0, download_path=None, stats=None, settings=None):
+        with lock:
+            assert driver not in busy, "session used by two samples at once"
+            busy.add(driver)
+            seen.append(driver)
+        time.sleep(0.05)
+        with lock:
+            busy.discard(driver)
+        return True, None
+    
+    pipeline.init_driver = lambda download_path=None: FakeDriver()
+    pipeline.process_input_file = process_input_file
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert sorted(rows) == sorted(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    assert len(set(seen)) == 2
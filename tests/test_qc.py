@@ -0,0 +1,94 @@
+"""Pre-flight chromatogram QC verdicts"""
+import os
+
+import numpy as np
+import pytest
+
+import indigo_benchmark
+from conftest import GUIDE, read_report
+
+def write_mixed_sample(folder, name, alleles=4, length=indigo_benchmark.SYNTHETIC_LENGTH, seed=5):
+    """A read of several unrelated sequences in equal parts - every peak is mixed"""
+    rng = np.random.default_rng(seed)
+    sequences = [''.join(rng.choice(list("ACGT"), size=length)) for _ in range(alleles)]
+    path = os.path.join(folder, name)
+    indigo_benchmark.write_chromatogram(path, [(sequence, 1.0 / alleles) for sequence in sequences], name, rng, length)
+    return path
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def check(pipeline, path):
+    file_name = os.path.basename(path)
+    return pipeline.preflight_qc(file_name, pipeline.read_ab1(path))
+
+def test_clean_sample_passes(pipeline, input_folder):
+    columns = check(pipeline, os.path.join(input_folder, "sample_1.ab1"))
+    assert columns['QC_Status'] == 'Pass'
+    assert columns['QC_Guide_Found'] == 'Yes'
+    assert pipeline.qc_verdict("sample_1.ab1") == (None, '')
+
+def test_mixed_sample_fails_on_quality_and_snr(pipeline, tmp_path):
+    columns = check(pipeline, write_mixed_sample(str(tmp_path), "mixed.ab1"))
+    assert columns['QC_Status'].startswith('Fail: ')
+    assert 'mean Phred' in columns['QC_Status']
+    assert 'SNR' in columns['QC_Status']
+    action, reason = pipeline.qc_verdict("mixed.ab1")
+    assert action == 'skip'
+    assert reason == columns['QC_Status'][len('Fail: '):]
+
+def test_short_read_fails_on_clean_length(pipeline, tmp_path):
+    rng = np.random.default_rng(1)
+    path = str(tmp_path / "short.ab1")
+    indigo_benchmark.write_chromatogram(path, [(GUIDE * 10, 1.0)], "short", rng, length=150)
+    columns = check(pipeline, path)
+    assert columns['QC_Status'] == f"Fail: clean length {columns['QC_Clean_Length']} < {pipeline.QC_MIN_CLEAN_LENGTH}"
+
+def test_flag_action_reports_but_keeps_analyzing(load_pipeline, tmp_path):
+    pipeline = load_pipeline(QC_FAIL_ACTION="flag")
+    columns = check(pipeline, write_mixed_sample(str(tmp_path), "mixed.ab1"))
+    assert columns['QC_Status'].startswith('Fail: ')
+    assert pipeline.qc_verdict("mixed.ab1")[0] is None
+
+def test_missing_guide_fails_only_when_required(load_pipeline, input_folder):
+    path = os.path.join(input_folder, "sample_1.ab1")
+    other_guide = ["TTTTTTTTTTCCCCCCCCCC"]
+    assert check(load_pipeline(grna_sequences=other_guide), path)['QC_Status'] == 'Pass'
+    columns = check(load_pipeline(grna_sequences=other_guide, QC_REQUIRE_GUIDE=True), path)
+    assert columns['QC_Guide_Found'] == 'No'
+    assert columns['QC_Status'] == 'Fail: guide not found in base calls'
+
+def test_clean_read_length(pipeline):
+    assert pipeline.clean_read_length(np.full(150, 40.0)) == 150
+    assert pipeline.clean_read_length(np.full(150, 5.0)) == 0
+    assert pipeline.clean_read_length(np.full(5, 40.0)) == 0
+    phred = np.concatenate([np.full(100, 5.0), np.full(120, 40.0), np.full(100, 5.0)])
+    assert 120 <= pipeline.clean_read_length(phred) < 140
+
+def test_guide_match_finds_both_strands(pipeline):
+    guide = GUIDE
+    for sequence in ("A" * 30 + guide + "A" * 30, "A" * 30 + pipeline.reverse_complement(guide) + "A" * 30):
+        basecalls = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+        assert pipeline.guide_match(basecalls, guide)[0] == 0
+    mismatched = guide[:5] + ("A" if guide[5] != "A" else "C") + guide[6:]
+    basecalls = np.frombuffer(("T" * 30 + mismatched).encode('ascii'), dtype=np.uint8)
+    assert pipeline.guide_match(basecalls, guide) == (1, 30 + len(guide) - 3)
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+@pytest.mark.parametrize("action, status", [("skip", 'Skipped (QC)'), ("ice", 'Failed (ICE unavailable)')])
+def test_failed_samples_skip_indigo(load_pipeline, input_folder, mode, action, status):
+    write_mixed_sample(input_folder, "mixed.ab1")
+    pipeline = load_pipeline(INDIGO_BACKEND="local", PIPELINE_MODE=mode, QC_FAIL_ACTION=action)
+    local_engine = pipeline.process_input_file_local
+    
+    def local_engine_without_mixed(input_file_path, *args, **kwargs):
+        assert os.path.basename(input_file_path) != "mixed.ab1", "QC failure was sent to INDIGO"
+        return local_engine(input_file_path, *args, **kwargs)
+    
+    pipeline.process_input_file_local = local_engine_without_mixed
+    pipeline.main()
+    rows = read_report(pipeline)
+    assert rows['mixed.ab1']['Status'] == status
+    assert rows['mixed.ab1']['QC_Status'].startswith('Fail: ')
+    assert all(row['Status'] == 'Success' for sample, row in rows.items() if sample != 'mixed.ab1')
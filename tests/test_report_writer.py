@@ -0,0 +1,77 @@
+"""ReportWriter: rows stream to CSV/Parquet in input order under the fixed REPORT_SCHEMA"""
+import csv
+import os
+
+import pytest
+
+from conftest import read_report
+from test_worker_pool import use_fake_browser
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_rows_are_released_in_input_order(pipeline, tmp_path):
+    report_path = str(tmp_path / "report.csv")
+    writer = pipeline.ReportWriter(report_path, ["a.ab1", "b.ab1", "c.ab1"], flush_interval=0, flush_rows=1)
+    
+    writer.write({'Sample': "c.ab1", 'Status': 'Success'}, True)
+    writer.write({'Sample': "b.ab1", 'Status': 'Failed'}, False)
+    assert read_csv(report_path) == [pipeline.REPORT_COLUMNS]  # Still waiting for a.ab1
+    
+    writer.write({'Sample': "a.ab1", 'Status': 'Success'}, True)
+    writer.close()
+    rows = read_csv(report_path)
+    assert [row[0] for row in rows[1:]] == ["a.ab1", "b.ab1", "c.ab1"]
+    
+    summary = writer.summary()
+    assert (summary['rows'], summary['successful'], summary['failed']) == (3, 2, 1)
+    assert summary['status_counts'] == {'Success': 2, 'Failed': 1}
+
+def test_close_writes_rows_behind_samples_that_never_finished(pipeline, tmp_path):
+    report_path = str(tmp_path / "report.csv")
+    writer = pipeline.ReportWriter(report_path, ["a.ab1", "b.ab1"])
+    writer.write({'Sample': "b.ab1", 'Status': 'Success'}, True)
+    writer.close()
+    assert [row[0] for row in read_csv(report_path)[1:]] == ["b.ab1"]
+
+def test_unknown_columns_are_dropped(pipeline, tmp_path):
+    report_path = str(tmp_path / "report.csv")
+    writer = pipeline.ReportWriter(report_path, ["a.ab1"])
+    writer.write({'Sample': "a.ab1", 'Status': 'Success', 'Not_A_Column': 1}, True)
+    writer.close()
+    header, row = read_csv(report_path)
+    assert header == pipeline.REPORT_COLUMNS
+    assert 'Not_A_Column' not in header
+    assert row[header.index('Status')] == 'Success'
+
+def test_parquet_copy_keeps_the_schema_types(pipeline, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    report_path = str(tmp_path / "report.csv")
+    parquet_path = str(tmp_path / "report.parquet")
+    writer = pipeline.ReportWriter(report_path, ["a.ab1", "b.ab1"], parquet_path)
+    writer.write({'Sample': "a.ab1", 'Status': 'Success', 'ICE_Indel_%': '42.0', 'ICE_Cut_Site': '21'}, True)
+    writer.write({'Sample': "b.ab1", 'Status': 'Failed', 'ICE_Indel_%': 'n/a'}, False)
+    writer.close()
+    
+    table = pq.read_table(parquet_path)
+    assert table.column_names == pipeline.REPORT_COLUMNS
+    assert str(table.schema.field('ICE_Indel_%').type) == 'double'
+    assert str(table.schema.field('ICE_Cut_Site').type) == 'int64'
+    assert table.column('ICE_Indel_%').to_pylist() == [42.0, None]
+    assert table.column('ICE_Cut_Site').to_pylist() == [21, None]
+
+def test_main_streams_the_report(load_pipeline, input_folder):
+    pipeline = load_pipeline(NUM_WORKERS=2)
+    use_fake_browser(pipeline)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert list(rows) == sorted(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    reports = [name for name in os.listdir(os.path.dirname(pipeline.indigo_output_dir)) if name.startswith("hybrid_analysis_report_")]
+    assert any(name.endswith(".parquet") for name in reports)
@@ -0,0 +1,95 @@
+"""ResultCache keys and reuse of cached rows"""
+import os
+import shutil
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(RESULT_CACHE_ENABLED=True)
+
+@pytest.fixture
+def cache(pipeline):
+    return pipeline.ResultCache(pipeline.result_cache_dir, 10 * 1024 * 1024)
+
+def sample_path(pipeline, index=0):
+    return os.path.join(pipeline.input_folder_path, sorted(os.listdir(pipeline.input_folder_path))[index])
+
+def test_key_depends_on_bytes_not_name(pipeline, cache, tmp_path):
+    path = sample_path(pipeline)
+    copy = tmp_path / "renamed.ab1"
+    shutil.copy(path, copy)
+    assert cache.make_key(path) == cache.make_key(str(copy))
+    assert cache.make_key(path) != cache.make_key(sample_path(pipeline, 1))
+
+@pytest.mark.parametrize("name, value", [
+    ('grna_sequences', ["ACGTACGTACGTACGTACGT"]),
+    ('ICE_TARGET_SEQUENCE_FALLBACK', "ACGTACGTACGTACGTACGT"),
+    ('INDIGO_LEFT_TRIM', 10),
+    ('INDIGO_RIGHT_TRIM', 10),
+    ('INDIGO_PEAK_RATIO', 20),
+    ('INDIGO_BACKEND', "local"),
+])
+def test_key_depends_on_settings(pipeline, cache, name, value):
+    path = sample_path(pipeline)
+    key = cache.make_key(path)
+    setattr(pipeline, name, value)
+    assert cache.make_key(path) != key
+
+def test_key_depends_on_wildtype_bytes(pipeline, cache, tmp_path):
+    path = sample_path(pipeline)
+    other_wildtype = tmp_path / "other_wildtype.ab1"
+    shutil.copy(sample_path(pipeline, 1), other_wildtype)
+    other = pipeline.default_settings()._replace(wildtype=str(other_wildtype))
+    assert cache.make_key(path) != cache.make_key(path, other)
+
+def test_failed_rows_are_not_cached(pipeline, cache):
+    key = cache.make_key(sample_path(pipeline))
+    cache.put(key, {'Sample': "a.ab1", 'Status': 'Failed (both tools)'}, False)
+    assert cache.get(key) is None
+
+def test_identical_chromatogram_reuses_the_row_under_its_own_name(pipeline, cache):
+    source = sample_path(pipeline)
+    source_name = os.path.basename(source)
+    base_name = os.path.splitext(source_name)[0]
+    with open(os.path.join(pipeline.indigo_output_dir, f"{base_name}_indigo.json"), 'w') as f:
+        f.write("{}")
+    cache.put(cache.make_key(source), {'Sample': source_name, 'Status': 'Success',
+                                       'Indigo_Result_File': f"{base_name}_indigo.json"}, True)
+    shutil.copy(source, os.path.join(pipeline.input_folder_path, "duplicate.ab1"))
+    pipeline.result_cache = cache
+    
+    key, record, succeeded = pipeline.lookup_cached_record("duplicate.ab1")
+    assert succeeded and key == cache.make_key(source)
+    assert record['Sample'] == "duplicate.ab1"
+    assert record['Cached'] == 'Yes'
+    assert record['Indigo_Result_File'] == "duplicate_indigo.json"
+    assert os.path.exists(os.path.join(pipeline.indigo_output_dir, "duplicate_indigo.json"))
+
+def test_lru_eviction_keeps_the_size_bound(pipeline, tmp_path):
+    cache = pipeline.ResultCache(str(tmp_path / "small_cache"), 1)
+    first, second = (cache.make_key(sample_path(pipeline, i)) for i in range(2))
+    cache.put(first, {'Sample': "a.ab1", 'Status': 'Success'}, True)
+    cache.put(second, {'Sample': "b.ab1", 'Status': 'Success'}, True)
+    assert cache.get(first) is None
+    assert cache.get(second) is not None
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_second_run_is_served_from_the_cache(load_pipeline, indigo_api, mode):
+    settings = dict(RESULT_CACHE_ENABLED=True, INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url,
+                    WAIT_POLL_INTERVAL=0.01, PIPELINE_MODE=mode)
+    first = load_pipeline(**settings)
+    first.main()
+    assert len(indigo_api.uploads) == 6
+    assert {row.get('Cached', '') for row in read_report(first).values()} == {''}
+    
+    second = load_pipeline(**settings)
+    second.main()
+    assert len(indigo_api.uploads) == 6
+    rows = read_report(second)
+    assert {row['Cached'] for row in rows.values()} == {'Yes'}
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    for row in rows.values():
+        assert os.path.exists(os.path.join(second.indigo_output_dir, row['Indigo_Result_File']))
@@ -0,0 +1,160 @@
+"""INDIGO error classes, per-class retries and the circuit breaker"""
+import os
+import socket
+import time
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(BREAKER_MIN_SAMPLES=2, BREAKER_WINDOW=4, BREAKER_OPEN_SECONDS=60)
+
+@pytest.mark.parametrize("message, error_class", [
+    ("WebDriver error accessing INDIGO: Message: invalid session id", 'session'),
+    ("WebDriver error accessing INDIGO: Message: session deleted because of page crash", 'session'),
+    ("WebDriver session crashed", 'session'),
+    ("WebDriver error: unknown error", 'session'),
+    ("WebDriver error accessing INDIGO: net::ERR_CONNECTION_REFUSED", 'connection'),
+    ("Error posting to INDIGO API: timed out", 'connection'),
+    ("Timeout waiting for INDIGO result", 'timeout'),
+    ("Stale element reference", 'stale'),
+    ("Trace too short", 'analysis'),
+])
+def test_classify_indigo_error(pipeline, message, error_class):
+    assert pipeline.classify_indigo_error(message) == error_class
+
+def test_session_crashes_are_left_out_of_the_breaker(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    for index in range(4):
+        assert breaker.allow(f"s{index}.ab1") == 'closed'
+        breaker.record(f"s{index}.ab1", 'closed', "WebDriver error accessing INDIGO: invalid session id", 1.0)
+    assert breaker.state == 'closed'
+    assert not breaker.window
+
+def test_session_crash_on_probe_lets_the_next_sample_probe(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    breaker.state, breaker.open_until = 'open', 0.0
+    assert breaker.allow("probe.ab1") == 'probe'
+    breaker.record("probe.ab1", 'probe', "WebDriver session crashed", 1.0)
+    assert breaker.state == 'half_open'
+    assert breaker.allow("next.ab1") == 'probe'
+
+def test_indigo_stage_restarts_a_dead_session_before_retrying(pipeline, monkeypatch):
+    drivers_seen = []
+    
+    def run_indigo(input_file_path, driver, download_path, stats):
+        drivers_seen.append(driver)
+        if driver == "dead":
+            return False, "WebDriver error accessing INDIGO: Message: invalid session id"
+        return True, None
+    
+    restarts = []
+    
+    def restart_session(download_path, driver=None):
+        restarts.append(driver)
+        return "fresh"
+    
+    monkeypatch.setattr(pipeline, 'INDIGO_BACKEND', "selenium")
+    monkeypatch.setattr(pipeline, 'run_indigo', run_indigo)
+    monkeypatch.setattr(pipeline, 'restart_session', restart_session)
+    monkeypatch.setattr(pipeline, 'collect_indigo_result', lambda *args: None)
+    monkeypatch.setattr(pipeline, 'indigo_success_record', lambda file_name, stats: {'Sample': file_name})
+    record, error, driver = pipeline.indigo_stage("sample.ab1", "dead", pipeline.indigo_output_dir)
+    assert error is None and record == {'Sample': "sample.ab1"}
+    assert drivers_seen == ["dead", "fresh"]
+    assert restarts == ["dead"]
+    assert driver == "fresh"
+
+def record_samples(breaker, count, error=None, seconds=1.0, prefix="s"):
+    for index in range(count):
+        file_name = f"{prefix}{index}.ab1"
+        mode = breaker.allow(file_name)
+        breaker.record(file_name, mode, error, seconds)
+
+def test_breaker_opens_on_failure_rate(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    record_samples(breaker, 1, error="Error posting to INDIGO API: refused")
+    assert breaker.state == 'closed'  # Fewer than BREAKER_MIN_SAMPLES
+    record_samples(breaker, 1, error="Error posting to INDIGO API: refused", prefix="t")
+    assert breaker.state == 'open'
+    assert breaker.allow("next.ab1") is None
+    assert breaker.rejected == 1
+    assert breaker.take("next.ab1") == {'Indigo_Breaker': 'open'}
+
+def test_analysis_errors_do_not_open_the_breaker(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    record_samples(breaker, 4, error="Error in running Indigo: Trace too short")
+    assert breaker.state == 'closed'
+
+def test_breaker_opens_on_slow_samples(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    record_samples(breaker, 2, seconds=pipeline.BREAKER_SLOW_SECONDS)
+    assert breaker.state == 'open'
+
+def test_successful_probe_closes_the_breaker(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    record_samples(breaker, 2, error="Timeout waiting for INDIGO result")
+    breaker.open_until = 0.0
+    assert breaker.allow("probe.ab1") == 'probe'
+    assert breaker.state == 'half_open'
+    assert breaker.allow("other.ab1") is None  # One probe at a time
+    breaker.record("probe.ab1", 'probe', None, 1.0)
+    assert breaker.state == 'closed'
+    assert not breaker.window
+    assert breaker.allow("after.ab1") == 'closed'
+    assert [t['state'] for t in breaker.transitions] == ['open', 'half_open', 'closed']
+
+def test_failed_probe_reopens_for_twice_as_long(pipeline):
+    breaker = pipeline.CircuitBreaker()
+    record_samples(breaker, 2, error="Timeout waiting for INDIGO result")
+    assert breaker.open_seconds == 60
+    for expected in (120, 240, 480, 900, 900):  # Capped at BREAKER_MAX_OPEN_SECONDS
+        breaker.open_until = 0.0
+        assert breaker.allow("probe.ab1") == 'probe'
+        breaker.record("probe.ab1", 'probe', "Timeout waiting for INDIGO result", 1.0)
+        assert breaker.state == 'open'
+        assert breaker.open_seconds == expected
+
+def test_retries_stop_while_the_breaker_is_open(pipeline):
+    budget = pipeline.RetryBudget()
+    assert budget.next_delay('connection') is not None
+    assert budget.next_delay('analysis') is None
+    assert budget.next_delay('timeout') is None
+    pipeline.indigo_breaker = pipeline.CircuitBreaker()
+    pipeline.indigo_breaker.state = 'open'
+    assert budget.next_delay('connection') is None
+
+def test_disabled_breaker_lets_everything_through(pipeline):
+    breaker = pipeline.CircuitBreaker(enabled=False)
+    record_samples(breaker, 4, error="Error posting to INDIGO API: refused")
+    assert breaker.allow("x.ab1") == 'closed'
+
+def test_unreachable_indigo_opens_the_breaker_during_a_run(load_pipeline, input_folder):
+    with socket.socket() as closed:
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=f"http://127.0.0.1:{port}/indigo/api/v1",
+                             BREAKER_MIN_SAMPLES=2, BREAKER_WINDOW=4, BREAKER_OPEN_SECONDS=60, RETRY_BASE_DELAY=0.01)
+    pipeline.main()
+    
+    rows = [row for _, row in sorted(read_report(pipeline).items())]
+    assert len(rows) == len(os.listdir(input_folder))
+    assert [row['Indigo_Breaker'] for row in rows[:2]] == ['closed', 'closed']
+    assert {row['Indigo_Breaker'] for row in rows[2:]} == {'open'}
+    assert 'open' in rows[1]['Breaker_Event']
+    assert {row['Indigo_Error'] for row in rows[2:]} == {pipeline.BREAKER_OPEN_ERROR}
+
+def test_each_run_starts_with_a_breaker_from_the_current_settings(load_pipeline, indigo_api, input_folder):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01)
+    stale = pipeline.indigo_breaker
+    stale.state, stale.open_until = 'open', time.time() + 3600  # Left open by an earlier run
+    pipeline.BREAKER_WINDOW = 3
+    pipeline.main()
+    
+    assert pipeline.indigo_breaker is not stale
+    assert pipeline.indigo_breaker.window.maxlen == 3
+    rows = read_report(pipeline)
+    assert len(rows) == len(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
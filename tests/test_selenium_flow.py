@@ -0,0 +1,169 @@
+"""process_input_file against a scripted stand-in for the INDIGO web form (no Chrome needed)"""
+import os
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+class FakeElement:
+    def __init__(self, page, name, displayed=True, text=''):
+        self.page = page
+        self.name = name
+        self.displayed = displayed
+        self.text = text
+        self.value = ''
+    
+    def is_displayed(self):
+        return self.displayed
+    
+    def is_enabled(self):
+        return True
+    
+    def send_keys(self, value):
+        self.value = value
+    
+    def get_attribute(self, name):
+        return self.value if name == "value" else None
+    
+    def click(self):
+        self.page.clicked(self.name)
+
+class FakeFormDriver:
+    """
+    The INDIGO form: after submit, the outcome ('result', 'error' or None for a run that never
+    finishes) appears after 'delay' seconds, the download link 'link_delay' seconds later.
+    Clicking the link saves the result page into the download directory.
+    """
+    
+    def __init__(self, download_path, outcome='result', delay=0.2, link_delay=0.0, error_text=''):
+        self.download_path = download_path
+        self.outcome = outcome
+        self.delay = delay
+        self.link_delay = link_delay
+        self.error_text = error_text
+        self.submitted = None
+        self.elements = {name: FakeElement(self, name) for name in
+                         ("inputFile", "target-chromatogram-tab", "targetFileChromatogram", "btn-submit")}
+    
+    @property
+    def page_source(self):
+        if self.outcome == 'error' and self._shown():
+            return f"<html><div id=\"error-message\">{self.error_text}</div></html>"
+        return "<html><div id=\"result-info\">Analysis is running, please be patient.</div></html>"
+    
+    def get(self, url):
+        pass
+    
+    def clicked(self, name):
+        if name == "btn-submit":
+            self.submitted = time.time()
+        elif name == "Download HTML":
+            with open(os.path.join(self.download_path, "indigo_result.html"), 'w') as f:
+                f.write("<html>result</html>")
+    
+    def execute_script(self, script, *args):
+        if "click()" in script:
+            args[0].click()
+    
+    def _shown(self, extra=0.0):
+        return self.submitted is not None and time.time() - self.submitted >= self.delay + extra
+    
+    def find_elements(self, by, value):
+        if value in self.elements:
+            return [self.elements[value]]
+        if value == "result-error":
+            return [FakeElement(self, value, displayed=self.outcome == 'error' and self._shown())]
+        if value == "error-message":
+            return [FakeElement(self, value, text=self.error_text)]
+        if value == "result-container":
+            return [FakeElement(self, value, displayed=self.outcome == 'result' and self._shown())]
+        if value == "Download HTML" and self.outcome == 'result' and self._shown(self.link_delay):
+            return [FakeElement(self, value)]
+        return []
+    
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(INDIGO_WAIT_TIME=0, DRIVER_TIMEOUT=2, DOWNLOAD_TIMEOUT=2)
+
+def run_form(pipeline, **driver_options):
+    sample = sorted(os.listdir(pipeline.input_folder_path))[0]
+    driver = FakeFormDriver(pipeline.indigo_output_dir, **driver_options)
+    stats = {}
+    success, error = pipeline.process_input_file(os.path.join(pipeline.input_folder_path, sample),
+                                                 pipeline.grna_sequences, driver, stats=stats)
+    return success, error, stats
+
+def test_result_is_downloaded_as_soon_as_it_renders(pipeline):
+    started = time.time()
+    success, error, stats = run_form(pipeline)
+    assert success, error
+    assert time.time() - started < 1.5
+    assert os.path.exists(os.path.join(pipeline.indigo_output_dir, "indigo_result.html"))
+    assert 0 < stats['wait_saved_seconds'] <= pipeline.LEGACY_FIXED_SLEEPS
+
+def test_error_page_is_reported_as_a_failure(pipeline):
+    success, error, _ = run_form(pipeline, outcome='error', error_text="Error in running Indigo: Trace too short")
+    assert not success
+    assert error == "Trace too short"
+
+def test_download_link_rendered_after_container_is_downloaded(pipeline):
+    success, error, stats = run_form(pipeline, link_delay=0.6)
+    assert success, error
+    assert os.path.basename(stats['result_file']) == "indigo_result.html"
+    assert 0 < stats['wait_saved_seconds'] <= pipeline.LEGACY_FIXED_SLEEPS
+
+def test_no_outcome_is_a_timeout_not_a_success(pipeline):
+    success, error, stats = run_form(pipeline, outcome=None)
+    assert not success
+    assert error == "Timeout waiting for INDIGO result"
+    assert pipeline.classify_indigo_error(error) == 'timeout'
+    assert 'result_file' not in stats
+
+def test_browserless_backends_report_no_wait_saved(load_pipeline):
+    pipeline = load_pipeline(INDIGO_BACKEND="local")
+    sample = sorted(os.listdir(pipeline.input_folder_path))[0]
+    stats = {}
+    success, error = pipeline.run_indigo(os.path.join(pipeline.input_folder_path, sample), None, None, stats)
+    assert success, error
+    assert pipeline.indigo_success_record(sample, stats)['Indigo_Wait_Saved_s'] == ''
+
+def test_wait_for_download_skips_partial_files(pipeline, tmp_path):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    partial = downloads / "indigo_result.html.crdownload"
+    partial.write_text("<html>")
+    
+    def finish():
+        time.sleep(0.3)
+        partial.rename(downloads / "indigo_result.html")
+    
+    thread = threading.Thread(target=finish)
+    thread.start()
+    downloaded = pipeline.wait_for_download(str(downloads), set(), timeout=2)
+    thread.join()
+    assert downloaded == str(downloads / "indigo_result.html")
+
+def test_wait_for_download_times_out_without_a_new_file(pipeline, tmp_path):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    (downloads / "old.html").write_text("<html>")
+    assert pipeline.wait_for_download(str(downloads), {"old.html"}, timeout=0.3) is None
+
+@pytest.mark.parametrize("error_text, expected", [
+    ("Error in running Indigo: Trace too short", "Trace too short"),
+    ("Alignment of trace to reference failed", "Alignment of trace to reference failed"),
+])
+def test_error_page_wins_the_race_with_the_result_wait(load_pipeline, error_text, expected):
+    pipeline = load_pipeline(INDIGO_WAIT_TIME=10, DRIVER_TIMEOUT=10, DOWNLOAD_TIMEOUT=10, WAIT_POLL_INTERVAL=0.01)
+    started = time.time()
+    success, error, _ = run_form(pipeline, outcome='error', error_text=error_text, delay=0.1)
+    assert (success, error) == (False, expected)
+    assert time.time() - started < 2  # Not after the 10 s result timeout
+    assert pipeline.classify_indigo_error(error) == 'analysis'
@@ -0,0 +1,178 @@
+"""
+BrowserSessionPool: browsers are recycled on sample count and error rate, from warm spares when
+ready, and hand-overs never leave two live browsers on one cache slot
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import read_report
+
+class PoolDriver:
+    """Stands in for a Chrome session on a cache slot; the fake analysis below writes its result page"""
+    
+    def __init__(self, download_path, live, slot):
+        self.download_path = download_path
+        self.live = live
+        self.slot = slot
+        self.quit_called = False
+        self.cdp_commands = []
+    
+    def get(self, url):
+        pass
+    
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        if command == "Page.setDownloadBehavior":
+            self.download_path = params["downloadPath"]
+    
+    def quit(self):
+        self.quit_called = True
+        self.live.discard(self.slot)
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    pipeline = load_pipeline(NUM_WORKERS=2, SESSION_RECYCLE_SAMPLES=2, SESSION_ERROR_WINDOW=2, RETRY_BASE_DELAY=0.01)
+    drivers = []
+    live = set()
+    lock = threading.Lock()
+    
+    def init_driver(download_path=None, profile=None, slot=None):
+        slot = slot or os.path.basename(pipeline.browser_cache_path(download_path))
+        with lock:
+            assert slot not in live, f"cache slot {slot} already used by a live browser"
+            live.add(slot)
+            driver = PoolDriver(download_path, live, slot)
+            drivers.append(driver)
+        return driver
+    
+    pipeline.init_driver = init_driver
+    pipeline.drivers = drivers
+    return pipeline
+
+def write_result_page(input_file_path, grna_sequences, driver, retry_count=0, download_path=None, stats=None, settings=None):
+    sample = os.path.splitext(os.path.basename(input_file_path))[0]
+    with open(os.path.join(driver.download_path, f"{sample}.html"), 'w') as f:
+        f.write("<html>result</html>")
+    return True, None
+
+def wait_for_spare(pool):
+    deadline = time.time() + 5
+    while pool.spares.empty():
+        assert time.time() < deadline, "spare never started"
+        time.sleep(0.01)
+
+def test_record_reports_why_a_browser_is_due(pipeline):
+    pool = pipeline.BrowserSessionPool(warm_spares=0)
+    pool.track("worker_a", pipeline.init_driver("worker_a", slot="worker_a"))
+    assert pool.record("worker_a", True) is None
+    assert pool.record("worker_a", True) == "samples"
+    
+    pool.track("worker_b", pipeline.init_driver("worker_b", slot="worker_b"))
+    pool.sessions["worker_b"].samples = -10
+    pool.record("worker_b", False)
+    assert pool.record("worker_b", False) == "error_rate"
+    pool.close()
+
+def test_recycle_hands_over_a_warm_spare(pipeline):
+    pool = pipeline.BrowserSessionPool(warm_spares=1)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    old = pipeline.init_driver(worker_dir)
+    pool.track(worker_dir, old)
+    pool.start_spares()
+    wait_for_spare(pool)
+    
+    driver = pool.replace(worker_dir, "samples")
+    assert driver is not old
+    assert driver.download_path == worker_dir  # Redirected from its spare directory
+    assert pool.spare_hits == 1
+    
+    wait_for_spare(pool)  # The old browser quits and its cache slot warms the next spare
+    assert old.quit_called
+    pool.close()
+    assert pool.snapshot()['recycles'] == {'samples': 1}
+
+def test_recycle_without_a_spare_starts_a_new_session(pipeline):
+    pool = pipeline.BrowserSessionPool(warm_spares=0)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    old = pipeline.init_driver(worker_dir)
+    pool.track(worker_dir, old)
+    
+    driver = pool.replace(worker_dir, "crash")
+    assert old.quit_called  # Quit first - the new session takes over its cache directory
+    assert driver.download_path == worker_dir
+    assert pool.spare_misses == 1
+    pool.close()
+
+def test_spare_miss_reuses_the_replaced_browsers_slot(pipeline):
+    pool = pipeline.BrowserSessionPool(warm_spares=1)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    pool.track(worker_dir, pipeline.init_driver(worker_dir))
+    pool.start_spares()
+    wait_for_spare(pool)
+    
+    pool.replace(worker_dir, "samples")  # Hit: the worker moves to the spare's slot
+    assert pool.sessions[worker_dir].slot.endswith("spare_1")
+    wait_for_spare(pool)  # Next spare starts on the worker's old slot
+    pool.spares.get_nowait()  # ... but is not ready when the next recycle comes
+    
+    driver = pool.replace(worker_dir, "crash")  # Miss
+    assert driver.slot.endswith("spare_1")
+    assert pool.spare_misses == 1
+    pool.close()
+
+def test_failed_fresh_session_returns_its_slot(pipeline):
+    pool = pipeline.BrowserSessionPool(warm_spares=0)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    pool.track(worker_dir, pipeline.init_driver(worker_dir))
+    
+    def broken_init_driver(download_path=None, profile=None, slot=None):
+        raise pipeline.IndigoError("Failed to initialize WebDriver")
+    
+    pipeline.init_driver = broken_init_driver
+    with pytest.raises(pipeline.IndigoError):
+        pool.replace(worker_dir, "crash")
+    pool.executor.shutdown(wait=True)  # The slot's spare fails to start as well and hands it back
+    assert list(pool.free_slots) == ["worker_1"]
+    assert not pool.spares.qsize()
+
+def test_sample_on_a_worker_without_a_browser_restarts_it(pipeline):
+    pipeline.process_input_file = write_result_page
+    sample = sorted(os.listdir(pipeline.input_folder_path))[0]
+    record, indigo_error, driver = pipeline.indigo_stage(sample, None, pipeline.get_worker_download_dir(1))
+    assert record is not None and indigo_error is None
+    assert driver is pipeline.drivers[-1]
+
+def test_failed_restart_is_a_retried_session_error(pipeline):
+    attempts = []
+    
+    def broken_init_driver(download_path=None, profile=None, slot=None):
+        attempts.append(download_path)
+        raise pipeline.IndigoError("Failed to initialize WebDriver")
+    
+    pipeline.init_driver = broken_init_driver
+    sample = sorted(os.listdir(pipeline.input_folder_path))[0]
+    record, indigo_error, driver = pipeline.indigo_stage(sample, None, pipeline.get_worker_download_dir(1))
+    assert record is None and driver is None
+    assert pipeline.classify_indigo_error(indigo_error) == 'session'
+    assert len(attempts) == 1 + pipeline.RETRY_BUDGETS['session']
+
+def test_idle_worker_without_a_browser_is_restarted(pipeline):
+    pool = pipeline.WorkerPool(1, 0)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    pool.drivers = {1: (None, worker_dir)}
+    driver = pool.keep_warm(1)
+    assert driver is pipeline.drivers[-1]
+    assert pool.drivers[1] == (driver, worker_dir)
+
+def test_main_recycles_browsers_after_their_sample_budget(pipeline, input_folder):
+    pipeline.process_input_file = write_result_page
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == len(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    # Two workers, six samples, a new browser every two samples
+    assert pipeline.session_pool.snapshot()['recycles'].get('samples', 0) >= 2
@@ -0,0 +1,86 @@
+"""Per-sample stage timings: report columns, run histograms and the Prometheus textfile"""
+import glob
+import json
+import os
+import time
+
+import pytest
+
+from conftest import read_report
+from test_selenium_flow import FakeFormDriver
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline()
+
+def test_timed_stage_accumulates_seconds(pipeline):
+    stats = {}
+    for _ in range(2):
+        with pipeline.timed_stage(stats, 'upload'):
+            time.sleep(0.02)
+    assert stats['stage_seconds']['upload'] >= 0.04
+    assert pipeline.stage_columns(stats['stage_seconds']).keys() == {'Stage_Upload_s'}
+
+def test_failed_indigo_timings_are_kept_for_the_final_row(pipeline):
+    metrics = pipeline.StageMetrics()
+    metrics.hold("a.ab1", {'stage_seconds': {'page_load': 1.5, 'indigo_compute': 30.0}})
+    record = {'Sample': "a.ab1", 'Stage_Ice_Analysis_s': "2.000"}
+    metrics.observe(record, total_seconds=34.0)
+    assert record['Stage_Page_Load_s'] == "1.500"
+    assert record['Stage_Indigo_Compute_s'] == "30.000"
+    assert record['Sample_Total_s'] == "34.000"
+    
+    snapshot = metrics.snapshot()
+    assert snapshot['samples'] == 1
+    assert snapshot['stages']['Stage_Indigo_Compute_s']['buckets']['30'] == 1
+    assert snapshot['stages']['Stage_Indigo_Compute_s']['buckets']['20'] == 0
+
+def test_snapshot_quantiles_and_prometheus_file(pipeline, tmp_path):
+    metrics = pipeline.StageMetrics()
+    for seconds in range(1, 101):
+        metrics.observe({'Sample': f"s{seconds}.ab1", 'Stage_Upload_s': str(seconds / 10)})
+    snapshot = metrics.write(str(tmp_path / "metrics.json"), str(tmp_path / "run_metrics.prom"))
+    
+    upload = snapshot['stages']['Stage_Upload_s']
+    assert (upload['count'], upload['max']) == (100, 10.0)
+    assert upload['p50'] == pytest.approx(5.05)
+    assert json.loads((tmp_path / "metrics.json").read_text())['samples'] == 100
+    
+    prometheus = (tmp_path / "run_metrics.prom").read_text().splitlines()
+    assert 'hybrid_stage_seconds_bucket{stage="upload",le="5"} 50' in prometheus
+    assert 'hybrid_stage_seconds_bucket{stage="upload",le="+Inf"} 100' in prometheus
+    assert 'hybrid_stage_seconds_count{stage="upload"} 100' in prometheus
+    assert not os.path.exists(str(tmp_path / "run_metrics.prom.tmp"))
+
+class QuittableFormDriver(FakeFormDriver):
+    """The form driver as a browser session: one result page per submitted sample"""
+    
+    def quit(self):
+        pass
+    
+    def clicked(self, name):
+        if name == "Download HTML":
+            with open(os.path.join(self.download_path, f"result_{self.submitted}.html"), 'w') as f:
+                f.write("<html>result</html>")
+        else:
+            super().clicked(name)
+
+def test_main_reports_stage_columns_and_writes_metrics(load_pipeline, input_folder):
+    pipeline = load_pipeline(DOWNLOAD_TIMEOUT=2)
+    pipeline.init_driver = lambda download_path=None: QuittableFormDriver(download_path, delay=0.05)
+    pipeline.main()
+    
+    rows = read_report(pipeline)
+    assert len(rows) == len(os.listdir(input_folder))
+    for row in rows.values():
+        assert row['Status'] == 'Success'
+        assert float(row['Stage_Page_Load_s']) >= 0
+        assert float(row['Stage_Indigo_Compute_s']) >= 0.04
+        assert float(row['Sample_Total_s']) >= float(row['Stage_Indigo_Compute_s'])
+    
+    output = os.path.dirname(pipeline.indigo_output_dir)
+    metrics_files = glob.glob(os.path.join(output, "run_metrics_*.json"))
+    assert len(metrics_files) == 1
+    with open(metrics_files[0]) as f:
+        assert json.load(f)['samples'] == len(rows)
+    assert os.path.exists(os.path.join(output, pipeline.METRICS_PROMETHEUS_FILE))
@@ -0,0 +1,56 @@
+"""Samples are parsed on a thread pool and analyzed as soon as each one is validated"""
+import os
+import time
+
+import pytest
+
+from conftest import read_report
+
+def test_record_cache_parses_each_file_once(load_pipeline, input_folder, monkeypatch):
+    pipeline = load_pipeline()
+    reads = []
+    real_read = pipeline.SeqIO.read
+    monkeypatch.setattr(pipeline.SeqIO, "read", lambda path, fmt: reads.append(path) or real_read(path, fmt))
+    cache = pipeline.RecordCache(2)
+    paths = [os.path.join(input_folder, name) for name in sorted(os.listdir(input_folder))[:3]]
+    
+    cache.load(paths[0])
+    cache.load(paths[0])
+    assert reads == [paths[0]]
+    
+    # Least recently used records are dropped beyond the bound
+    cache.load(paths[1])
+    cache.load(paths[2])
+    cache.load(paths[0])
+    assert reads == [paths[0], paths[1], paths[2], paths[0]]
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_analysis_starts_before_the_folder_is_validated(load_pipeline, indigo_api, mode):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01,
+                             PIPELINE_MODE=mode, VALIDATION_WORKERS=1)
+    validated = []
+    real_validate = pipeline.validate_sample
+    
+    def slow_validate(file_name):
+        time.sleep(0.2)
+        error = real_validate(file_name)
+        validated.append(time.time())
+        return error
+    
+    pipeline.validate_sample = slow_validate
+    pipeline.main()
+    
+    assert len(validated) == 6
+    assert min(indigo_api.upload_times) < max(validated)
+    assert {row['Status'] for row in read_report(pipeline).values()} == {'Success'}
+
+@pytest.mark.parametrize("mode", ["pool", "async"])
+def test_unreadable_samples_are_reported_and_still_queued(load_pipeline, indigo_api, input_folder, mode):
+    with open(os.path.join(input_folder, "broken.ab1"), 'wb') as f:
+        f.write(b"not a chromatogram")
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01,
+                             PIPELINE_MODE=mode)
+    pipeline.main()
+    
+    assert "broken.ab1" in read_report(pipeline)
+    assert any("cannot be read as .ab1" in warning for warning in pipeline.logger.warnings)
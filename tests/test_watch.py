@@ -0,0 +1,92 @@
+"""--watch: new .ab1 files are picked up once completely written and analyzed while the daemon runs"""
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from conftest import read_report
+
+@pytest.fixture
+def pipeline(load_pipeline):
+    return load_pipeline(WATCH_POLL_INTERVAL=0.05, WATCH_SETTLE_SECONDS=0.3, WATCH_RESCAN_INTERVAL=0.1)
+
+def poll_until(watcher, count, timeout=5):
+    ready = []
+    deadline = time.time() + timeout
+    while len(ready) < count and time.time() < deadline:
+        ready += watcher.poll()
+    return ready
+
+def test_existing_files_can_be_skipped(pipeline, input_folder):
+    watcher = pipeline.FolderWatcher(input_folder, include_existing=False)
+    try:
+        assert poll_until(watcher, 1, timeout=0.5) == []
+    finally:
+        watcher.close()
+
+def test_file_is_reported_once_completely_written(pipeline, input_folder):
+    sample = os.path.join(input_folder, "sample_1.ab1")
+    data = open(sample, 'rb').read()
+    watcher = pipeline.FolderWatcher(input_folder, include_existing=False)
+    try:
+        new_path = os.path.join(input_folder, "arriving.ab1")
+        with open(new_path, 'wb') as f:
+            f.write(data[:100])  # Truncated ABIF - not reported yet
+            f.flush()
+            assert poll_until(watcher, 1, timeout=0.5) == []
+            f.write(data[100:])
+        assert poll_until(watcher, 1) == ["arriving.ab1"]
+        assert poll_until(watcher, 1, timeout=0.5) == []  # Reported once
+    finally:
+        watcher.close()
+
+def test_folder_is_polled_without_inotify(pipeline, input_folder, monkeypatch):
+    def no_inotify(folder):
+        raise OSError("inotify unavailable")
+    
+    monkeypatch.setattr(pipeline, "InotifyWatch", no_inotify)
+    watcher = pipeline.FolderWatcher(input_folder, include_existing=False)
+    assert watcher.inotify is None
+    shutil.copy(os.path.join(input_folder, "sample_1.ab1"), os.path.join(input_folder, "copied.ab1"))
+    started = time.time()
+    assert poll_until(watcher, 1) == ["copied.ab1"]
+    assert time.time() - started >= pipeline.WATCH_SETTLE_SECONDS  # No close event - waited for it to settle
+
+def test_run_watch_analyzes_files_as_they_arrive(load_pipeline, indigo_api, input_folder, monkeypatch):
+    pipeline = load_pipeline(INDIGO_BACKEND="http", INDIGO_API_URL=indigo_api.url, WAIT_POLL_INTERVAL=0.01,
+                             WATCH_POLL_INTERVAL=0.05, WATCH_SETTLE_SECONDS=0.3, WATCH_PROCESS_EXISTING=False,
+                             REPORT_FLUSH_INTERVAL=0.1)
+    watchers = []
+    
+    class RecordedWatcher(pipeline.FolderWatcher):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            watchers.append(self)
+    
+    monkeypatch.setattr(pipeline, "FolderWatcher", RecordedWatcher)
+    daemon = threading.Thread(target=pipeline.run_watch)
+    daemon.start()
+    try:
+        deadline = time.time() + 5
+        while not watchers and time.time() < deadline:
+            time.sleep(0.05)
+        shutil.copy(os.path.join(input_folder, "sample_1.ab1"), os.path.join(input_folder, "new_sample.ab1"))
+        
+        while time.time() < deadline:
+            try:
+                if "new_sample.ab1" in read_report(pipeline):
+                    break
+            except AssertionError:
+                pass
+            time.sleep(0.05)
+    finally:
+        if watchers:
+            watchers[0].stop()
+        daemon.join(timeout=10)
+    
+    assert not daemon.is_alive()
+    rows = read_report(pipeline)
+    assert list(rows) == ["new_sample.ab1"]  # Files already in the folder were skipped
+    assert rows["new_sample.ab1"]['Status'] == 'Success'
@@ -0,0 +1,105 @@
+"""
+Worker pool: every sample is analyzed once, each worker on its own browser session and download directory.
+Runs without warm spare browsers, so every driver started belongs to a worker.
+"""
+import os
+import time
+import threading
+
+from selenium.common.exceptions import InvalidSessionIdException
+
+from conftest import read_report
+
+class FakeDriver:
+    """Stands in for a Chrome session downloading into its own directory"""
+    
+    def __init__(self, download_path):
+        self.download_path = download_path
+        self.quit_called = False
+    
+    def quit(self):
+        self.quit_called = True
+
+def use_fake_browser(pipeline, crash_first_on=None):
+    """
+    Replace Chrome with fake sessions; each analysis drops a result page into the session's download directory
+    under the one name INDIGO serves every result as.
+    The session named by crash_first_on raises InvalidSessionIdException on its first sample.
+    Returns (drivers, calls) where calls holds (sample, driver) pairs.
+    """
+    drivers, calls = [], []
+    lock = threading.Lock()
+    
+    def init_driver(download_path=None, profile=None, slot=None):
+        driver = FakeDriver(download_path)
+        with lock:
+            drivers.append(driver)
+        return driver
+    
+    def process_input_file(input_file_path, grna_sequences, driver, retry_count=0, download_path=None, stats=None, settings=None):
+        sample = os.path.basename(input_file_path)
+        with lock:
+            calls.append((sample, driver))
+            crash = crash_first_on is not None and driver is drivers[crash_first_on] and len([d for _, d in calls if d is driver]) == 1
+        if crash:
+            raise InvalidSessionIdException("invalid session id")
+        time.sleep(0.01)
+        with open(os.path.join(driver.download_path, "indigo_result.html"), 'w') as f:
+            f.write("<html>result</html>")
+        return True, None
+    
+    pipeline.init_driver = init_driver
+    pipeline.process_input_file = process_input_file
+    return drivers, calls
+
+def test_every_sample_runs_once_with_three_workers(load_pipeline, input_folder):
+    pipeline = load_pipeline(NUM_WORKERS=3, SESSION_WARM_SPARES=0)
+    drivers, calls = use_fake_browser(pipeline)
+    pipeline.main()
+    
+    samples = sorted(os.listdir(input_folder))
+    assert sorted(sample for sample, _ in calls) == samples
+    assert len(drivers) == 3
+    assert len({driver.download_path for driver in drivers}) == 3
+    assert all(driver.quit_called for driver in drivers)
+    
+    rows = read_report(pipeline)
+    assert sorted(rows) == samples
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+    
+    # Downloads are collected per sample from the worker directories, which are removed at the end
+    output = sorted(os.listdir(pipeline.indigo_output_dir))
+    assert [name for name in output if name.endswith('.html')] == [f"{os.path.splitext(sample)[0]}_indigo.html" for sample in samples]
+    assert not any(name.startswith('worker_') for name in output)
+
+def test_single_worker_downloads_into_the_output_directory(load_pipeline):
+    pipeline = load_pipeline(NUM_WORKERS=1, SESSION_WARM_SPARES=0)
+    drivers, _ = use_fake_browser(pipeline)
+    pipeline.main()
+    
+    assert [driver.download_path for driver in drivers] == [pipeline.indigo_output_dir]
+    assert {row['Status'] for row in read_report(pipeline).values()} == {'Success'}
+
+def test_crashed_session_is_replaced_for_its_worker_only(load_pipeline, input_folder):
+    pipeline = load_pipeline(NUM_WORKERS=2, SESSION_WARM_SPARES=0)
+    drivers, calls = use_fake_browser(pipeline, crash_first_on=0)
+    pipeline.main()
+    
+    # Two sessions at start plus one replacement for the crashed one, in the same download directory
+    assert len(drivers) == 3
+    assert drivers[2].download_path == drivers[0].download_path
+    assert drivers[0].quit_called
+    
+    rows = read_report(pipeline)
+    assert len(rows) == len(os.listdir(input_folder))
+    assert {row['Status'] for row in rows.values()} == {'Success'}
+
+def test_collected_downloads_never_overwrite_each_other(load_pipeline):
+    pipeline = load_pipeline(NUM_WORKERS=2)
+    worker_dir = pipeline.get_worker_download_dir(1)
+    for _ in range(2):
+        with open(os.path.join(worker_dir, "indigo_result.html"), 'w') as f:
+            f.write("<html>result</html>")
+        pipeline.collect_worker_downloads(worker_dir, "sample_1")
+    assert sorted(name for name in os.listdir(pipeline.indigo_output_dir) if name.endswith('.html')) == \
+        ["sample_1_indigo.html", "sample_1_indigo_2.html"]